@@ -1,12 +1,23 @@
+import atexit
+import json
 import logging
 import os
 import sqlite3
+import threading
+import time
 import datetime
-import joblib
-import pandas as pd
 import numpy as np
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, g, render_template, request, jsonify
 from pathlib import Path
+from food_db import FoodDB, CALO, SUGAR, FAT, PROTEIN, SALT
+from food_matcher import FoodMatcher
+from food_index import CachedPayload, FoodPrefixIndex
+from predictor import RiskPredictor
+from forest_format import load_forests
+from log_writer import LogWriter
+from analysis_cache import AnalysisCache
+from metrics import Registry, StageTimer
+from sampling_profiler import SamplingProfiler
 
 # --- Configuration ---
 app = Flask(__name__)
@@ -16,38 +27,157 @@ logger = logging.getLogger(__name__)
 BASE_DIR = Path(__file__).resolve().parent
 DATA_DIR = BASE_DIR / "data"
 MODEL_PATH = BASE_DIR / "model" / "health_model.pkl"
+FOREST_PATH = BASE_DIR / "model" / "health_model.forest"
+# Trained by model/train_model.py --variants; VIETHEALTH_MODEL_VARIANT=<name> serves one
+# of them instead of the main model (report in model/variants/report.json)
+VARIANTS_DIR = BASE_DIR / "model" / "variants"
+MODEL_VARIANT = os.environ.get("VIETHEALTH_MODEL_VARIANT", "")
 DB_PATH = BASE_DIR / "user_logs.db"
+# Set VIETHEALTH_LOG_ANALYSES=0 to turn the analysis audit log off
+LOG_ANALYSES = os.environ.get("VIETHEALTH_LOG_ANALYSES", "1") == "1"
+# create_app() loads the model in a background thread unless VIETHEALTH_LAZY_MODEL=0
+LAZY_MODEL = os.environ.get("VIETHEALTH_LAZY_MODEL", "1") == "1"
+# How long an analysis waits for a model that is still loading
+MODEL_WAIT_TIMEOUT = float(os.environ.get("VIETHEALTH_MODEL_WAIT_TIMEOUT", 30)) # seconds
+ANALYSIS_CACHE_SIZE = 10000
+ANALYSIS_CACHE_TTL = 600 # seconds
+FOOD_SEARCH_LIMIT = 10
+FOOD_SEARCH_MAX_LIMIT = 100
+# Set VIETHEALTH_PROFILING=1 to allow ?profile=1 on any request; the sampled
+# stacks are written to PROFILE_DIR in collapsed (flame graph) format.
+PROFILING = os.environ.get("VIETHEALTH_PROFILING", "0") == "1"
+PROFILE_DIR = BASE_DIR / "profiles"
+PROFILE_INTERVAL = 0.0005 # seconds
+# One profiled request at a time; other ?profile=1 requests run unprofiled
+PROFILE_LOCK = threading.Lock()
+
+# --- Metrics (served at /metrics) ---
+METRICS = Registry()
+REQUESTS = METRICS.counter("viethealth_http_requests_total", "HTTP requests by endpoint and status code.", ("endpoint", "status"))
+REQUEST_SECONDS = METRICS.histogram("viethealth_http_request_seconds", "HTTP request wall time by endpoint.", ("endpoint",))
+ERRORS = METRICS.counter("viethealth_errors_total", "Errors by pipeline stage.", ("stage",))
+STAGE_SECONDS = METRICS.histogram("viethealth_analyze_stage_seconds", "Wall time of each analyze stage per analyze call.", ("stage",))
+RECORDS = METRICS.counter("viethealth_records_analyzed_total", "Analyzed records by source (cache or model).", ("source",))
+FOOD_MATCHES = METRICS.histogram("viethealth_food_matches", "Foods matched per analyzed record.", buckets=(0, 1, 2, 3, 5, 8, 13, 21))
+LOAD_SECONDS = METRICS.gauge("viethealth_load_seconds", "Wall time of the last load_resources step.", ("resource",))
+CATALOG_SIZE = METRICS.gauge("viethealth_food_catalog_size", "Foods in the loaded catalog.")
 
 # --- Load Resources ---
-FOOD_DB = []
+FOOD_DB = FoodDB([])
+FOOD_MATCHER = None
+FOOD_INDEX = None
+FOODS_PAYLOAD = None
 MODEL = None
 SCALER = None
+PREDICTOR = None
+LOG_WRITER = None
+LOG_WRITER_LOCK = threading.Lock()
+ANALYSIS_CACHE = AnalysisCache(max_size=ANALYSIS_CACHE_SIZE, ttl=ANALYSIS_CACHE_TTL)
+# Cleared while a background model load is running; analyses wait on it
+MODEL_READY = threading.Event()
+MODEL_READY.set()
+MODEL_LOADER = None
+
+class ModelLoading(Exception):
+    """The model is still loading after MODEL_WAIT_TIMEOUT."""
+
+def load_resources(lazy_model=False, variant=None):
+    """
+    Load the food catalog, then the model. With lazy_model the model loads in a
+    background thread, so / and /api/foods can be served right away.
+    `variant` selects a model variant by name ("" for the main model); it
+    defaults to MODEL_VARIANT.
+    """
+    global MODEL_VARIANT
+    if variant is not None:
+        MODEL_VARIANT = variant
 
-def load_resources():
-    global FOOD_DB, MODEL, SCALER
-    
     # 1. Load Food Data
+    load_catalog()
+
+    # 2. Load AI Model (prefer the memory-mapped flat export, shared between workers)
+    if lazy_model:
+        start_model_loader()
+    else:
+        MODEL_READY.clear()
+        load_model()
+
+def load_catalog():
+    """Load the food catalog, its matcher, prefix index and /api/foods payload (no model)."""
+    global FOOD_DB, FOOD_MATCHER, FOOD_INDEX, FOODS_PAYLOAD
+    # Cached analyses were computed from the old catalog/model
+    ANALYSIS_CACHE.clear()
+
     food_file = DATA_DIR / "cleaned_foods.csv"
+    start = time.perf_counter()
     if food_file.exists():
         try:
-            df_food = pd.read_csv(food_file)
-            FOOD_DB = df_food.to_dict('records')
+            FOOD_DB = FoodDB.from_csv(food_file)
+            names = FOOD_DB.names
+            FOOD_MATCHER = FoodMatcher(names)
+            FOOD_INDEX = FoodPrefixIndex(names)
+            FOODS_PAYLOAD = CachedPayload(names)
+            CATALOG_SIZE.set(len(FOOD_DB))
             logger.info(f"✅ Loaded {len(FOOD_DB)} food items.")
         except Exception as e:
+            ERRORS.inc(stage="load_foods")
             logger.error(f"❌ Error loading food data: {e}")
     else:
         logger.warning("⚠️ Food data file not found!")
+    LOAD_SECONDS.set(time.perf_counter() - start, resource="foods")
 
-    # 2. Load AI Model
-    if MODEL_PATH.exists():
+def start_model_loader():
+    """Load the model in a background thread; MODEL_READY is set when it is done."""
+    global MODEL_LOADER
+    MODEL_READY.clear()
+    MODEL_LOADER = threading.Thread(target=load_model, name="model-loader", daemon=True)
+    MODEL_LOADER.start()
+
+def load_model():
+    start = time.perf_counter()
+    try:
+        _load_model()
+    finally:
+        LOAD_SECONDS.set(time.perf_counter() - start, resource="model")
+        # Results computed while the previous model was still in use are stale
+        ANALYSIS_CACHE.clear()
+        MODEL_READY.set()
+
+def model_paths(variant=None):
+    """(flat export, pickle) of the main model, or of a variant trained by train_model.py --variants."""
+    variant = MODEL_VARIANT if variant is None else variant
+    if not variant:
+        return FOREST_PATH, MODEL_PATH
+    return VARIANTS_DIR / variant / FOREST_PATH.name, VARIANTS_DIR / variant / MODEL_PATH.name
+
+def _load_model():
+    global MODEL, SCALER, PREDICTOR
+    forest_path, model_path = model_paths()
+    label = f" (variant {MODEL_VARIANT})" if MODEL_VARIANT else ""
+    if forest_path.exists():
         try:
-            SCALER, models = joblib.load(MODEL_PATH)
+            SCALER, MODEL = load_forests(forest_path)
+            PREDICTOR = RiskPredictor(SCALER, MODEL)
+            logger.info(f"✅ Loaded AI Models (Diabetes, Cardio, Hypertension) from flat export{label}.")
+            return
+        except Exception as e:
+            ERRORS.inc(stage="load_model")
+            logger.error(f"❌ Error loading flat model, falling back to pickle: {e}")
+
+    if model_path.exists():
+        try:
+            import joblib # only needed for the pickle fallback (slow to import)
+            SCALER, models = joblib.load(model_path)
             MODEL = models
-            logger.info("✅ Loaded AI Models (Diabetes, Cardio, Hypertension).")
+            PREDICTOR = RiskPredictor(SCALER, MODEL)
+            logger.info(f"✅ Loaded AI Models (Diabetes, Cardio, Hypertension){label}.")
         except Exception as e:
+            ERRORS.inc(stage="load_model")
             logger.error(f"❌ Error loading model: {e}")
     else:
-        logger.warning("⚠️ Model file not found!")
+        # Model artifacts are build outputs, not checked in: risks stay at 0 until one is trained
+        logger.error(f"❌ Model file not found{label}: {model_path}. "
+                     f"Train it with: python model/train_model.py" + (f" --variants {MODEL_VARIANT}" if MODEL_VARIANT else ""))
 
 def init_db():
     """Initialize SQLite database for logs."""
@@ -61,27 +191,76 @@ def init_db():
         nutrition_stats TEXT,
         predictions TEXT
     )""")
+    # Confirmed diagnoses for logged analyses; model/train_model.py --incremental learns from them
+    c.execute("""CREATE TABLE IF NOT EXISTS outcomes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        log_id INTEGER NOT NULL REFERENCES logs(id),
+        confirmed_at TEXT,
+        diabetes INTEGER,
+        heart_disease INTEGER,
+        hypertension INTEGER,
+        hba1c REAL,
+        glucose REAL
+    )""")
+    # WAL lets the background log writer commit without blocking readers
+    c.execute("PRAGMA journal_mode=WAL")
     conn.commit()
     conn.close()
 
+def start_log_writer():
+    """
+    Start the background writer that batches analysis logs into SQLite.
+    Called by the serving process (first logged analysis, or post_fork), never
+    by a preloading master: its SQLite connection must not be inherited by forks.
+    """
+    global LOG_WRITER
+    with LOG_WRITER_LOCK:
+        if LOG_ANALYSES and LOG_WRITER is None:
+            LOG_WRITER = LogWriter(DB_PATH).start()
+            atexit.register(LOG_WRITER.close)
+    return LOG_WRITER
+
+def log_analyses(records, results, block=True):
+    """
+    Queue successful analyses for the audit log (no-op when logging is off).
+    With block=False a full queue drops the rows instead of waiting for room.
+    """
+    if LOG_WRITER is None and start_log_writer() is None:
+        return
+    timestamp = datetime.datetime.now().isoformat()
+    for record, result in zip(records, results):
+        if not result.get("success"):
+            continue
+        LOG_WRITER.submit((
+            timestamp,
+            json.dumps(record.get('userInfo', {}), ensure_ascii=False),
+            record.get('foodText', ''),
+            json.dumps({
+                "nutrition": result["nutrition"],
+                "foods": result["foods"],
+                "bmi": result["bmi"],
+                "simulated_health": result["simulated_health"]
+            }, ensure_ascii=False),
+            json.dumps(result["predictions"])
+        ), block=block)
+
 # --- Helper Functions ---
+def find_food_ids(text):
+    """Catalog ids (in FOOD_DB order) of the foods mentioned in user input."""
+    return FOOD_MATCHER.find(text) if FOOD_MATCHER else []
+
+# Nutrients reported by /analyze, as FOOD_DB matrix columns
+NUTRITION_KEYS = ["calo", "sugar", "fat", "protein", "salt"]
+NUTRITION_COLS = [CALO, SUGAR, FAT, PROTEIN, SALT]
+
+def sum_nutrition(food_ids):
+    """Total nutrition of the given FOOD_DB rows."""
+    return dict(zip(NUTRITION_KEYS, FOOD_DB.totals_list(food_ids, NUTRITION_COLS)))
+
 def find_food_in_text(text):
-    """Simple keyword matching to find foods in user input."""
-    text = text.lower()
-    found_foods = []
-    total_nutrition = {"calo": 0, "sugar": 0, "fat": 0, "protein": 0, "salt": 0}
-    
-    for food in FOOD_DB:
-        # Check if food name appears in text
-        if food['name'].lower() in text:
-            found_foods.append(food)
-            total_nutrition["calo"] += float(food.get('calo', 0))
-            total_nutrition["sugar"] += float(food.get('sugar', 0))
-            total_nutrition["fat"] += float(food.get('fat', 0))
-            total_nutrition["protein"] += float(food.get('protein', 0))
-            total_nutrition["salt"] += float(food.get('salt', 0))
-            
-    return found_foods, total_nutrition
+    """Find foods mentioned in user input with the prebuilt FOOD_MATCHER."""
+    food_ids = find_food_ids(text)
+    return FOOD_DB.rows(food_ids), sum_nutrition(food_ids)
 
 def estimate_health_indicators(user_info, nutrition):
     """
@@ -113,6 +292,302 @@ def estimate_health_indicators(user_info, nutrition):
     
     return glucose, hba1c
 
+MAX_BATCH_SIZE = 10000
+# What-if scenarios: meal plans per request and days per plan (bounds the work per request)
+MAX_SCENARIOS = 5000
+MAX_PLAN_DAYS = 14
+RISK_KEYS = ("diabetes", "cardio", "hypertension")
+
+def calculate_bmi(user_info):
+    """BMI from height (cm) and weight (kg), falling back to 22.0 on bad input."""
+    try:
+        height = float(user_info.get('height', 170)) / 100 # cm to m
+        weight = float(user_info.get('weight', 65))
+        return round(weight / (height * height), 2)
+    except:
+        return 22.0
+
+def parse_record(record, timer=None):
+    """
+    Parse one userInfo/foodText record into matched food ids and profile features.
+    Together they fully determine the analysis result (see analysis_key).
+    """
+    user_info = record.get('userInfo', {})
+    food_text = record.get('foodText', '')
+
+    # 1. Parse Food
+    start = time.perf_counter()
+    food_ids = find_food_ids(food_text)
+    parsed_at = time.perf_counter()
+
+    # 2. Calculate BMI
+    bmi = calculate_bmi(user_info)
+    if timer is not None:
+        timer.add('food_parse', parsed_at - start)
+        timer.add('bmi', time.perf_counter() - parsed_at)
+
+    # Model inputs: gender, age, bmi, smoking_history (+ simulated HbA1c, glucose)
+    gender = 1 if user_info.get('gender') == 'Male' else 0
+    age = float(user_info.get('age'))
+    smoking = int(user_info.get('smoking', 0)) # 0: never, 1: current...
+
+    return {"food_ids": food_ids, "gender": gender, "age": age, "bmi": bmi, "smoking": smoking}
+
+def analysis_key(parsed):
+    """Canonical cache key: the matched food set plus the normalized profile."""
+    return (tuple(parsed["food_ids"]), parsed["gender"], parsed["age"], parsed["bmi"], parsed["smoking"])
+
+def prepare_record(parsed):
+    """Nutrition, simulated indicators and model features for a parsed record."""
+    nutrition = sum_nutrition(parsed["food_ids"])
+
+    # 3. Estimate Medical Indicators (Simulation)
+    glucose, hba1c = estimate_health_indicators({'age': parsed["age"], 'bmi': parsed["bmi"]}, nutrition)
+
+    return {
+        "nutrition": nutrition,
+        "foods": [FOOD_DB.names[i] for i in parsed["food_ids"]],
+        "bmi": parsed["bmi"],
+        "glucose": glucose,
+        "hba1c": hba1c,
+        "features": [parsed["gender"], parsed["age"], parsed["bmi"], parsed["smoking"], hba1c, glucose],
+    }
+
+def predict_risks(features, timer=None):
+    """
+    Run the diabetes -> cardio -> hypertension chain on a (n, 6) feature matrix.
+    Returns one predictions dict per row.
+    """
+    n = len(features)
+    if PREDICTOR is None or n == 0:
+        return [{"diabetes": 0, "cardio": 0, "hypertension": 0} for _ in range(n)]
+    return PREDICTOR.predict_batch(features, timer)
+
+def analyze_batch(records, timer=None):
+    """
+    Analyze many userInfo/foodText records with one vectorized model pass.
+    Each result matches what /analyze returns for that record alone; records
+    already in ANALYSIS_CACHE skip the simulation and the models.
+    Stage times go to `timer`, or straight to STAGE_SECONDS when none is given.
+    """
+    own_timer = timer is None
+    if own_timer:
+        timer = StageTimer(STAGE_SECONDS)
+    results = [None] * len(records)
+    pending = []
+    matches = {}
+    generation = ANALYSIS_CACHE.generation
+    for i, record in enumerate(records):
+        try:
+            parsed = parse_record(record, timer)
+        except Exception as e:
+            ERRORS.inc(stage="parse")
+            logger.error(f"Analysis Error: {e}")
+            results[i] = {"success": False, "error": str(e)}
+            continue
+        n_foods = len(parsed["food_ids"])
+        matches[n_foods] = matches.get(n_foods, 0) + 1
+
+        key = analysis_key(parsed)
+        cached = ANALYSIS_CACHE.get(key)
+        if cached is not None:
+            results[i] = cached
+        else:
+            start = time.perf_counter()
+            pending.append((i, key, prepare_record(parsed)))
+            timer.add('simulate', time.perf_counter() - start)
+
+    FOOD_MATCHES.observe_many([((), n_foods, count) for n_foods, count in matches.items()])
+    n_cached = sum(matches.values()) - len(pending)
+    if pending:
+        RECORDS.inc(len(pending), source="model")
+    if n_cached:
+        RECORDS.inc(n_cached, source="cache")
+
+    # A model still loading in the background: wait for it rather than answer with zeros
+    if pending and not MODEL_READY.wait(MODEL_WAIT_TIMEOUT):
+        raise ModelLoading("The model is still loading, retry shortly.")
+
+    features = np.array([p["features"] for _, _, p in pending], dtype=float).reshape(-1, 6)
+    predictions = predict_risks(features, timer)
+
+    for (i, key, p), pred in zip(pending, predictions):
+        results[i] = {
+            "success": True,
+            "nutrition": p["nutrition"],
+            "foods": p["foods"],
+            "bmi": p["bmi"],
+            "simulated_health": {"glucose": round(p["glucose"], 1), "hba1c": round(p["hba1c"], 1)},
+            "predictions": pred
+        }
+        ANALYSIS_CACHE.put(key, results[i], generation)
+    if own_timer:
+        timer.observe()
+    return results
+
+# --- What-if scenarios ---
+def simulate_indicators(age, bmi, sugar):
+    """
+    estimate_health_indicators as NumPy array expressions: (glucose, hba1c)
+    arrays for arrays (or scalars) of age, BMI and sugar intake.
+    """
+    age, bmi, sugar = np.broadcast_arrays(np.asarray(age, dtype=float), np.asarray(bmi, dtype=float),
+                                          np.asarray(sugar, dtype=float))
+    glucose = 85.0 + np.where(bmi > 25, (bmi - 25) * 2, 0.0) + np.where(age > 50, 5.0, 0.0) + sugar * 0.5
+    hba1c = 5.0 + np.where(bmi > 30, 0.5, 0.0)
+    return np.clip(glucose, 70, 300), np.clip(hba1c, 4, 15)
+
+def parse_scenarios(scenarios):
+    """
+    Normalize candidate meal plans to (name, [day food text, ...]) pairs.
+    A plan is {"name": ..., "days": [...]}, {"foodText": ...}, a list of days or
+    one food text; a day is a food text or a list of dish names.
+    Raises ValueError on malformed input or a plan over MAX_PLAN_DAYS days
+    (the MAX_SCENARIOS cap is enforced by the route, as a 413).
+    """
+    if not isinstance(scenarios, list) or not scenarios:
+        raise ValueError("Expected a non-empty list of scenarios.")
+    plans = []
+    for k, scenario in enumerate(scenarios):
+        name = None
+        if isinstance(scenario, dict):
+            name = scenario.get('name')
+            days = scenario['days'] if 'days' in scenario else [scenario.get('foodText', '')]
+        else:
+            days = [scenario] if isinstance(scenario, str) else scenario
+        if not isinstance(days, list) or not 1 <= len(days) <= MAX_PLAN_DAYS:
+            raise ValueError(f"Scenario {k}: expected 1 to {MAX_PLAN_DAYS} days.")
+        texts = []
+        for day in days:
+            if isinstance(day, list) and all(isinstance(dish, str) for dish in day):
+                day = ", ".join(day)
+            if not isinstance(day, str):
+                raise ValueError(f"Scenario {k}: a day is a food text or a list of dish names.")
+            texts.append(day)
+        plans.append((name, texts))
+    return plans
+
+def scenario_risks(features, timer=None):
+    """(n, 3) risk percentages (RISK_KEYS order) for a (n, 6) feature matrix, one model pass."""
+    if PREDICTOR is None or len(features) == 0:
+        return np.zeros((len(features), len(RISK_KEYS)))
+    return np.column_stack(PREDICTOR.predict_proba(features, timer)) * 100
+
+def analyze_scenarios(user_info, scenarios, rank_by="overall", details=False, timer=None):
+    """
+    Simulate every candidate meal plan for one profile and rank them by mean
+    daily risk (lowest first); "overall" is the mean of the three risks.
+    Each distinct day text is matched once, nutrition of all days is summed in
+    one pass, indicators are array expressions and the risk chain runs once on
+    the distinct feature rows. A day scores as /analyze would score it alone.
+    """
+    if rank_by != "overall" and rank_by not in RISK_KEYS:
+        raise ValueError(f"rank_by must be one of: overall, {', '.join(RISK_KEYS)}.")
+    plans = parse_scenarios(scenarios)
+    profile = parse_record({'userInfo': user_info}, timer)
+
+    # 1. Parse each distinct day once (swapped plans repeat most of their days)
+    start = time.perf_counter()
+    day_of_text = {}
+    plan_days = []
+    for _, texts in plans:
+        plan_days.append([day_of_text.setdefault(text, len(day_of_text)) for text in texts])
+    day_foods = [find_food_ids(text) for text in day_of_text]
+    parsed_at = time.perf_counter()
+
+    # 2. Nutrition and simulated indicators of every distinct day
+    nutrition = FOOD_DB.totals_many(day_foods, NUTRITION_COLS)
+    glucose, hba1c = simulate_indicators(profile["age"], profile["bmi"], nutrition[:, NUTRITION_KEYS.index("sugar")])
+    features = np.column_stack([
+        np.full(len(day_foods), profile["gender"], dtype=float), np.full(len(day_foods), profile["age"]),
+        np.full(len(day_foods), profile["bmi"]), np.full(len(day_foods), float(profile["smoking"])),
+        hba1c, glucose,
+    ])
+    # Days with the same glucose share a feature row: score each row once
+    rows, row_of_day = np.unique(features, axis=0, return_inverse=True)
+    if timer is not None:
+        timer.add('food_parse', parsed_at - start)
+        timer.add('simulate', time.perf_counter() - parsed_at)
+
+    if len(rows) and not MODEL_READY.wait(MODEL_WAIT_TIMEOUT):
+        raise ModelLoading("The model is still loading, retry shortly.")
+    day_risks = scenario_risks(rows, timer)[row_of_day.reshape(-1)]
+
+    # 3. Per-plan daily means, ranking
+    lengths = np.array([len(days) for days in plan_days])
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    flat_days = np.concatenate([np.asarray(days) for days in plan_days])
+    per_day = np.column_stack([day_risks, nutrition, glucose, hba1c])[flat_days]
+    means = np.add.reduceat(per_day, starts, axis=0) / lengths[:, None]
+    risks = means[:, :len(RISK_KEYS)]
+    scores = risks.mean(axis=1) if rank_by == "overall" else risks[:, RISK_KEYS.index(rank_by)]
+    order = np.argsort(scores, kind="stable")
+
+    results = []
+    for rank, k in enumerate(order.tolist(), 1):
+        mean = means[k].tolist()
+        result = {
+            "rank": rank,
+            "scenario": k,
+            "name": plans[k][0],
+            "score": round(float(scores[k]), 1),
+            "score_change": round(float(scores[k] - scores[0]), 1),
+            "risk": {key: round(v, 1) for key, v in zip(RISK_KEYS, mean)},
+            "nutrition": {key: round(v, 2) for key, v in zip(NUTRITION_KEYS, mean[len(RISK_KEYS):])},
+            "simulated_health": {"glucose": round(mean[-2], 1), "hba1c": round(mean[-1], 1)},
+        }
+        if details:
+            result["days"] = [
+                {
+                    "foods": [FOOD_DB.names[i] for i in day_foods[d]],
+                    "simulated_health": {"glucose": round(float(glucose[d]), 1), "hba1c": round(float(hba1c[d]), 1)},
+                    "predictions": {key: round(float(v), 1) for key, v in zip(RISK_KEYS, day_risks[d])},
+                }
+                for d in plan_days[k]
+            ]
+        results.append(result)
+    return {"bmi": profile["bmi"], "unique_days": len(day_foods), "results": results}
+
+# --- Request hooks ---
+@app.before_request
+def start_request_timing():
+    g.request_start = time.perf_counter()
+    if PROFILING and request.args.get('profile') == '1' and PROFILE_LOCK.acquire(blocking=False):
+        try:
+            g.profiler = SamplingProfiler(threading.get_ident(), PROFILE_INTERVAL).start()
+        except BaseException:
+            PROFILE_LOCK.release()
+            raise
+
+def finish_profile():
+    """Stop this request's profiler (if any), write its stacks and free PROFILE_LOCK; returns the file path."""
+    profiler = g.pop('profiler', None)
+    if profiler is None:
+        return None
+    try:
+        profiler.stop()
+        path = PROFILE_DIR / f"{request.endpoint or 'unknown'}-{datetime.datetime.now():%Y%m%d-%H%M%S-%f}.folded"
+        profiler.dump(path)
+        logger.info(f"🔥 Profiled {request.path}: {profiler.samples} samples -> {path}")
+        return path
+    finally:
+        PROFILE_LOCK.release()
+
+@app.after_request
+def record_request(response):
+    endpoint = request.endpoint or 'unknown'
+    REQUESTS.inc(endpoint=endpoint, status=response.status_code)
+    REQUEST_SECONDS.observe(time.perf_counter() - g.request_start, endpoint=endpoint)
+    path = finish_profile()
+    if path is not None:
+        response.headers['X-Profile'] = path.name
+    return response
+
+@app.teardown_request
+def stop_profiler(exc):
+    # after_request is skipped when a request fails with an unhandled exception
+    finish_profile()
+
 # --- Routes ---
 @app.route('/')
 def home():
@@ -120,112 +595,159 @@ def home():
 
 @app.route('/api/foods')
 def get_foods():
-    """Return list of food names for autocomplete."""
-    names = [f['name'] for f in FOOD_DB]
-    return jsonify(names)
+    """
+    Return list of food names for autocomplete.
+    ?prefix=<text>&limit=<n> returns only the top-N accent-insensitive prefix matches.
+    """
+    prefix = request.args.get('prefix')
+    if prefix is not None:
+        limit = request.args.get('limit', FOOD_SEARCH_LIMIT, type=int)
+        limit = max(0, min(limit, FOOD_SEARCH_MAX_LIMIT))
+        return jsonify(FOOD_INDEX.search(prefix, limit) if FOOD_INDEX else [])
+
+    payload = FOODS_PAYLOAD or CachedPayload([])
+    if request.if_none_match.contains(payload.etag):
+        response = Response(status=304)
+    elif request.accept_encodings['gzip']:
+        response = Response(payload.gzipped, mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = Response(payload.body, mimetype='application/json')
+    response.set_etag(payload.etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.vary.add('Accept-Encoding')
+    return response
+
+@app.route('/api/cache/stats')
+def cache_stats():
+    """Hit/miss counters of the analysis cache."""
+    return jsonify(ANALYSIS_CACHE.stats())
+
+@app.route('/metrics')
+def metrics():
+    """Request, error, food-match, stage-latency and load-time metrics in Prometheus text format."""
+    return Response(METRICS.render(), mimetype='text/plain; version=0.0.4')
 
 @app.route('/analyze', methods=['POST'])
 def analyze():
     try:
+        timer = StageTimer(STAGE_SECONDS)
         data = request.json
-        user_info = data.get('userInfo', {})
-        food_text = data.get('foodText', '')
-        
-        # 1. Parse Food
-        found_foods, nutrition = find_food_in_text(food_text)
-        
-        # 2. Calculate BMI
-        try:
-            height = float(user_info.get('height', 170)) / 100 # cm to m
-            weight = float(user_info.get('weight', 65))
-            bmi = round(weight / (height * height), 2)
-        except:
-            bmi = 22.0
-            
-        # 3. Estimate Medical Indicators (Simulation)
-        glucose, hba1c = estimate_health_indicators({'age': user_info.get('age'), 'bmi': bmi}, nutrition)
-        
-        # 4. AI Prediction
-        predictions = {"diabetes": 0, "cardio": 0, "hypertension": 0}
-        if MODEL and SCALER:
-            # Input features: ['gender', 'age', 'bmi', 'smoking_history', 'HbA1c_level', 'blood_glucose_level', 'hypertension', 'heart_disease', 'diabetes']
-            # Note: The scaler was fitted on ALL columns. We need to construct the full vector.
-            # However, we are predicting hypertension/heart_disease/diabetes.
-            # This creates a circular dependency if we strictly follow the training columns.
-            # For the demo, we will use the specific feature subsets we trained on.
-            
-            # Map inputs
-            gender = 1 if user_info.get('gender') == 'Male' else 0
-            age = float(user_info.get('age', 30))
-            smoking = int(user_info.get('smoking', 0)) # 0: never, 1: current...
-            
-            # Prepare Input Vector for Diabetes Model (gender, age, bmi, smoking, hba1c, glucose, hypertension, heart_disease)
-            # We assume no pre-existing conditions (0, 0) for the first prediction
-            input_d = np.array([[gender, age, bmi, smoking, hba1c, glucose, 0, 0]])
-            
-            # We need to scale this. But the scaler expects 9 columns. 
-            # Workaround: Create a dummy 9-col array, scale it, then extract needed cols? 
-            # Or better: Just use the raw values if the model is robust (RandomForest is scale-invariant usually, but we scaled it).
-            # Let's try to reconstruct the 9-col vector with dummy targets.
-            full_input = np.array([[gender, age, bmi, smoking, hba1c, glucose, 0, 0, 0]])
-            scaled_input = SCALER.transform(full_input)
-            
-            # Extract scaled features. The order in scaler.feature_names_in_ matches all_cols
-            # all_cols = ['gender', 'age', 'bmi', 'smoking_history', 'HbA1c_level', 'blood_glucose_level', 'hypertension', 'heart_disease', 'diabetes']
-            
-            # Diabetes Model used: ['gender', 'age', 'bmi', 'smoking_history', 'HbA1c_level', 'blood_glucose_level', 'hypertension', 'heart_disease']
-            # Indices: 0, 1, 2, 3, 4, 5, 6, 7
-            X_d = scaled_input[:, [0,1,2,3,4,5,6,7]]
-            prob_d = MODEL['diabetes'].predict_proba(X_d)[0][1]
-            
-            # Cardio Model used: ['gender', 'age', 'bmi', 'smoking_history', 'HbA1c_level', 'blood_glucose_level', 'hypertension', 'diabetes']
-            # Indices: 0, 1, 2, 3, 4, 5, 6, 8 (We use the predicted diabetes prob as input? Or binary? Let's use prob for smoother result)
-            # Actually RF expects binary usually, but let's pass the probability as a "risk score" proxy or threshold it.
-            # Let's threshold diabetes prediction for the next input
-            is_diabetes = 1 if prob_d > 0.5 else 0
-            
-            # Re-scale with new diabetes info? No, scaler is fixed. 
-            # We just construct the vector for the model.
-            # Note: The scaler transform applies (x - mean) / std. It doesn't care about dependencies.
-            # So we can just use the scaled values from `scaled_input` for common features, and manually scale the 'diabetes' feature?
-            # Too complex. Let's just create a new full input with the predicted diabetes value.
-            full_input_c = np.array([[gender, age, bmi, smoking, hba1c, glucose, 0, 0, is_diabetes]])
-            scaled_input_c = SCALER.transform(full_input_c)
-            X_c = scaled_input_c[:, [0,1,2,3,4,5,6,8]]
-            prob_c = MODEL['cardio'].predict_proba(X_c)[0][1]
-            
-            # Hypertension Model used: ['gender', 'age', 'bmi', 'smoking_history', 'HbA1c_level', 'blood_glucose_level', 'diabetes', 'heart_disease']
-            # Indices: 0, 1, 2, 3, 4, 5, 8, 7
-            is_cardio = 1 if prob_c > 0.5 else 0
-            full_input_h = np.array([[gender, age, bmi, smoking, hba1c, glucose, 0, is_cardio, is_diabetes]])
-            scaled_input_h = SCALER.transform(full_input_h)
-            X_h = scaled_input_h[:, [0,1,2,3,4,5,8,7]]
-            prob_h = MODEL['hypertension'].predict_proba(X_h)[0][1]
-            
-            predictions = {
-                "diabetes": round(prob_d * 100, 1),
-                "cardio": round(prob_c * 100, 1),
-                "hypertension": round(prob_h * 100, 1)
-            }
-
-        # 5. Log to DB
-        # (Skip for speed in this step, but structure is there)
-        
-        return jsonify({
-            "success": True,
-            "nutrition": nutrition,
-            "foods": [f['name'] for f in found_foods],
-            "bmi": bmi,
-            "simulated_health": {"glucose": round(glucose, 1), "hba1c": round(hba1c, 1)},
-            "predictions": predictions
-        })
+        result = analyze_batch([data], timer)[0]
+
+        # Log to DB (queued, written in batches by the background writer)
+        log_analyses([data], [result])
+
+        with timer.stage('serialize'):
+            response = jsonify(result)
+        timer.observe()
+        return response
+
+    except ModelLoading as e:
+        return jsonify({"success": False, "error": str(e)}), 503, {"Retry-After": "5"}
 
     except Exception as e:
+        ERRORS.inc(stage="analyze")
         logger.error(f"Analysis Error: {e}")
         return jsonify({"success": False, "error": str(e)})
 
+@app.route('/analyze/batch', methods=['POST'])
+def analyze_batch_route():
+    """Score a list of userInfo/foodText records in one call."""
+    try:
+        data = request.json
+        records = data.get('records', []) if isinstance(data, dict) else data
+        if not isinstance(records, list):
+            return jsonify({"success": False, "error": "Expected a list of records."}), 400
+        if len(records) > MAX_BATCH_SIZE:
+            return jsonify({"success": False, "error": f"Batch too large (max {MAX_BATCH_SIZE} records)."}), 413
+
+        timer = StageTimer(STAGE_SECONDS)
+        results = analyze_batch(records, timer)
+        log_analyses(records, results)
+        with timer.stage('serialize'):
+            response = jsonify({"success": True, "results": results})
+        timer.observe()
+        return response
+
+    except ModelLoading as e:
+        return jsonify({"success": False, "error": str(e)}), 503, {"Retry-After": "5"}
+
+    except Exception as e:
+        ERRORS.inc(stage="analyze_batch")
+        logger.error(f"Batch Analysis Error: {e}")
+        return jsonify({"success": False, "error": str(e)})
+
+@app.route('/analyze/scenarios', methods=['POST'])
+def analyze_scenarios_route():
+    """
+    Rank candidate meal plans for one profile: {"userInfo": {...}, "scenarios": [...],
+    "rank_by": "overall"|"diabetes"|"cardio"|"hypertension", "top": n, "details": bool}.
+    "score_change" is relative to the first scenario. What-if plans are not logged.
+    """
+    try:
+        timer = StageTimer(STAGE_SECONDS)
+        payload, status = scenarios_payload(request.json, timer)
+        with timer.stage('serialize'):
+            response = jsonify(payload)
+        timer.observe()
+        return response, status
+
+    except ModelLoading as e:
+        return jsonify({"success": False, "error": str(e)}), 503, {"Retry-After": "5"}
+
+    except Exception as e:
+        ERRORS.inc(stage="analyze_scenarios")
+        logger.error(f"Scenario Analysis Error: {e}")
+        return jsonify({"success": False, "error": str(e)})
+
+def scenarios_payload(data, timer=None):
+    """(response body, status) of /analyze/scenarios for a parsed request body."""
+    if not isinstance(data, dict):
+        return {"success": False, "error": "Expected a JSON object."}, 400
+    if isinstance(data.get('scenarios'), list) and len(data['scenarios']) > MAX_SCENARIOS:
+        return {"success": False, "error": f"Too many scenarios (max {MAX_SCENARIOS})."}, 413
+    top = data.get('top')
+    # bool is an int subclass: "top": true must not mean top 1
+    if top is not None and (type(top) is not int or top < 0):
+        return {"success": False, "error": "'top' must be a non-negative integer."}, 400
+    try:
+        result = analyze_scenarios(data.get('userInfo', {}), data.get('scenarios'),
+                                   rank_by=data.get('rank_by', 'overall'),
+                                   details=bool(data.get('details', False)), timer=timer)
+    except ValueError as e:
+        return {"success": False, "error": str(e)}, 400
+    if top is not None:
+        result["results"] = result["results"][:top]
+    return {"success": True, "rank_by": data.get('rank_by', 'overall'), **result}, 200
+
+# --- Startup ---
+def create_app(lazy_model=None):
+    """
+    Load resources and prepare the log database; returns the Flask app.
+    Entry point for WSGI servers (see wsgi.py and gunicorn.conf.py). The log
+    writer starts in the process that serves requests (see start_log_writer).
+    """
+    load_resources(lazy_model=LAZY_MODEL if lazy_model is None else lazy_model)
+    init_db()
+    return app
+
+def post_fork():
+    """
+    Start per-process background threads in a worker forked from a preloaded
+    master: threads do not survive fork, the loaded catalog and model do.
+    """
+    global LOG_WRITER, LOG_WRITER_LOCK, MODEL_READY
+    # Fresh lock and writer: nothing SQLite-related is carried over from the master
+    LOG_WRITER_LOCK = threading.Lock()
+    LOG_WRITER = None
+    start_log_writer()
+    if not MODEL_READY.is_set():
+        # The master forked mid-load; load again in this worker
+        MODEL_READY = threading.Event()
+        start_model_loader()
+
 # --- Main ---
 if __name__ == "__main__":
-    load_resources()
-    init_db()
+    create_app()
     app.run(debug=True, port=5000)
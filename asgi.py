@@ -0,0 +1,430 @@
+"""ASGI entry point: async HTTP with model inference in a bounded process pool.
+
+    uvicorn asgi:application --host 0.0.0.0 --port 8000
+
+POST /analyze and /analyze/batch are read and parsed on the event loop, so a
+slow client never holds a worker. Their records are queued to an
+InferenceService that gathers whatever arrives within a short window
+(micro-batching) and scores it with app.analyze_batch in a pool process that
+loaded the catalog and models once through load_resources. POST
+/analyze/scenarios runs whole in a pool process as well. Audit logging stays
+in this process and never blocks the event loop. Every other path is served by
+the Flask app through asgiref's WSGI adapter; this process only loads the food
+catalog they need, never the model.
+"""
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from asgiref.wsgi import WsgiToAsgi
+
+import app as viethealth
+from metrics import StageTimer
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration (environment overrides) ---
+# Pool processes running inference
+INFERENCE_WORKERS = int(os.environ.get("VIETHEALTH_INFERENCE_WORKERS", os.cpu_count() or 1))
+# Requests allowed to wait for a worker before new ones get 503
+QUEUE_DEPTH = int(os.environ.get("VIETHEALTH_QUEUE_DEPTH", 1024))
+# How long a batch stays open for more requests once a worker is free
+BATCH_WINDOW_MS = float(os.environ.get("VIETHEALTH_BATCH_WINDOW_MS", 2))
+# Records per micro-batch (a single larger /analyze/batch request is never split)
+MAX_MICRO_BATCH = int(os.environ.get("VIETHEALTH_MAX_MICRO_BATCH", 256))
+# Seconds from queueing to result before the request gets 504
+INFERENCE_TIMEOUT = float(os.environ.get("VIETHEALTH_INFERENCE_TIMEOUT", 10))
+# Seconds allowed to receive the request body before the request gets 408
+BODY_TIMEOUT = float(os.environ.get("VIETHEALTH_BODY_TIMEOUT", 10))
+MAX_BODY_BYTES = int(os.environ.get("VIETHEALTH_MAX_BODY_BYTES", 8 * 1024 * 1024))
+
+# Path -> (Flask endpoint, error stage), so requests and errors are counted as the Flask routes count them
+ANALYZE_ROUTES = {
+    '/analyze': ('analyze', 'analyze'),
+    '/analyze/batch': ('analyze_batch_route', 'analyze_batch'),
+    '/analyze/scenarios': ('analyze_scenarios_route', 'analyze_scenarios'),
+}
+STATS_PATH = '/api/inference/stats'
+
+
+# --- Pool process side ---
+def _init_worker():
+    """Load the catalog and models once per pool process."""
+    viethealth.load_resources()
+
+
+def _worker_ready():
+    return viethealth.PREDICTOR is not None
+
+
+def _score(records):
+    # Stage timings and counters recorded here are merged into the server's /metrics
+    return viethealth.analyze_batch(records), viethealth.METRICS.take()
+
+
+def _rank_scenarios(data):
+    timer = StageTimer(viethealth.STAGE_SECONDS)
+    payload, status = viethealth.scenarios_payload(data, timer)
+    timer.observe()
+    return payload, status, viethealth.METRICS.take()
+
+
+# --- Event loop side ---
+class Overloaded(Exception):
+    """The inference queue is full."""
+
+
+class _Job:
+    __slots__ = ('records', 'future')
+
+    def __init__(self, records, future):
+        self.records = records
+        self.future = future
+
+
+class InferenceService:
+    """
+    Micro-batching front end of a ProcessPoolExecutor.
+
+    At most `workers` batches are in flight; while they run, new requests wait
+    in a queue of at most `queue_depth` requests and are merged into the next
+    batch (up to `max_batch` records) as soon as a worker frees up.
+    """
+
+    def __init__(self, workers=INFERENCE_WORKERS, queue_depth=QUEUE_DEPTH, batch_window_ms=BATCH_WINDOW_MS,
+                 max_batch=MAX_MICRO_BATCH, timeout=INFERENCE_TIMEOUT):
+        self.workers = max(1, workers)
+        self.queue_depth = queue_depth
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self.batches = 0
+        self.records = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.failures = 0
+        self._jobs = deque()
+        self._queued_records = 0
+        self._wakeup = None
+        self._slots = None
+        self._pool = None
+        self._batcher = None
+        self._running = set()
+
+    def _new_pool(self):
+        # spawn: the server process runs an event loop and the log writer thread
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_init_worker)
+
+    async def _warm_up(self, pool):
+        # Start every worker now so the first requests don't pay for model loading
+        loop = asyncio.get_running_loop()
+        ready = await asyncio.gather(*(loop.run_in_executor(pool, _worker_ready) for _ in range(self.workers)))
+        if not all(ready):
+            logger.warning("⚠️ Inference workers started without a model!")
+
+    async def start(self):
+        self._wakeup = asyncio.Event()
+        self._slots = asyncio.Semaphore(self.workers)
+        self._pool = self._new_pool()
+        await self._warm_up(self._pool)
+        self._batcher = asyncio.create_task(self._batch_loop())
+        logger.info(f"✅ Inference pool ready ({self.workers} workers).")
+        return self
+
+    async def close(self):
+        if self._batcher is not None:
+            self._batcher.cancel()
+            self._batcher = None
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+        while self._jobs:
+            job = self._jobs.popleft()
+            if not job.future.done():
+                job.future.set_exception(Overloaded("Server is shutting down."))
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    async def submit(self, records):
+        """
+        Analysis results for `records`, computed in the pool.
+        Raises Overloaded when the queue is full and asyncio.TimeoutError after `timeout`.
+        """
+        if len(self._jobs) >= self.queue_depth:
+            self.rejected += 1
+            raise Overloaded("Too many pending requests, retry later.")
+        job = _Job(records, asyncio.get_running_loop().create_future())
+        self._jobs.append(job)
+        self._queued_records += len(records)
+        self._wakeup.set()
+        try:
+            # On timeout the future is cancelled and the batcher skips the job
+            return await asyncio.wait_for(job.future, self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._slots.acquire()
+            while not self._jobs:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+            if self.batch_window > 0 and self._queued_records < self.max_batch:
+                await asyncio.sleep(self.batch_window)
+
+            batch, size = [], 0
+            while self._jobs and (not batch or size + len(self._jobs[0].records) <= self.max_batch):
+                job = self._jobs.popleft()
+                self._queued_records -= len(job.records)
+                if not job.future.done():
+                    batch.append(job)
+                    size += len(job.records)
+            if not batch:
+                self._slots.release()
+                continue
+
+            task = loop.create_task(self._run(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch):
+        try:
+            records = [record for job in batch for record in job.records]
+            pool = self._pool
+            try:
+                results, metrics = await asyncio.get_running_loop().run_in_executor(pool, _score, records)
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"❌ Inference batch failed: {e}")
+                for job in batch:
+                    if not job.future.done():
+                        job.future.set_exception(e)
+                if isinstance(e, BrokenProcessPool):
+                    await self._replace_pool(pool)
+                return
+
+            viethealth.METRICS.merge(metrics)
+            self.batches += 1
+            self.records += len(records)
+            offset = 0
+            for job in batch:
+                n = len(job.records)
+                if not job.future.done():
+                    job.future.set_result(results[offset:offset + n])
+                offset += n
+        finally:
+            self._slots.release()
+
+    async def call(self, fn, *args):
+        """
+        fn(*args) in the pool, outside micro-batching (whole requests such as
+        scenario ranking); it waits in the pool's own queue behind running batches.
+        Raises Overloaded when the queue is full and asyncio.TimeoutError after `timeout`.
+        """
+        if len(self._jobs) >= self.queue_depth:
+            self.rejected += 1
+            raise Overloaded("Too many pending requests, retry later.")
+        pool = self._pool
+        try:
+            return await asyncio.wait_for(asyncio.get_running_loop().run_in_executor(pool, fn, *args), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+        except BrokenProcessPool as e:
+            self.failures += 1
+            logger.error(f"❌ Inference call failed: {e}")
+            await self._replace_pool(pool)
+            raise
+
+    async def _replace_pool(self, pool):
+        # Every call in flight on a dead pool fails; only the first one replaces it
+        if pool is self._pool:
+            self._pool = self._new_pool()
+            pool.shutdown(wait=False, cancel_futures=True)
+            await self._warm_up(self._pool)
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "queue_depth": self.queue_depth,
+            "queued": len(self._jobs),
+            "in_flight": len(self._running),
+            "batches": self.batches,
+            "records": self.records,
+            "mean_batch_size": round(self.records / self.batches, 2) if self.batches else 0.0,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+        }
+
+
+SERVICE = None
+_start_lock = None
+flask_app = WsgiToAsgi(viethealth.app)
+
+
+async def startup():
+    """Load the catalog for the Flask routes, start the log writer and the inference pool."""
+    global SERVICE
+    # The models live in the pool processes only
+    viethealth.load_catalog()
+    viethealth.init_db()
+    viethealth.start_log_writer()
+    SERVICE = await InferenceService().start()
+
+
+async def shutdown():
+    global SERVICE
+    if SERVICE is not None:
+        await SERVICE.close()
+        SERVICE = None
+    if viethealth.LOG_WRITER is not None:
+        viethealth.LOG_WRITER.close()
+
+
+async def _ensure_started():
+    # Servers running without lifespan events start everything on the first request
+    global _start_lock
+    if SERVICE is None:
+        if _start_lock is None:
+            _start_lock = asyncio.Lock()
+        async with _start_lock:
+            if SERVICE is None:
+                await startup()
+
+
+class _BadRequest(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+async def _read_body(receive):
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            raise _BadRequest(499, "Client disconnected.")
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            raise _BadRequest(413, f"Request body too large (max {MAX_BODY_BYTES} bytes).")
+        chunks.append(chunk)
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+
+def _dump_json(payload):
+    """payload serialized the way jsonify does it with the Flask app's JSON provider settings."""
+    provider = viethealth.app.json
+    if (provider.compact is None and viethealth.app.debug) or provider.compact is False:
+        text = provider.dumps(payload, indent=2)
+    else:
+        text = provider.dumps(payload, separators=(",", ":"))
+    return f"{text}\n".encode('utf-8')
+
+
+async def _send_json(send, body, status=200, headers=()):
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+                   + list(headers),
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _analyze(scope, receive):
+    """(payload, status, extra headers) for one analyze request; status None if the client left."""
+    batch_route = scope["path"] == '/analyze/batch'
+    error_stage = ANALYZE_ROUTES[scope["path"]][1]
+    try:
+        body = await asyncio.wait_for(_read_body(receive), BODY_TIMEOUT)
+    except asyncio.TimeoutError:
+        return {"success": False, "error": "Timed out reading the request body."}, 408, ()
+    except _BadRequest as e:
+        return {"success": False, "error": str(e)}, (None if e.status == 499 else e.status), ()
+
+    try:
+        data = json.loads(body)
+        if scope["path"] == '/analyze/scenarios':
+            payload, status, metrics = await SERVICE.call(_rank_scenarios, data)
+            viethealth.METRICS.merge(metrics)
+            return payload, status, ()
+        if batch_route:
+            records = data.get('records', []) if isinstance(data, dict) else data
+            if not isinstance(records, list):
+                return {"success": False, "error": "Expected a list of records."}, 400, ()
+            if len(records) > viethealth.MAX_BATCH_SIZE:
+                return {"success": False, "error": f"Batch too large (max {viethealth.MAX_BATCH_SIZE} records)."}, 413, ()
+        else:
+            records = [data]
+
+        results = await SERVICE.submit(records)
+        # Non-blocking: when the log queue is full the rows are dropped rather than stalling the loop
+        viethealth.log_analyses(records, results, block=False)
+        return ({"success": True, "results": results} if batch_route else results[0]), 200, ()
+
+    except Overloaded as e:
+        return {"success": False, "error": str(e)}, 503, [(b"retry-after", b"1")]
+    except asyncio.TimeoutError:
+        viethealth.ERRORS.inc(stage="timeout")
+        return {"success": False, "error": "Analysis timed out."}, 504, ()
+    except Exception as e:
+        viethealth.ERRORS.inc(stage=error_stage)
+        logger.error(f"Analysis Error: {e}")
+        return {"success": False, "error": str(e)}, 200, ()
+
+
+async def analyze_http(scope, receive, send):
+    """POST /analyze, /analyze/batch and /analyze/scenarios, with the same bodies, responses and metrics as the Flask routes."""
+    await _ensure_started()
+    start = time.perf_counter()
+    endpoint = ANALYZE_ROUTES[scope["path"]][0]
+    payload, status, headers = await _analyze(scope, receive)
+    if status is not None:
+        timer = StageTimer(viethealth.STAGE_SECONDS)
+        with timer.stage('serialize'):
+            body = _dump_json(payload)
+        timer.observe()
+        await _send_json(send, body, status, headers)
+    viethealth.REQUESTS.inc(endpoint=endpoint, status=status or 499)
+    viethealth.REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint)
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            try:
+                await startup()
+            except Exception as e:
+                logger.error(f"❌ Startup failed: {e}")
+                await send({"type": "lifespan.startup.failed", "message": str(e)})
+                return
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await shutdown()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "lifespan":
+        return await lifespan(receive, send)
+    if scope["type"] == "http":
+        if scope["method"] == "POST" and scope["path"] in ANALYZE_ROUTES:
+            return await analyze_http(scope, receive, send)
+        if scope["path"] == STATS_PATH:
+            await _ensure_started()
+            return await _send_json(send, _dump_json(SERVICE.stats()))
+    return await flask_app(scope, receive, send)
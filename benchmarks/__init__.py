@@ -0,0 +1,8 @@
+"""Benchmarks for VietHealth.
+
+The suite (python -m benchmarks.run) times food parsing, the analyze
+pipeline, training and data cleaning on seeded synthetic data
+(benchmarks/datagen.py) and checks the results against benchmarks/baseline.json.
+The bench_*.py scripts are standalone before/after comparisons for
+individual optimizations.
+"""
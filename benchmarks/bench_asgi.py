@@ -0,0 +1,136 @@
+"""Load test: /analyze throughput and p50/p99 latency at 1, 8 and 64 concurrent clients.
+
+Starts each server as a subprocess on a free local port:
+  flask - the Flask app with its threaded development server (app.run)
+  asgi  - asgi:application under uvicorn (process pool + micro-batching)
+Every client keeps one HTTP/1.1 connection open and posts random meals back to back.
+Usage: python benchmarks/bench_asgi.py [requests_per_level] [flask|asgi ...]
+"""
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import pandas as pd  # noqa: E402
+
+CONCURRENCY = (1, 8, 64)
+SERVERS = {
+    "flask": [sys.executable, "-c",
+              "import logging, app; logging.disable(logging.WARNING); app.load_resources(); app.init_db(); "
+              "app.start_log_writer(); app.app.run(port={port}, threaded=True)"],
+    "asgi": [sys.executable, "-m", "uvicorn", "asgi:application", "--port", "{port}", "--log-level", "warning",
+             "--no-access-log"],
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def make_payloads(n, seed):
+    rng = random.Random(seed)
+    names = pd.read_csv(ROOT / "data" / "cleaned_foods.csv")['name'].tolist()
+    return [
+        json.dumps({
+            "userInfo": {"age": rng.randint(18, 85), "height": rng.randint(145, 195), "weight": rng.randint(40, 120),
+                         "gender": rng.choice(["Male", "Female"]), "smoking": rng.randint(0, 3)},
+            "foodText": ", ".join(rng.sample(names, rng.randint(1, 5))),
+        }).encode()
+        for _ in range(n)
+    ]
+
+
+def start_server(kind, port):
+    cmd = [part.format(port=port) for part in SERVERS[kind]]
+    env = dict(os.environ, VIETHEALTH_LOG_ANALYSES="0")
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+            conn.request("GET", "/api/cache/stats")
+            if conn.getresponse().status == 200:
+                conn.close()
+                return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError(f"{kind} server did not start")
+
+
+def run_level(port, clients, payloads):
+    per_client = max(1, len(payloads) // clients)
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+
+    def client(bodies):
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        local, failed = [], 0
+        for body in bodies:
+            start = time.perf_counter()
+            try:
+                conn.request("POST", "/analyze", body, {"Content-Type": "application/json"})
+                response = conn.getresponse()
+                ok = response.status == 200 and json.loads(response.read()).get("success")
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+                ok = False
+            local.append((time.perf_counter() - start) * 1e3)
+            failed += not ok
+        conn.close()
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client, args=(payloads[i * per_client:(i + 1) * per_client],))
+               for i in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[max(0, int(len(latencies) * 0.99) - 1)]
+    return len(latencies) / elapsed, p50, p99, errors[0]
+
+
+def main():
+    n_requests = int(sys.argv[1]) if len(sys.argv) > 1 else 640
+    kinds = sys.argv[2:] or list(SERVERS)
+    warmup = make_payloads(50, seed=7)
+    print(f"{n_requests} requests per level, {os.cpu_count()} CPUs")
+    for kind in kinds:
+        port = free_port()
+        proc = start_server(kind, port)
+        try:
+            run_level(port, 1, warmup)
+            for clients in CONCURRENCY:
+                # Fresh meals per level so the analysis cache doesn't answer them
+                rps, p50, p99, errors = run_level(port, clients, make_payloads(n_requests, seed=clients))
+                print(f"{kind:>5} | {clients:3d} clients | {rps:7.1f} req/s | p50 {p50:8.2f} ms | p99 {p99:8.2f} ms | errors {errors}")
+            if kind == "asgi":
+                conn = http.client.HTTPConnection("127.0.0.1", port)
+                conn.request("GET", "/api/inference/stats")
+                print(f"       stats: {json.loads(conn.getresponse().read())}")
+        finally:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main()
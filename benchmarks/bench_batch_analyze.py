@@ -0,0 +1,64 @@
+"""Benchmark: app.analyze_batch throughput vs. scoring the same records one at a time.
+
+Needs data/cleaned_foods.csv and model/health_model.pkl.
+Usage: python benchmarks/bench_batch_analyze.py
+"""
+import logging
+import random
+import sys
+import time
+import warnings
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import app  # noqa: E402
+
+BATCH_SIZES = [1, 100, 10_000]
+MAX_SEQUENTIAL = 100  # one-at-a-time scoring is timed on at most this many records
+
+
+def make_records(n, seed=42):
+    rng = random.Random(seed)
+    names = app.FOOD_DB.names
+    return [
+        {
+            "userInfo": {
+                "age": rng.randint(18, 85),
+                "height": rng.randint(145, 195),
+                "weight": rng.randint(40, 120),
+                "gender": rng.choice(["Male", "Female"]),
+                "smoking": rng.randint(0, 3),
+            },
+            "foodText": ", ".join(rng.sample(names, rng.randint(1, 5))),
+        }
+        for _ in range(n)
+    ]
+
+
+def main():
+    logging.disable(logging.WARNING)
+    warnings.filterwarnings("ignore")
+    app.load_resources()
+    if not app.MODEL:
+        sys.exit("Model not found - run model/train_model.py first.")
+
+    print(f"{'batch':>6} | {'one-by-one (rec/s)':>18} | {'batched (rec/s)':>15} | speedup")
+    for size in BATCH_SIZES:
+        records = make_records(size)
+
+        sample = records[:MAX_SEQUENTIAL]
+        start = time.perf_counter()
+        for record in sample:
+            app.analyze_batch([record])
+        seq_rate = len(sample) / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        app.analyze_batch(records)
+        batch_rate = size / (time.perf_counter() - start)
+
+        print(f"{size:>6} | {seq_rate:>18.1f} | {batch_rate:>15.1f} | {batch_rate / seq_rate:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
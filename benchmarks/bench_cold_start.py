@@ -0,0 +1,146 @@
+"""Benchmark: gunicorn cold start and per-worker memory.
+
+Starts gunicorn on a free local port in three setups:
+  eager   - no preload, every worker loads catalog and model before serving
+  lazy    - no preload, every worker loads the model in a background thread
+  preload - gunicorn.conf.py: the master loads everything once, workers are forked
+and reports the time from launch to the first 200 on /api/foods, the time to
+the first successful /analyze (it waits for the model), and each worker's RSS and PSS
+(proportional set size: shared pages are split between the processes).
+Also times loading the catalog with pandas vs. FoodDB in this process.
+Linux only (reads /proc/<pid>/smaps_rollup).
+
+Usage: python benchmarks/bench_cold_start.py [n_workers]
+"""
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+CATALOG = ROOT / "data" / "cleaned_foods.csv"
+RECORD = {"userInfo": {"age": 55, "height": 165, "weight": 80, "gender": "Male", "smoking": 2},
+          "foodText": "Phở bò, trà sữa"}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def request(port, method, path, body=None):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    try:
+        conn.request(method, path, body=body and json.dumps(body),
+                     headers={"Content-Type": "application/json"} if body else {})
+        resp = conn.getresponse()
+        return resp.status, resp.read()
+    except OSError:
+        return None, b""
+    finally:
+        conn.close()
+
+
+def wait_for(check, timeout=120):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if check():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def worker_pids(master):
+    pids = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                if int(f.read().rsplit(")", 1)[1].split()[1]) == master:
+                    pids.append(int(entry))
+        except (OSError, IndexError, ValueError):
+            pass
+    return pids
+
+
+def memory_mb(pid):
+    stats = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ("Rss:", "Pss:"):
+                stats[parts[0][:-1].lower()] = int(parts[1]) / 1024
+    return stats
+
+
+def run(setup, n_workers):
+    port = free_port()
+    env = dict(os.environ, VIETHEALTH_LOG_ANALYSES="0", VIETHEALTH_WORKERS=str(n_workers),
+               VIETHEALTH_BIND=f"127.0.0.1:{port}")
+    with tempfile.NamedTemporaryFile("w", suffix=".py", delete=False) as empty:
+        pass  # gunicorn would otherwise pick up ./gunicorn.conf.py
+    if setup == "preload":
+        cmd = [sys.executable, "-m", "gunicorn", "-c", str(ROOT / "gunicorn.conf.py")]
+    else:
+        env["VIETHEALTH_LAZY_MODEL"] = "1" if setup == "lazy" else "0"
+        cmd = [sys.executable, "-m", "gunicorn", "-c", empty.name, "-w", str(n_workers),
+               "-b", f"127.0.0.1:{port}", "wsgi:application"]
+
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        if not wait_for(lambda: request(port, "GET", "/api/foods")[0] == 200):
+            raise RuntimeError(f"{setup}: server did not start")
+        first_foods = time.perf_counter() - start
+
+        def analyzed():
+            status, body = request(port, "POST", "/analyze", RECORD)
+            return status == 200 and json.loads(body)["success"]
+        if not wait_for(analyzed):
+            raise RuntimeError(f"{setup}: /analyze did not succeed")
+        first_analyze = time.perf_counter() - start
+
+        # Give the remaining workers time to finish booting (and loading) before sampling
+        time.sleep(3)
+        memory = [memory_mb(pid) for pid in worker_pids(proc.pid)]
+    finally:
+        proc.terminate()
+        proc.wait()
+        os.unlink(empty.name)
+
+    rss = sum(m["rss"] for m in memory) / len(memory)
+    pss = sum(m["pss"] for m in memory) / len(memory)
+    print(f"{setup:<8} {first_foods:>13.2f}s {first_analyze:>14.2f}s {len(memory):>8} "
+          f"{rss:>9.1f} MB {pss:>9.1f} MB")
+
+
+def catalog_load():
+    code = {
+        "pandas": "import pandas as pd; pd.read_csv(r'{0}').to_dict('records')",
+        "FoodDB": "from food_db import FoodDB; FoodDB.from_csv(r'{0}')",
+    }
+    for name, stmt in code.items():
+        timed = ("import time; s = time.perf_counter(); " + stmt.format(CATALOG)
+                 + "; print(time.perf_counter() - s)")
+        out = subprocess.run([sys.executable, "-c", timed], cwd=ROOT, capture_output=True, text=True)
+        print(f"  {name:<7} import + load: {float(out.stdout) * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    n_workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    print("Catalog load (fresh interpreter):")
+    catalog_load()
+    print(f"\ngunicorn, {n_workers} workers:")
+    print(f"{'setup':<8} {'first /api/foods':>14} {'first /analyze':>15} {'workers':>8} "
+          f"{'RSS/worker':>12} {'PSS/worker':>12}")
+    for setup in ("eager", "lazy", "preload"):
+        run(setup, n_workers)
@@ -0,0 +1,96 @@
+"""Benchmark: crawl_data/crawler.Crawler vs. the old one-blocking-GET-per-source download.
+
+Serves N synthetic nutrition CSVs from crawl_data/local_server.py with a fixed
+per-request latency, then downloads them:
+  sequential - one urllib GET per source, whole body in memory, lines counted
+               by reading the file back with readlines() (the old crawl.py)
+  crawler    - thread pool, keep-alive connections, streamed to disk
+  recrawl    - the crawler again: conditional requests, every source 304
+  faults     - fresh crawl with 503s and a dropped connection mid-body
+Reports wall time, connections and requests seen by the server, and peak
+traced memory.
+
+Usage: python benchmarks/bench_crawler.py [n_sources] [rows_per_source] [latency_ms]
+"""
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "crawl_data"))
+
+from crawler import Crawler  # noqa: E402
+from local_server import serve  # noqa: E402
+
+
+def write_sources(directory, n, rows):
+    for i in range(n):
+        with open(os.path.join(directory, f"source_{i}.csv"), "w", encoding="utf-8") as f:
+            f.write("dish,unit,calo,lipid,carbohydrate,protein,fiber\n")
+            f.writelines(f"Món {i}-{j},1 Đĩa,{j % 900},{j % 40},{j % 120},{j % 60},{j % 10}\n"
+                         for j in range(rows))
+
+
+def sequential(sources):
+    for source in sources:
+        with urllib.request.urlopen(source["url"], timeout=10) as response:
+            body = response.read()
+        with open(source["output"], "wb") as f:
+            f.write(body)
+        with open(source["output"], encoding="utf-8") as f:
+            len(f.readlines())
+
+
+def measure(name, server, func):
+    before = dict(server.stats)
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    delta = {k: server.stats[k] - before.get(k, 0) for k in server.stats}
+    codes = ", ".join(f"{k}: {v}" for k, v in sorted(delta.items(), key=str) if isinstance(k, int) and v)
+    print(f"{name:<11} {seconds:>8.2f}s {delta.get('connections', 0):>12} {delta.get('requests', 0):>9} "
+          f"{peak:>9.1f} MB   {codes}")
+    return result
+
+
+def main(n_sources, rows, latency):
+    logging.disable(logging.WARNING)
+    with tempfile.TemporaryDirectory() as src, tempfile.TemporaryDirectory() as dst:
+        write_sources(src, n_sources, rows)
+        size = sum(os.path.getsize(os.path.join(src, f)) for f in os.listdir(src)) / 2**20
+        server = serve(src, latency=latency)
+
+        def sources(tag):
+            os.makedirs(os.path.join(dst, tag), exist_ok=True)
+            return [{"url": f"{server.base_url}/source_{i}.csv",
+                     "output": os.path.join(dst, tag, f"source_{i}.csv")} for i in range(n_sources)]
+
+        print(f"{n_sources} sources, {size:.1f} MB total, {latency * 1000:.0f} ms latency per request")
+        print(f"{'run':<11} {'wall':>9} {'connections':>12} {'requests':>9} {'peak mem':>12}   statuses")
+        measure("sequential", server, lambda: sequential(sources("sequential")))
+        state = os.path.join(dst, "state.json")
+        crawl_sources = sources("crawler")
+        measure("crawler", server, lambda: Crawler(state, max_workers=8).crawl(crawl_sources))
+        measure("recrawl", server, lambda: Crawler(state, max_workers=8).crawl(crawl_sources))
+
+        server.fail_first.update({f"source_{i}.csv": 1 for i in range(0, n_sources, 5)})
+        server.truncate.update({f"source_{i}.csv": 4096 for i in range(1, n_sources, 5)})
+        results = measure("faults", server, lambda: Crawler(os.path.join(dst, "state_faults.json"), max_workers=8,
+                                                           backoff=0.05).crawl(sources("faults")))
+        print("            " + ", ".join(f"{s}: {sum(r['status'] == s for r in results)}"
+                                      for s in ("downloaded", "resumed", "failed")))
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 40, int(args[1]) if len(args) > 1 else 50_000,
+         (float(args[2]) if len(args) > 2 else 50) / 1000)
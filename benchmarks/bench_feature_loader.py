@@ -0,0 +1,105 @@
+"""Benchmark: training data load, pd.read_csv + copies vs. the feature loader.
+
+Writes a synthetic processed_diabetes.csv (benchmarks/datagen.py), then in a
+fresh process per method builds the shared feature matrix plus the train/test
+X of the three models:
+  read_csv - the previous train(): pd.read_csv of every column (int64/float64),
+             to_numpy(float32) in split order, then a fancy-indexed copy of
+             each model's feature columns
+  loader   - train_model.load_features: projected columns with int8/float32
+             dtypes read in chunks; the diabetes model's columns are a
+             zero-copy window, the other two models copy their columns
+  cache    - load_features from its warm .npy cache (memory-mapped)
+and reports load time, the memory the result holds, the load's traced peak
+and the child's peak RSS (VmHWM; ru_maxrss would include the parent's, which
+survives the spawn's exec on Linux).
+
+Usage: python benchmarks/bench_feature_loader.py [rows]   (default 1,000,000)
+"""
+import gc
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks import datagen  # noqa: E402
+
+
+def load(method, path, cache_dir):
+    import numpy as np
+    import pandas as pd
+    from sklearn.model_selection import train_test_split
+    from model import train_model
+
+    if method == "read_csv":
+        df = pd.read_csv(path)
+        cols = train_model.ALL_COLS
+        X = df[cols].to_numpy(dtype=np.float32)
+        del df
+        train_idx, test_idx = train_test_split(np.arange(len(X)), test_size=train_model.TEST_SIZE,
+                                               random_state=train_model.RANDOM_STATE)
+        matrix, n_train = np.ascontiguousarray(X[np.concatenate([train_idx, test_idx])]), len(train_idx)
+        del X
+        data = []
+        for feature_cols, _ in train_model.MODEL_SPECS.values():
+            idx = [cols.index(c) for c in feature_cols]
+            data.append((matrix[:n_train, idx], matrix[n_train:, idx]))
+        return matrix, data
+
+    matrix, n_train, _ = train_model.load_features(path, cache_dir if method == "cache" else None)
+    data = [train_model.model_data(matrix, n_train, name)[:2] for name in train_model.MODEL_SPECS]
+    return matrix, data
+
+
+def peak_rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            return next(int(line.split()[1]) for line in f if line.startswith("VmHWM:")) / 1024
+    except (OSError, StopIteration):
+        return float("nan")
+
+
+def measure(method, path, cache_dir, results):
+    import logging
+    import pandas  # noqa: F401
+    import sklearn.model_selection  # noqa: F401
+    from model import train_model  # noqa: F401
+    logging.disable(logging.WARNING)
+
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = load(method, path, cache_dir)
+    load_s = time.perf_counter() - start
+    gc.collect()
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    results.put({"load_s": load_s, "held_mb": held / 2**20, "peak_mb": peak / 2**20,
+                 "rss_mb": peak_rss_mb()})
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = datagen.patients_csv(tmp, rows, processed=True)
+        cache_dir = os.path.join(tmp, "feature_cache")
+        from model import train_model
+        train_model.load_features(path, cache_dir)  # warm the cache outside the measurement
+        print(f"{rows:,} rows, CSV {os.path.getsize(path) / 2**20:.1f} MB")
+        print(f"{'method':<9} {'load':>8} {'held':>10} {'load peak':>11} {'peak RSS':>10}")
+        ctx = mp.get_context("spawn")
+        for method in ("read_csv", "loader", "cache"):
+            results = ctx.Queue()
+            proc = ctx.Process(target=measure, args=(method, path, cache_dir, results))
+            proc.start()
+            r = results.get()
+            proc.join()
+            print(f"{method:<9} {r['load_s']:>7.2f}s {r['held_mb']:>7.1f} MB {r['peak_mb']:>8.1f} MB "
+                  f"{r['rss_mb']:>7.1f} MB")
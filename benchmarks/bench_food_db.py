@@ -0,0 +1,99 @@
+"""Benchmark: catalog memory and nutrient totals, list of dicts vs. FoodDB.
+
+Writes a synthetic cleaned_foods.csv (benchmarks/datagen.py), then loads it in
+a fresh process per layout:
+  dicts  - pd.read_csv(...).to_dict('records'), the previous FOOD_DB
+  FoodDB - FoodDB.from_csv: names list + float32 nutrient matrix
+and reports load time, the memory the loaded catalog holds (tracemalloc,
+after the loader's temporaries are freed), the load's peak, and how fast the
+five /analyze nutrients are totalled over random 5-dish meals.
+
+Usage: python benchmarks/bench_food_db.py [n_dishes]   (default 1,000,000)
+"""
+import gc
+import multiprocessing as mp
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks import datagen  # noqa: E402
+
+N_MEALS = 100_000
+FOODS_PER_MEAL = 5
+KEYS = ["calo", "sugar", "fat", "protein", "salt"]
+
+
+def load(layout, path):
+    if layout == "dicts":
+        import pandas as pd
+        return pd.read_csv(path).to_dict('records')
+    from food_db import FoodDB
+    return FoodDB.from_csv(path)
+
+
+def totals_dicts(db, ids):
+    """The previous sum_nutrition loop."""
+    total = {key: 0 for key in KEYS}
+    for i in ids:
+        food = db[i]
+        for key in KEYS:
+            total[key] += float(food.get(key, 0))
+    return total
+
+
+def measure(layout, path, results):
+    from food_db import CALO, SUGAR, FAT, PROTEIN, SALT
+    # Import first, so only the loaded catalog is traced
+    if layout == "dicts":
+        import pandas  # noqa: F401
+
+    tracemalloc.start()
+    db = load(layout, path)
+    gc.collect()
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del db
+    gc.collect()
+
+    start = time.perf_counter()
+    db = load(layout, path)
+    load_s = time.perf_counter() - start
+
+    rng = random.Random(7)
+    meals = [rng.sample(range(len(db)), FOODS_PER_MEAL) for _ in range(N_MEALS)]
+    start = time.perf_counter()
+    if layout == "dicts":
+        for ids in meals:
+            totals_dicts(db, ids)
+    else:
+        columns = [CALO, SUGAR, FAT, PROTEIN, SALT]
+        for ids in meals:
+            db.totals(ids, columns)
+    totals_s = time.perf_counter() - start
+    results.put({"load_s": load_s, "held_mb": held / 2**20, "peak_mb": peak / 2**20,
+                 "meals_per_s": N_MEALS / totals_s})
+
+
+if __name__ == "__main__":
+    n_dishes = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cleaned_foods.csv")
+        datagen.make_catalog(n_dishes).to_csv(path, index=False)
+        print(f"{n_dishes:,} dishes, CSV {os.path.getsize(path) / 2**20:.1f} MB")
+        print(f"{'layout':<8} {'load':>8} {'held':>10} {'load peak':>11} {'5-dish totals':>16}")
+        ctx = mp.get_context("spawn")
+        for layout in ("dicts", "FoodDB"):
+            results = ctx.Queue()
+            proc = ctx.Process(target=measure, args=(layout, path, results))
+            proc.start()
+            r = results.get()
+            proc.join()
+            print(f"{layout:<8} {r['load_s']:>7.2f}s {r['held_mb']:>7.1f} MB {r['peak_mb']:>8.1f} MB "
+                  f"{r['meals_per_s']:>10,.0f} meals/s")
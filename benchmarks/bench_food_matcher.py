@@ -0,0 +1,63 @@
+"""Benchmark: FoodMatcher (Aho–Corasick) vs. the old linear scan over FOOD_DB.
+
+Usage: python benchmarks/bench_food_matcher.py
+"""
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from food_matcher import FoodMatcher  # noqa: E402
+
+SYLLABLES = ["phở", "bò", "gà", "bánh", "mì", "cơm", "tấm", "bún", "chả", "xôi",
+             "canh", "chua", "cá", "kho", "tộ", "rau", "muống", "xào", "tỏi", "heo",
+             "quay", "nướng", "lá", "lốt", "gỏi", "cuốn", "tôm", "thịt", "chè", "đậu"]
+CATALOG_SIZES = [1_000, 10_000, 100_000]
+N_QUERIES = 200
+
+
+def make_catalog(n, seed=42):
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < n:
+        names.add(" ".join(rng.choices(SYLLABLES, k=rng.randint(2, 5))).capitalize())
+    return sorted(names)
+
+
+def make_queries(names, n, seed=7):
+    rng = random.Random(seed)
+    return [", ".join(rng.sample(names, 3)) + " và " + rng.choice(names).lower() for _ in range(n)]
+
+
+def linear_scan(names, text):
+    """The previous find_food_in_text matching loop."""
+    text = text.lower()
+    return [i for i, name in enumerate(names) if name.lower() in text]
+
+
+def bench(func, queries):
+    start = time.perf_counter()
+    for q in queries:
+        func(q)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+
+def main():
+    print(f"{'catalog':>8} | {'build (s)':>9} | {'scan (µs/q)':>11} | {'matcher (µs/q)':>14} | speedup")
+    for size in CATALOG_SIZES:
+        names = make_catalog(size)
+        queries = make_queries(names, N_QUERIES)
+
+        start = time.perf_counter()
+        matcher = FoodMatcher(names)
+        build = time.perf_counter() - start
+
+        scan_us = bench(lambda q: linear_scan(names, q), queries)
+        match_us = bench(matcher.find, queries)
+        print(f"{size:>8} | {build:>9.2f} | {scan_us:>11.1f} | {match_us:>14.1f} | {scan_us / match_us:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Benchmark: incremental model update vs. full retrain.
+
+In a temporary model directory: trains the full model on a synthetic
+processed CSV, then logs synthetic analyses with confirmed outcomes into a
+temporary user_logs.db and folds them in with train_model.train_incremental,
+twice (each round only reads the outcomes the previous version had not seen).
+Reports wall time, accuracy on the held-out new rows before/after (through
+RiskPredictor, as served) and trees per forest.
+
+Usage: python benchmarks/bench_incremental_train.py [base_rows] [new_rows ...]
+       (defaults: 100000 base rows, rounds of 1000 and 10000 new rows)
+"""
+import json
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks import datagen  # noqa: E402
+
+
+def log_outcomes(db_path, n, seed):
+    """Insert n logged analyses, each with a confirmed outcome (measured HbA1c/glucose)."""
+    chunk = datagen._patient_chunk(np.random.default_rng(seed), n, processed=True)
+    conn = sqlite3.connect(db_path)
+    with conn:
+        for row in chunk.itertuples(index=False):
+            user_info = {"age": row.age, "gender": "Male" if row.gender else "Female",
+                         "smoking": int(row.smoking_history)}
+            stats = {"bmi": row.bmi, "simulated_health": {"glucose": 100.0, "hba1c": 5.0}}
+            log_id = conn.execute(
+                "INSERT INTO logs (timestamp, user_info, food_input, nutrition_stats, predictions) "
+                "VALUES ('', ?, '', ?, '{}')", (json.dumps(user_info), json.dumps(stats))).lastrowid
+            conn.execute(
+                "INSERT INTO outcomes (log_id, confirmed_at, diabetes, heart_disease, hypertension, hba1c, glucose) "
+                "VALUES (?, '', ?, ?, ?, ?, ?)",
+                (log_id, int(row.diabetes), int(row.heart_disease), int(row.hypertension),
+                 float(row.HbA1c_level), float(row.blood_glucose_level)))
+    conn.close()
+
+
+def main(base_rows, rounds):
+    warnings.filterwarnings("ignore")
+    logging.disable(logging.WARNING)
+    import app
+    from model import train_model
+
+    with tempfile.TemporaryDirectory() as tmp:
+        train_model.DATA_PATH = datagen.patients_csv(tmp, base_rows, processed=True)
+        train_model.MODEL_DIR = tmp
+        train_model.MODEL_PATH = os.path.join(tmp, "health_model.pkl")
+        train_model.FOREST_PATH = os.path.join(tmp, "health_model.forest")
+        train_model.REPORT_PATH = os.path.join(tmp, "train_report.json")
+        train_model.VERSIONS_DIR = os.path.join(tmp, "versions")
+        train_model.MANIFEST_PATH = os.path.join(tmp, "versions", "manifest.json")
+        app.DB_PATH = db_path = os.path.join(tmp, "user_logs.db")
+        app.init_db()
+
+        full = train_model.train(workers=1, n_jobs=1)
+        print(f"{'run':<22} {'rows':>8} {'wall':>9} {'speedup':>8}  held-out accuracy (before -> after, trees)")
+        print(f"{'full ' + full['version']:<22} {full['rows']:>8,} {full['total_wall_s']:>8.2f}s {'':>8}  "
+              + ", ".join(f"{k} {v:.4f}" for k, v in full["accuracy"].items()))
+        for i, new_rows in enumerate(rounds):
+            log_outcomes(db_path, new_rows, seed=100 + i)
+            report = train_model.train_incremental(db_path, n_jobs=1)
+            changes = ", ".join(
+                f"{k} {report['accuracy_before'][k]:.4f} -> {v:.4f} ({report['n_estimators'][k]})"
+                for k, v in report["accuracy"].items())
+            print(f"{'incremental ' + report['version']:<22} {report['rows']:>8,} {report['total_wall_s']:>8.2f}s "
+                  f"{report['speedup_vs_full']:>7.1f}x  {changes}")
+        with open(train_model.MANIFEST_PATH, encoding="utf-8") as f:
+            manifest = json.load(f)
+        print(f"\nmanifest: current {manifest['current']}, "
+              + ", ".join(f"{e['version']} ({e['mode']}, parent {e['parent']})" for e in manifest["versions"]))
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    main(args[0] if args else 100_000, args[1:] or [1_000, 10_000])
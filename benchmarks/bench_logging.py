@@ -0,0 +1,102 @@
+"""Load test: /analyze latency with the analysis log off, async (LogWriter) and synchronous.
+
+"sync" is the naive alternative for comparison: one INSERT + COMMIT per request.
+Uses a temporary SQLite database.
+Usage: python benchmarks/bench_logging.py [threads] [requests_per_thread]
+"""
+import logging
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import warnings
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import app  # noqa: E402
+from log_writer import INSERT_SQL, LogWriter  # noqa: E402
+
+
+class SyncWriter:
+    """One committed transaction per submitted row."""
+
+    def __init__(self, db_path):
+        self.conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self.lock = threading.Lock()
+
+    def submit(self, row):
+        with self.lock, self.conn:
+            self.conn.execute(INSERT_SQL, row)
+
+    def close(self):
+        self.conn.close()
+
+
+def make_payloads(n, seed=42):
+    rng = random.Random(seed)
+    names = app.FOOD_DB.names
+    return [
+        {
+            "userInfo": {"age": rng.randint(18, 85), "height": rng.randint(145, 195), "weight": rng.randint(40, 120),
+                         "gender": rng.choice(["Male", "Female"]), "smoking": rng.randint(0, 3)},
+            "foodText": ", ".join(rng.sample(names, rng.randint(1, 5))),
+        }
+        for _ in range(n)
+    ]
+
+
+def run(mode, n_threads, per_thread):
+    db_path = Path(tempfile.mkdtemp()) / "logs.db"
+    app.DB_PATH = db_path
+    app.init_db()
+    app.LOG_WRITER = {"off": None, "async": LogWriter(db_path).start() if mode == "async" else None,
+                      "sync": SyncWriter(db_path) if mode == "sync" else None}[mode]
+
+    latencies = []
+    lock = threading.Lock()
+
+    def client(payloads):
+        c = app.app.test_client()
+        local = []
+        for p in payloads:
+            start = time.perf_counter()
+            c.post('/analyze', json=p)
+            local.append((time.perf_counter() - start) * 1e3)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client, args=(make_payloads(per_thread, seed=i),)) for i in range(n_threads)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    if app.LOG_WRITER is not None:
+        app.LOG_WRITER.close()
+    rows = sqlite3.connect(str(db_path)).execute("SELECT COUNT(*) FROM logs").fetchone()[0]
+    app.LOG_WRITER = None
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"{mode:>5} | {len(latencies) / elapsed:7.1f} req/s | p50 {p50:7.2f} ms | p99 {p99:7.2f} ms | rows {rows}")
+
+
+def main():
+    n_threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    per_thread = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    logging.disable(logging.WARNING)
+    warnings.filterwarnings("ignore")
+    app.load_resources()
+    print(f"{n_threads} threads x {per_thread} requests")
+    for mode in ("off", "async", "sync"):
+        run(mode, n_threads, per_thread)
+
+
+if __name__ == "__main__":
+    main()
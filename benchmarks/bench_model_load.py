@@ -0,0 +1,87 @@
+"""Benchmark: model load time and per-worker memory, joblib pickle vs. flat .forest.
+
+Starts N worker processes per format (like gunicorn workers), each loads the
+model and scores a batch of profiles, then reports load time, RSS and PSS
+(proportional set size: shared pages are split between the processes).
+Linux only (reads /proc/self/smaps_rollup).
+
+Usage: python benchmarks/bench_model_load.py [n_workers]
+"""
+import multiprocessing as mp
+import sys
+import time
+import warnings
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+MODEL_PATH = ROOT / "model" / "health_model.pkl"
+FOREST_PATH = ROOT / "model" / "health_model.forest"
+
+
+def memory_mb():
+    stats = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ("Rss:", "Pss:"):
+                stats[parts[0][:-1].lower()] = int(parts[1]) / 1024
+    return stats
+
+
+def worker(fmt, barrier, results):
+    warnings.filterwarnings("ignore")
+    import numpy as np
+    from predictor import RiskPredictor
+
+    start = time.perf_counter()
+    if fmt == "joblib":
+        import joblib
+        scaler, models = joblib.load(MODEL_PATH)
+    else:
+        from forest_format import load_forests
+        scaler, models = load_forests(FOREST_PATH)
+    predictor = RiskPredictor(scaler, models)
+    load_s = time.perf_counter() - start
+
+    rng = np.random.default_rng(0)
+    predictor.predict_proba(np.column_stack([
+        rng.integers(0, 2, 1000), rng.uniform(18, 85, 1000), rng.uniform(16, 40, 1000),
+        rng.integers(0, 4, 1000), rng.uniform(4, 9, 1000), rng.uniform(70, 250, 1000),
+    ]))
+
+    barrier.wait()  # every worker holds its model before memory is sampled
+    results.put({"load_s": load_s, **memory_mb()})
+    barrier.wait()
+
+
+def run(fmt, n_workers):
+    ctx = mp.get_context("spawn")
+    barrier = ctx.Barrier(n_workers)
+    results = ctx.Queue()
+    procs = [ctx.Process(target=worker, args=(fmt, barrier, results)) for _ in range(n_workers)]
+    for p in procs:
+        p.start()
+    stats = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+
+    avg = {k: sum(s[k] for s in stats) / n_workers for k in stats[0]}
+    print(f"{fmt:>7} | load {avg['load_s']:6.2f} s | RSS {avg['rss']:7.1f} MB | PSS {avg['pss']:7.1f} MB "
+          f"| total PSS {avg['pss'] * n_workers:7.1f} MB")
+
+
+def main():
+    n_workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    if not MODEL_PATH.exists() and not FOREST_PATH.exists():
+        sys.exit("Model not found - run model/train_model.py first.")
+    print(f"{n_workers} workers per format (averages per worker)")
+    if MODEL_PATH.exists():
+        run("joblib", n_workers)
+    if FOREST_PATH.exists():
+        run("forest", n_workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Microbenchmark: per-request latency of the risk chain before and after RiskPredictor.
+
+"before" is the original analyze() chain: three SCALER.transform calls on
+freshly built 9-column arrays plus sklearn predict_proba on each forest.
+Needs model/health_model.pkl.
+Usage: python benchmarks/bench_predictor.py
+"""
+import statistics
+import sys
+import time
+import warnings
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from predictor import RiskPredictor  # noqa: E402
+
+N_REQUESTS = 300
+
+
+def legacy_chain(scaler, model, gender, age, bmi, smoking, hba1c, glucose):
+    scaled = scaler.transform(np.array([[gender, age, bmi, smoking, hba1c, glucose, 0, 0, 0]]))
+    prob_d = model['diabetes'].predict_proba(scaled[:, [0, 1, 2, 3, 4, 5, 6, 7]])[0][1]
+    is_diabetes = 1 if prob_d > 0.5 else 0
+    scaled = scaler.transform(np.array([[gender, age, bmi, smoking, hba1c, glucose, 0, 0, is_diabetes]]))
+    prob_c = model['cardio'].predict_proba(scaled[:, [0, 1, 2, 3, 4, 5, 6, 8]])[0][1]
+    is_cardio = 1 if prob_c > 0.5 else 0
+    scaled = scaler.transform(np.array([[gender, age, bmi, smoking, hba1c, glucose, 0, is_cardio, is_diabetes]]))
+    prob_h = model['hypertension'].predict_proba(scaled[:, [0, 1, 2, 3, 4, 5, 8, 7]])[0][1]
+    return prob_d, prob_c, prob_h
+
+
+def latencies(func, rows):
+    out = []
+    for row in rows:
+        start = time.perf_counter()
+        func(row)
+        out.append((time.perf_counter() - start) * 1e3)
+    return out
+
+
+def report(label, values):
+    values = sorted(values)
+    p99 = values[int(len(values) * 0.99) - 1]
+    print(f"{label:>8} | mean {statistics.mean(values):7.3f} ms | p50 {statistics.median(values):7.3f} ms | p99 {p99:7.3f} ms")
+
+
+def main():
+    warnings.filterwarnings("ignore")
+    model_path = ROOT / "model" / "health_model.pkl"
+    if not model_path.exists():
+        sys.exit("Model not found - run model/train_model.py first.")
+    scaler, models = joblib.load(model_path)
+    predictor = RiskPredictor(scaler, models)
+
+    rng = np.random.default_rng(0)
+    rows = np.column_stack([
+        rng.integers(0, 2, N_REQUESTS), rng.uniform(18, 85, N_REQUESTS), rng.uniform(16, 40, N_REQUESTS),
+        rng.integers(0, 4, N_REQUESTS), rng.uniform(4, 9, N_REQUESTS), rng.uniform(70, 250, N_REQUESTS),
+    ])
+
+    report("before", latencies(lambda r: legacy_chain(scaler, models, *r), rows))
+    report("after", latencies(predictor.predict_proba, rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Benchmark: ranking what-if meal plans, analyze_batch over every day vs. app.analyze_scenarios.
+
+For one profile, builds a 7-day base plan plus N-1 variants that each swap the
+dishes of one day, then scores every plan:
+  analyze_batch     - every plan-day as a record in one app.analyze_batch call
+                      (analysis cache off), then a mean per plan in Python
+  analyze_scenarios - distinct days matched once, nutrition, indicators and
+                      risk chain as array operations, ranked
+Both produce the same per-day predictions.
+
+Needs data/cleaned_foods.csv and a trained model in model/.
+Usage: python benchmarks/bench_scenarios.py
+"""
+import logging
+import random
+import sys
+import time
+import warnings
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import app  # noqa: E402
+
+SCENARIO_COUNTS = [10, 100, 1000, 5000]
+PLAN_DAYS = 7
+PROFILE = {"age": 56, "height": 162, "weight": 78, "gender": "Male", "smoking": 1}
+
+
+def make_scenarios(n, seed=42):
+    rng = random.Random(seed)
+    names = app.FOOD_DB.names
+    base = [", ".join(rng.sample(names, rng.randint(2, 4))) for _ in range(PLAN_DAYS)]
+    scenarios = [{"name": "base", "days": base}]
+    for k in range(1, n):
+        days = list(base)
+        days[rng.randrange(PLAN_DAYS)] = ", ".join(rng.sample(names, rng.randint(2, 4)))
+        scenarios.append({"name": f"swap {k}", "days": days})
+    return scenarios
+
+
+def rank_with_analyze_batch(scenarios):
+    records = [{"userInfo": PROFILE, "foodText": day} for s in scenarios for day in s["days"]]
+    results = app.analyze_batch(records)
+    scores = []
+    for k in range(len(scenarios)):
+        days = results[k * PLAN_DAYS:(k + 1) * PLAN_DAYS]
+        scores.append(sum(sum(r["predictions"].values()) / 3 for r in days) / PLAN_DAYS)
+    return sorted(range(len(scenarios)), key=scores.__getitem__)
+
+
+def main():
+    logging.disable(logging.WARNING)
+    warnings.filterwarnings("ignore")
+    app.load_resources()
+    if app.PREDICTOR is None:
+        sys.exit("Model not found - run model/train_model.py first.")
+    app.ANALYSIS_CACHE.max_size = 0
+
+    print(f"{'plans':>6} | {'plan-days':>9} | {'analyze_batch':>13} | {'analyze_scenarios':>17} | speedup")
+    for n in SCENARIO_COUNTS:
+        scenarios = make_scenarios(n)
+
+        start = time.perf_counter()
+        rank_with_analyze_batch(scenarios)
+        batch_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        app.analyze_scenarios(PROFILE, scenarios)
+        scenario_s = time.perf_counter() - start
+
+        print(f"{n:>6} | {n * PLAN_DAYS:>9} | {batch_s * 1000:>11.1f}ms | {scenario_s * 1000:>15.1f}ms | "
+              f"{batch_s / scenario_s:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
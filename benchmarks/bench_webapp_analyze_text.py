@@ -0,0 +1,92 @@
+"""Benchmark: legacy webapp /analyze_text latency, reload-per-request vs. NutrientStore.
+
+Writes a temporary foods_vn.json built from data/cleaned_foods.csv (repeated
+with suffixes to reach the requested size) and points webapp/app.py at it.
+Usage: python benchmarks/bench_webapp_analyze_text.py [n_foods]
+"""
+import csv
+import importlib.util
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+N_REQUESTS = 300
+
+
+def load_webapp():
+    spec = importlib.util.spec_from_file_location("legacy_webapp", ROOT / "webapp" / "app.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_foods(n):
+    with open(ROOT / "data" / "cleaned_foods.csv", encoding="utf-8") as f:
+        base = list(csv.DictReader(f))
+    foods = []
+    for i in range(n):
+        row = base[i % len(base)]
+        suffix = "" if i < len(base) else f" {i // len(base)}"
+        foods.append({"name": row["name"] + suffix,
+                      **{k: float(row[k]) for k in ("sugar", "salt", "fat", "milk", "alcohol")}})
+    return foods
+
+
+def legacy_totals(path, t):
+    """The previous route body: reopen foods_vn.json and sum in a Python loop."""
+    with open(path, encoding='utf-8') as f:
+        foods = json.load(f)
+    totals = {"sugar": 0, "salt": 0, "fat": 0, "milk": 0, "alcohol": 0}
+    for f in foods:
+        if f["name"].lower() in t:
+            for k in totals:
+                totals[k] += f[k]
+    return totals
+
+
+def timed(func, texts):
+    out = []
+    for t in texts:
+        start = time.perf_counter()
+        func(t)
+        out.append((time.perf_counter() - start) * 1e3)
+    return out
+
+
+def report(label, values):
+    values = sorted(values)
+    print(f"{label:>7} | mean {statistics.mean(values):7.3f} ms | p50 {values[len(values) // 2]:7.3f} ms "
+          f"| p99 {values[int(len(values) * 0.99) - 1]:7.3f} ms")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 730
+    foods = make_foods(n)
+    path = Path(tempfile.mkdtemp()) / "foods_vn.json"
+    path.write_text(json.dumps(foods, ensure_ascii=False), encoding="utf-8")
+
+    webapp = load_webapp()
+    webapp.DATA = path
+    webapp.FOODS = webapp.NutrientStore(path)
+    client = webapp.app.test_client()
+
+    rng = random.Random(0)
+    texts = [", ".join(rng.sample([f["name"] for f in foods], 3)).lower() for _ in range(N_REQUESTS)]
+
+    print(f"{n} foods, {N_REQUESTS} requests")
+    report("before", timed(lambda t: legacy_totals(path, t), texts))
+    report("after", timed(webapp.FOODS.totals, texts))
+    report("route", timed(lambda t: client.post('/analyze_text', json={"text": t}), texts))
+
+    for t in texts[:20]:
+        old, new = legacy_totals(path, t), webapp.FOODS.totals(t)
+        assert old == new, (old, new)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Benchmark cases: one function per project entry point.
+
+Each case runs in a fresh process (see run.py) and returns
+{"seconds": wall time of the measured work, "items": units processed, ...extra}.
+prepare() runs first in the parent and generates any input files, so file
+generation never counts towards a case's time or peak memory.
+"""
+import contextlib
+import io
+import logging
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks import datagen
+
+
+def _best_of(repeat, func):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _quiet():
+    logging.disable(logging.WARNING)
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+# --- Parsing: app.find_food_in_text ---
+def food_match(data_dir, catalog_size, foods_per_meal, n_meals=30000, repeat=5):
+    import app
+
+    catalog_dir = Path(data_dir) / f"catalog_{catalog_size}"
+    app.DATA_DIR = catalog_dir
+    with _quiet():
+        start = time.perf_counter()
+        app.load_resources()
+        load_s = time.perf_counter() - start
+
+    names = datagen.make_food_names(catalog_size)
+    meals = datagen.make_meals(names, n_meals, foods_per_meal)
+    seconds = _best_of(repeat, lambda: [app.find_food_in_text(m) for m in meals])
+    return {"seconds": seconds, "items": n_meals, "load_s": round(load_s, 4)}
+
+
+def prepare_food_match(data_dir, catalog_size, **params):
+    path = Path(data_dir) / f"catalog_{catalog_size}" / "cleaned_foods.csv"
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        datagen.make_catalog(catalog_size).to_csv(path, index=False)
+
+
+# --- Inference: app.analyze_batch on the shipped catalog and model ---
+def analyze(data_dir, mode, n_records, repeat=3):
+    import app
+
+    with _quiet():
+        app.load_resources()
+    if app.PREDICTOR is None:
+        return {"skipped": "no trained model in model/"}
+    app.ANALYSIS_CACHE.max_size = 0  # measure the pipeline, not the cache
+
+    rng = random.Random(42)
+    names = app.FOOD_DB.names
+    records = [
+        {"userInfo": {"age": rng.randint(18, 85), "height": rng.randint(145, 195), "weight": rng.randint(40, 120),
+                      "gender": rng.choice(["Male", "Female"]), "smoking": rng.randint(0, 3)},
+         "foodText": text}
+        for text in datagen.make_meals(names, n_records, 3)
+    ]
+    if mode == "single":
+        seconds = _best_of(repeat, lambda: [app.analyze_batch([r]) for r in records])
+    else:
+        seconds = _best_of(repeat, lambda: app.analyze_batch(records))
+    return {"seconds": seconds, "items": n_records}
+
+
+# --- Training: model/train_model.train on a synthetic processed CSV ---
+def train(data_dir, rows):
+    from model import train_model
+
+    with tempfile.TemporaryDirectory(dir=data_dir) as out_dir, _quiet():
+        train_model.DATA_PATH = datagen.patients_csv(data_dir, rows, processed=True)
+        train_model.MODEL_DIR = out_dir
+        train_model.MODEL_PATH = os.path.join(out_dir, "health_model.pkl")
+        train_model.FOREST_PATH = os.path.join(out_dir, "health_model.forest")
+        train_model.REPORT_PATH = os.path.join(out_dir, "train_report.json")
+        train_model.VERSIONS_DIR = os.path.join(out_dir, "versions")
+        train_model.MANIFEST_PATH = os.path.join(out_dir, "versions", "manifest.json")
+        start = time.perf_counter()
+        # One process, one thread: comparable across machines with different CPU counts
+        report = train_model.train(workers=1, n_jobs=1)
+        seconds = time.perf_counter() - start
+    return {"seconds": seconds, "items": report["rows"], "accuracy": report["accuracy"]}
+
+
+def prepare_train(data_dir, rows):
+    datagen.patients_csv(data_dir, rows, processed=True)
+
+
+# --- Cleaning: data_engineer/clean_data ---
+def clean_patients(data_dir, rows, chunksize=500_000):
+    from data_engineer import clean_data
+
+    with tempfile.TemporaryDirectory(dir=data_dir) as out_dir, _quiet():
+        start = time.perf_counter()
+        stats = clean_data.clean_diabetes_data_streaming(
+            chunksize=chunksize, output_path=os.path.join(out_dir, "processed.csv"),
+            input_path=datagen.patients_csv(data_dir, rows))
+        seconds = time.perf_counter() - start
+    return {"seconds": seconds, "items": stats["rows_in"], "rows_out": stats["rows_out"]}
+
+
+def prepare_clean_patients(data_dir, rows, **params):
+    datagen.patients_csv(data_dir, rows)
+
+
+def clean_foods(data_dir, n_dishes, repeat=3):
+    from data_engineer import clean_data
+
+    with tempfile.TemporaryDirectory(dir=data_dir) as out_dir, _quiet():
+        clean_data.FOOD_FILE = os.path.join(data_dir, f"raw_catalog_{n_dishes}.csv")
+        clean_data.OUTPUT_FOOD = os.path.join(out_dir, "cleaned_foods.csv")
+        seconds = _best_of(repeat, clean_data.clean_food_data)
+    return {"seconds": seconds, "items": n_dishes}
+
+
+def prepare_clean_foods(data_dir, n_dishes):
+    path = os.path.join(data_dir, f"raw_catalog_{n_dishes}.csv")
+    if not os.path.exists(path):
+        datagen.make_raw_catalog(n_dishes).to_csv(path, index=False)
+
+
+# case name -> (run, prepare, throughput unit)
+CASES = {
+    "food_match": (food_match, prepare_food_match, "meals/s"),
+    "analyze": (analyze, None, "records/s"),
+    "train": (train, prepare_train, "rows/s"),
+    "clean_patients": (clean_patients, prepare_clean_patients, "rows/s"),
+    "clean_foods": (clean_foods, prepare_clean_foods, "dishes/s"),
+}
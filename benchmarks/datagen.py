@@ -0,0 +1,139 @@
+"""Seeded synthetic data for the benchmark suite.
+
+Catalogs and meal texts are built in memory; patient CSVs are written in
+chunks (so 10M rows never sit in RAM) and cached by (kind, rows, seed) in the
+data directory, so repeated runs reuse them.
+"""
+import os
+import random
+
+import numpy as np
+import pandas as pd
+
+SYLLABLES = ["phở", "bò", "gà", "bánh", "mì", "cơm", "tấm", "bún", "chả", "xôi",
+             "canh", "chua", "cá", "kho", "tộ", "rau", "muống", "xào", "tỏi", "heo",
+             "quay", "nướng", "lá", "lốt", "gỏi", "cuốn", "tôm", "thịt", "chè", "đậu",
+             "sữa", "kem", "trà", "bia", "rượu", "mắm", "rim", "chiên", "hấp", "luộc"]
+CONNECTORS = [", ", " và ", " với ", ", thêm ", " rồi ăn ", " + "]
+
+# Value sets and rates of data/diabetes_prediction_dataset.csv
+HBA1C_LEVELS = [3.5, 4.0, 4.5, 4.8, 5.0, 5.7, 5.8, 6.0, 6.1, 6.2, 6.5, 6.6, 6.8, 7.0, 7.5, 8.2, 8.8, 9.0]
+GLUCOSE_LEVELS = [80, 85, 90, 100, 126, 130, 140, 145, 155, 158, 159, 160, 200, 220, 240, 260, 280, 300]
+SMOKING = ["No Info", "never", "former", "current", "not current", "ever"]
+SMOKING_P = [0.358, 0.351, 0.094, 0.093, 0.064, 0.040]
+SMOKING_CODES = [1, 0, 2, 3, 2, 3]  # clean_data.SMOKING_RISK_MAP
+IMPUTED_BMI = 27.32
+PATIENT_COLS = ['gender', 'age', 'hypertension', 'heart_disease', 'smoking_history', 'bmi',
+                'HbA1c_level', 'blood_glucose_level', 'diabetes']
+CHUNK_ROWS = 500_000
+
+
+def make_food_names(n, seed=42):
+    """n distinct dish names of 2-5 Vietnamese syllables."""
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < n:
+        names.add(" ".join(rng.choices(SYLLABLES, k=rng.randint(2, 5))).capitalize())
+    return sorted(names)
+
+
+def make_catalog(n, seed=42):
+    """Cleaned catalog (the columns of data/cleaned_foods.csv) with n dishes."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "name": make_food_names(n, seed),
+        "calo": rng.integers(20, 900, n),
+        "sugar": rng.uniform(0, 120, n).round(1),
+        "fat": rng.uniform(0, 60, n).round(1),
+        "protein": rng.uniform(0, 60, n).round(1),
+        "salt": rng.choice([50.0, 500.0], n),
+        "milk": rng.choice([0.0, 200.0], n, p=[0.9, 0.1]),
+        "alcohol": rng.choice([0.0, 330.0], n, p=[0.95, 0.05]),
+    })
+
+
+def make_raw_catalog(n, seed=42):
+    """Crawled catalog (the columns of data/cac_mon_an.csv) with n dishes, ~2% duplicated rows."""
+    catalog = make_catalog(n, seed)
+    rng = np.random.default_rng(seed + 1)
+    raw = pd.DataFrame({
+        "dish": catalog["name"],
+        "unit": rng.choice(["1 Tô", "1 Đĩa", "1 Cái", "100g", "1 Ly"], n),
+        "calo": catalog["calo"],
+        "lipid": catalog["fat"],
+        "carbohydrate": catalog["sugar"],
+        "protein": catalog["protein"],
+        "fiber": rng.integers(0, 10, n),
+    })
+    dupes = raw.sample(frac=0.02, random_state=seed)
+    return pd.concat([raw, dupes], ignore_index=True)
+
+
+def make_meals(names, n, foods_per_meal, seed=7):
+    """n meal texts, each naming `foods_per_meal` dishes joined by connectors, in mixed case."""
+    rng = random.Random(seed)
+    meals = []
+    for _ in range(n):
+        picks = rng.sample(names, foods_per_meal)
+        text = picks[0]
+        for name in picks[1:]:
+            text += rng.choice(CONNECTORS) + (name.lower() if rng.random() < 0.5 else name)
+        meals.append(text)
+    return meals
+
+
+def _patient_chunk(rng, n, processed):
+    age = np.where(rng.random(n) < 0.05, rng.integers(1, 200, n) / 100, rng.integers(1, 81, n)).astype(float)
+    bmi = np.where(rng.random(n) < 0.25, IMPUTED_BMI, rng.normal(27.3, 6.6, n).clip(10, 95).round(2))
+    hba1c = rng.choice(HBA1C_LEVELS, n)
+    glucose = rng.choice(GLUCOSE_LEVELS, n)
+    smoking = rng.choice(len(SMOKING), n, p=SMOKING_P)
+    older = (age - 40) / 20
+    hypertension = rng.random(n) < 1 / (1 + np.exp(-(-3.2 + 1.1 * older + 0.05 * (bmi - 27))))
+    heart = rng.random(n) < 1 / (1 + np.exp(-(-4.0 + 1.3 * older + 0.3 * (smoking >= 3))))
+    diabetic = rng.random(n) < 1 / (1 + np.exp(-(-9.5 + 1.0 * hba1c + 0.012 * glucose + 0.5 * older)))
+    gender = rng.choice(3, n, p=[0.5855, 0.4143, 0.0002])  # Female, Male, Other
+
+    if processed:
+        keep = gender < 2
+        n_keep = int(keep.sum())
+        return pd.DataFrame({
+            "gender": (gender[keep] == 1).astype(int), "age": age[keep],
+            "hypertension": hypertension[keep].astype(int), "heart_disease": heart[keep].astype(int),
+            "smoking_history": np.array(SMOKING_CODES)[smoking[keep]], "bmi": bmi[keep],
+            "HbA1c_level": hba1c[keep], "blood_glucose_level": glucose[keep],
+            "diabetes": diabetic[keep].astype(int),
+        }, index=range(n_keep))
+    chunk = pd.DataFrame({
+        "gender": np.array(["Female", "Male", "Other"])[gender], "age": age,
+        "hypertension": hypertension.astype(int), "heart_disease": heart.astype(int),
+        "smoking_history": np.array(SMOKING)[smoking], "bmi": bmi,
+        "HbA1c_level": hba1c, "blood_glucose_level": glucose, "diabetes": diabetic.astype(int),
+    })
+    # ~4% exact duplicate records, as in the real dataset
+    rows = np.arange(n)
+    rows[rng.integers(0, n, n // 25)] = rng.integers(0, n, n // 25)
+    return chunk.iloc[rows].reset_index(drop=True)
+
+
+def patients_csv(data_dir, rows, seed=42, processed=False):
+    """
+    Path of a patient CSV with `rows` records, generated on first use.
+    processed=False: raw layout of diabetes_prediction_dataset.csv (input of clean_data);
+    processed=True: encoded layout of processed_diabetes.csv (input of train_model).
+    """
+    kind = "processed" if processed else "raw"
+    path = os.path.join(data_dir, f"patients_{kind}_{rows}_{seed}.csv")
+    if os.path.exists(path):
+        return path
+    os.makedirs(data_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    tmp = path + ".tmp"
+    written = 0
+    with open(tmp, "w", encoding="utf-8", newline="") as f:
+        while written < rows:
+            chunk = _patient_chunk(rng, min(CHUNK_ROWS, rows - written), processed)
+            chunk[PATIENT_COLS].to_csv(f, index=False, header=written == 0)
+            written += min(CHUNK_ROWS, rows - written)
+    os.replace(tmp, path)
+    return path
@@ -0,0 +1,219 @@
+"""Run the benchmark suite, write results as JSON and compare them with a baseline.
+
+Every case runs --runs times, each in its own spawned process so its peak RSS
+is its own; the case's throughput and peak RSS are the medians over those runs,
+and its noise is the median absolute deviation of the run throughputs relative
+to their median. A case regresses when its median throughput drops by more than
+the threshold, widened to NOISE_FACTOR times the larger noise of the baseline and
+the current results (at most MAX_ALLOWED_DROP), or its peak RSS grows by more
+than the memory threshold; any regression exits with status 1.
+
+Usage:
+  python -m benchmarks.run [--profile quick|standard|full] [--only NAME] [--runs 5]
+                           [--output results.json] [--baseline benchmarks/baseline.json]
+                           [--threshold 0.25] [--memory-threshold 0.25] [--save-baseline]
+"""
+import argparse
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.cases import CASES  # noqa: E402
+from perf_stats import peak_rss_mb  # noqa: E402
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+DEFAULT_DATA_DIR = os.path.join(tempfile.gettempdir(), "viethealth-bench")
+# Runs per case (separate processes); the gate compares medians
+DEFAULT_RUNS = 5
+# A throughput drop within this many times the measured noise is not a regression
+# (the difference of two 5-run medians has a standard error of ~1.2x the MAD: 4x is ~3.4 sigma)
+NOISE_FACTOR = 4
+# ... up to this drop: a case noisier than that is reported as a regression rather than never failing
+MAX_ALLOWED_DROP = 0.5
+
+# profile -> [(case, params)]
+PROFILES = {
+    "quick": [
+        ("food_match", {"catalog_size": 1_000, "foods_per_meal": 1}),
+        ("food_match", {"catalog_size": 1_000, "foods_per_meal": 5}),
+        ("food_match", {"catalog_size": 10_000, "foods_per_meal": 5}),
+        ("analyze", {"mode": "single", "n_records": 300}),
+        ("analyze", {"mode": "batch", "n_records": 1_000}),
+        ("clean_foods", {"n_dishes": 10_000}),
+        ("clean_patients", {"rows": 100_000}),
+        ("train", {"rows": 20_000}),
+    ],
+    "standard": [
+        *(("food_match", {"catalog_size": size, "foods_per_meal": foods})
+          for size in (1_000, 10_000, 100_000) for foods in (1, 5, 20)),
+        ("analyze", {"mode": "single", "n_records": 1_000}),
+        ("analyze", {"mode": "batch", "n_records": 10_000}),
+        ("clean_foods", {"n_dishes": 100_000}),
+        ("clean_patients", {"rows": 100_000}),
+        ("clean_patients", {"rows": 1_000_000}),
+        ("train", {"rows": 100_000}),
+    ],
+    "full": [
+        *(("food_match", {"catalog_size": size, "foods_per_meal": foods})
+          for size in (1_000, 10_000, 100_000) for foods in (1, 5, 20)),
+        ("analyze", {"mode": "single", "n_records": 1_000}),
+        ("analyze", {"mode": "batch", "n_records": 10_000}),
+        ("clean_foods", {"n_dishes": 1_000_000}),
+        ("clean_patients", {"rows": 100_000}),
+        ("clean_patients", {"rows": 1_000_000}),
+        ("clean_patients", {"rows": 10_000_000}),
+        ("train", {"rows": 100_000}),
+        ("train", {"rows": 1_000_000}),
+    ],
+}
+
+
+def case_id(case, params):
+    return case + "".join(f"/{k}={v}" for k, v in params.items())
+
+
+def _run_in_child(case, data_dir, params):
+    run = CASES[case][0]
+    result = run(data_dir, **params)
+    result["peak_rss_mb"] = round(peak_rss_mb() or 0.0, 1)
+    return result
+
+
+def run_case(case, params, data_dir, runs=DEFAULT_RUNS):
+    run, prepare, unit = CASES[case]
+    if prepare is not None:
+        prepare(data_dir, **params)
+    samples = []
+    for _ in range(runs):
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            result = pool.submit(_run_in_child, case, data_dir, params).result()
+        if "skipped" in result:
+            return result
+        samples.append(result)
+
+    throughputs = [r["items"] / r["seconds"] for r in samples]
+    median = statistics.median(throughputs)
+    # Extra fields (load_s, accuracy, ...) come from the run closest to the median
+    result = dict(min(samples, key=lambda r: abs(r["items"] / r["seconds"] - median)))
+    result.update(
+        throughput=round(median, 2),
+        unit=unit,
+        seconds=round(statistics.median(r["seconds"] for r in samples), 4),
+        peak_rss_mb=round(statistics.median(r["peak_rss_mb"] for r in samples), 1),
+        runs=[round(t, 2) for t in throughputs],
+        noise=round(statistics.median(abs(t - median) for t in throughputs) / median, 4),
+    )
+    return result
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    import numpy, pandas, sklearn
+    return {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": numpy.__version__,
+        "pandas": pandas.__version__,
+        "sklearn": sklearn.__version__,
+    }
+
+
+def compare(results, baseline, threshold, memory_threshold):
+    """Rows of (case, metric, baseline, current, change, allowed change) plus the list of regressions."""
+    rows, regressions = [], []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None or "skipped" in current or "skipped" in base:
+            continue
+        # Noise-sized threshold (baselines recorded before --runs carry no noise)
+        noise = max(base.get("noise", 0.0), current.get("noise", 0.0))
+        allowed = max(threshold, min(NOISE_FACTOR * noise, MAX_ALLOWED_DROP))
+        change = current["throughput"] / base["throughput"] - 1
+        rows.append((name, "throughput", base["throughput"], current["throughput"], change, -allowed))
+        if change < -allowed:
+            regressions.append(f"{name}: throughput {change:+.1%} (allowed -{allowed:.0%})")
+        change = current["peak_rss_mb"] / base["peak_rss_mb"] - 1
+        rows.append((name, "peak_rss_mb", base["peak_rss_mb"], current["peak_rss_mb"], change, memory_threshold))
+        if change > memory_threshold:
+            regressions.append(f"{name}: peak RSS {change:+.1%}")
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="VietHealth benchmark suite.")
+    parser.add_argument("--profile", choices=PROFILES, default="quick")
+    parser.add_argument("--only", action="append", default=[], help="Run only cases whose id contains this text")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="Runs per case; results are medians")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed median throughput drop (fraction), widened to the measured noise")
+    parser.add_argument("--memory-threshold", type=float, default=0.25, help="Allowed peak RSS growth (fraction)")
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results to --baseline")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="Cache for generated input files")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    results = {}
+    for case, params in PROFILES[args.profile]:
+        name = case_id(case, params)
+        if args.only and not any(text in name for text in args.only):
+            continue
+        result = run_case(case, params, args.data_dir, args.runs)
+        results[name] = result
+        if "skipped" in result:
+            print(f"{name:<55} skipped: {result['skipped']}")
+        else:
+            print(f"{name:<55} {result['throughput']:>13,.1f} {result['unit']:<10} ±{result['noise']:>5.1%} "
+                  f"{result['seconds']:>9.3f}s  peak RSS {result['peak_rss_mb']:>7.1f} MB")
+
+    report = {"profile": args.profile, "runs": args.runs, "environment": environment(), "results": results}
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare with.")
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    rows, regressions = compare(results, baseline, args.threshold, args.memory_threshold)
+    print(f"\nCompared with {args.baseline} (threshold {args.threshold:.0%} or {NOISE_FACTOR}x noise, "
+          f"memory {args.memory_threshold:.0%}):")
+    for name, metric, base, current, change, allowed in rows:
+        print(f"  {name:<55} {metric:<12} {base:>13,.1f} -> {current:>13,.1f}  {change:+7.1%}  (allowed {allowed:+.0%})")
+    if regressions:
+        print("\nRegressions:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print("No regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,28 +1,52 @@
-import requests
 import os
+import sys
+import hashlib
+import logging
+
+from crawler import Crawler
 
 CSV_URL = "https://file.hstatic.net/200000445557/file/nutritionfood_ec2ac1b6d085475e80a7dd31c1595190.csv"
 OUTPUT_FILE = "cac_mon_an_crawled.csv"
+# ETag/Last-Modified của các lần tải trước (để bỏ qua nguồn không đổi)
+STATE_FILE = "crawl_state.json"
+
+def _output_name(url, used):
+    """
+    Tên file cho một URL: tên file trong URL (hoặc source.csv); nếu trùng với nguồn
+    khác thì thêm 8 ký tự hash của URL, để hai nguồn không ghi chung một file .part.
+    """
+    name = os.path.basename(url.split("?")[0]) or "source.csv"
+    if name in used:
+        stem, ext = os.path.splitext(name)
+        name = f"{stem}_{hashlib.sha1(url.encode('utf-8')).hexdigest()[:8]}{ext}"
+    return name
+
+def download_csv(extra_urls=()):
+    """
+    Tải bảng dinh dưỡng chính (và các nguồn thêm, mỗi URL một file cùng tên)
+    bằng Crawler: song song, có timeout/retry, bỏ qua nguồn không đổi, tải tiếp file dở.
+    """
+    sources = [{"url": CSV_URL, "output": OUTPUT_FILE}]
+    seen_urls = {CSV_URL}
+    used_outputs = {OUTPUT_FILE}
+    for url in extra_urls:
+        if url in seen_urls:
+            continue
+        seen_urls.add(url)
+        sources.append({"url": url, "output": _output_name(url, used_outputs)})
+        used_outputs.add(sources[-1]["output"])
 
-def download_csv():
-    print(f"🔄 Đang tải dữ liệu từ {CSV_URL}...")
-    try:
-        response = requests.get(CSV_URL)
-        response.raise_for_status()
-        
-        # Lưu file với encoding utf-8-sig để mở trên Excel không lỗi font
-        with open(OUTPUT_FILE, 'wb') as f:
-            f.write(response.content)
-            
-        print(f"🎉 Đã tải thành công và lưu tại {OUTPUT_FILE}")
-        
-        # Đếm số dòng
-        with open(OUTPUT_FILE, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-            print(f"📊 Tổng số dòng dữ liệu: {len(lines)}")
-            
-    except Exception as e:
-        print(f"❌ Lỗi khi tải file: {e}")
+    print(f"🔄 Đang tải dữ liệu từ {len(sources)} nguồn...")
+    for result in Crawler(STATE_FILE).crawl(sources):
+        if result["status"] == "failed":
+            print(f"❌ Lỗi khi tải {result['url']}: {result['error']}")
+        elif result["status"] == "not_modified":
+            print(f"⏭️ {result['output']} không thay đổi, bỏ qua ({result['lines']} dòng)")
+        else:
+            print(f"🎉 Đã tải thành công và lưu tại {result['output']}")
+            # Số dòng được đếm trong lúc ghi file
+            print(f"📊 Tổng số dòng dữ liệu: {result['lines']}")
 
 if __name__ == "__main__":
-    download_csv()
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s - %(message)s')
+    download_csv(sys.argv[1:])
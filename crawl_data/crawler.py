@@ -0,0 +1,279 @@
+"""
+Crawler tải hàng loạt bảng dinh dưỡng từ nhiều nguồn.
+
+- Tải song song bằng thread pool có giới hạn (max_workers).
+- Mỗi thread giữ kết nối keep-alive theo (scheme, host, port) để dùng lại giữa các request.
+- Mọi request đều có timeout; lỗi mạng, 429 và 5xx được thử lại với backoff tăng dần.
+- ETag/Last-Modified của lần tải trước lưu trong file state: gửi If-None-Match /
+  If-Modified-Since, server trả 304 thì bỏ qua nguồn đó.
+- Body được ghi thẳng xuống file .part theo từng chunk (không giữ cả file trong RAM),
+  đếm số dòng trong lúc ghi. Lần tải bị ngắt giữa chừng được tiếp tục bằng Range/If-Range.
+
+Chỉ dùng thư viện chuẩn (http.client), chạy thử offline với crawl_data/local_server.py.
+"""
+import http.client
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlsplit
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+CHUNK_SIZE = 64 * 1024
+MAX_REDIRECTS = 5
+# Mã lỗi tạm thời: thử lại
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class FetchError(Exception):
+    """Lỗi không thử lại được (ví dụ HTTP 404, quá nhiều redirect)."""
+
+
+class _RetryableStatus(Exception):
+    """Server trả mã lỗi tạm thời (RETRY_STATUS) hoặc phần đã tải không còn hợp lệ."""
+
+    def __init__(self, status, retry_after=None):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+class Crawler:
+    """
+    Tải danh sách nguồn {"url": ..., "output": ...} vào file output.
+    state_path: file JSON lưu ETag/Last-Modified và trạng thái tải dở của từng URL.
+    """
+
+    def __init__(self, state_path, max_workers=4, timeout=10, retries=3, backoff=0.5,
+                 chunk_size=CHUNK_SIZE, headers=None):
+        self.state_path = state_path
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.chunk_size = chunk_size
+        self.headers = {"User-Agent": USER_AGENT, **(headers or {})}
+        self._local = threading.local()
+        self._conns = []  # mọi kết nối đã mở (của mọi thread), để close() đóng hết
+        self._conns_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._state = self._load_state()
+
+    # --- State (ETag / Last-Modified / tải dở) ---
+    def _load_state(self):
+        if os.path.exists(self.state_path):
+            with open(self.state_path, encoding="utf-8") as f:
+                return json.load(f)
+        return {}
+
+    def _update_state(self, url, entry):
+        with self._state_lock:
+            if entry is None:
+                self._state.pop(url, None)
+            else:
+                self._state[url] = entry
+            tmp = self.state_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._state, f, indent=2, ensure_ascii=False)
+            os.replace(tmp, self.state_path)
+
+    # --- Kết nối (keep-alive, một bộ cho mỗi thread) ---
+    def _connection(self, scheme, netloc):
+        conns = getattr(self._local, "conns", None)
+        if conns is None:
+            conns = self._local.conns = {}
+        key = (scheme, netloc)
+        conn = conns.get(key)
+        if conn is None:
+            cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            conn = conns[key] = cls(netloc, timeout=self.timeout)
+            with self._conns_lock:
+                self._conns.append(conn)
+        return conn
+
+    def _drop_connection(self, scheme, netloc):
+        conn = getattr(self._local, "conns", {}).pop((scheme, netloc), None)
+        if conn is not None:
+            conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Đóng mọi kết nối keep-alive (crawl() tự gọi khi xong)."""
+        with self._conns_lock:
+            conns, self._conns = self._conns, []
+        for conn in conns:
+            conn.close()
+
+    def _request(self, url, headers):
+        """GET theo redirect; trả về (response, url cuối cùng). Response phải được đọc hết."""
+        for _ in range(MAX_REDIRECTS + 1):
+            parts = urlsplit(url)
+            path = parts.path or "/"
+            if parts.query:
+                path += "?" + parts.query
+            conn = self._connection(parts.scheme, parts.netloc)
+            try:
+                conn.request("GET", path, headers={**self.headers, **headers})
+                response = conn.getresponse()
+            except (OSError, http.client.HTTPException):
+                # Kết nối keep-alive có thể đã bị server đóng: lần sau mở kết nối mới
+                self._drop_connection(parts.scheme, parts.netloc)
+                raise
+            if response.status in (301, 302, 303, 307, 308) and response.getheader("Location"):
+                response.read()
+                url = urljoin(url, response.getheader("Location"))
+                continue
+            return response, url
+        raise FetchError(f"Quá {MAX_REDIRECTS} lần redirect: {url}")
+
+    # --- Tải một nguồn ---
+    def fetch(self, url, output):
+        """
+        Tải url vào output. Trả về dict kết quả với status:
+        "downloaded", "resumed", "not_modified" hoặc "failed".
+        """
+        start = time.perf_counter()
+        result = {"url": url, "output": output, "attempts": 0}
+        last_error = None
+        for attempt in range(self.retries + 1):
+            result["attempts"] = attempt + 1
+            try:
+                result.update(self._fetch_once(url, output))
+                break
+            except FetchError as e:
+                last_error = e
+                break
+            except (OSError, http.client.HTTPException, _RetryableStatus) as e:
+                # Lỗi tạm thời: phần đã ghi vào .part được giữ lại để lần thử sau tải tiếp
+                last_error = e
+                if attempt < self.retries:
+                    delay = self.backoff * (2 ** attempt)
+                    if isinstance(e, _RetryableStatus) and e.retry_after is not None:
+                        delay = max(delay, e.retry_after)
+                    logger.warning(f"⚠️ {url}: {e!r} — thử lại sau {delay:.1f}s")
+                    time.sleep(delay)
+        if "status" not in result:
+            result.update(status="failed", error=str(last_error))
+            logger.error(f"❌ {url}: {last_error}")
+        result["seconds"] = round(time.perf_counter() - start, 3)
+        return result
+
+    def _fetch_once(self, url, output):
+        part = output + ".part"
+        entry = self._state.get(url, {})
+        headers = {}
+
+        # Tải dở: xin phần còn lại, If-Range đảm bảo file trên server chưa đổi
+        offset = os.path.getsize(part) if os.path.exists(part) else 0
+        partial = entry.get("partial") or {}
+        etag = partial.get("etag")
+        # If-Range chỉ nhận ETag mạnh; ETag yếu (W/...) thì dùng Last-Modified
+        validator = etag if etag and not etag.startswith("W/") else partial.get("last_modified")
+        if offset and validator:
+            headers["Range"] = f"bytes={offset}-"
+            headers["If-Range"] = validator
+        elif os.path.exists(output):
+            # Đã có bản đầy đủ: hỏi server xem có thay đổi không
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        response, final_url = self._request(url, headers)
+        status = response.status
+        if status == 304:
+            response.read()
+            return {"status": "not_modified", "bytes": 0, "lines": entry.get("lines")}
+        if status == 416:
+            # Phần đã tải không còn hợp lệ (file trên server ngắn hơn): tải lại từ đầu
+            response.read()
+            os.remove(part)
+            self._update_state(url, {**entry, "partial": None})
+            raise _RetryableStatus(status)
+        if status in RETRY_STATUS:
+            response.read()
+            retry_after = response.getheader("Retry-After")
+            raise _RetryableStatus(status, float(retry_after) if retry_after and retry_after.isdigit() else None)
+        if status not in (200, 206):
+            response.read()
+            raise FetchError(f"HTTP {status}")
+
+        # 206 phải tiếp đúng chỗ đang dừng; nếu không thì coi như tải lại từ đầu
+        resumed = status == 206 and (response.getheader("Content-Range") or "").startswith(f"bytes {offset}-")
+        if status == 206 and not resumed:
+            response.read()
+            os.remove(part)
+            raise _RetryableStatus(status)
+        validators = {"etag": response.getheader("ETag"), "last_modified": response.getheader("Last-Modified")}
+        # Đếm ký tự xuống dòng và nhớ byte cuối: dòng cuối không có "\n" vẫn là một dòng (như readlines())
+        newlines, last = 0, b""
+        if resumed:
+            newlines, last = _count_newlines(part, self.chunk_size)
+        else:
+            offset = 0
+            # Lưu validator trước khi ghi, để lần sau tiếp tục được nếu bị ngắt
+            self._update_state(url, {**entry, "partial": validators})
+
+        # Ghi từng chunk xuống .part và đếm dòng ngay trong lúc ghi
+        written = 0
+        try:
+            with open(part, "ab" if resumed else "wb") as f:
+                while True:
+                    chunk = response.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    written += len(chunk)
+                    newlines += chunk.count(b"\n")
+                    last = chunk[-1:]
+            expected = response.getheader("Content-Length")
+            if expected is not None and written < int(expected):
+                raise http.client.IncompleteRead(b"", int(expected) - written)
+        except (OSError, http.client.HTTPException):
+            parts = urlsplit(final_url)
+            self._drop_connection(parts.scheme, parts.netloc)
+            raise
+        os.replace(part, output)
+        lines = newlines + (last not in (b"", b"\n"))
+        self._update_state(url, {
+            **validators,
+            "size": os.path.getsize(output),
+            "lines": lines,
+            "final_url": final_url,
+            "fetched_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        })
+        return {"status": "resumed" if resumed else "downloaded", "bytes": written,
+                "resumed_from": offset if resumed else 0, "lines": lines}
+
+    # --- Tải nhiều nguồn ---
+    def crawl(self, sources):
+        """Tải song song các nguồn ({"url", "output"}); trả về danh sách kết quả theo thứ tự nguồn."""
+        # Hai nguồn cùng output sẽ ghi chung một file .part
+        outputs = [os.path.abspath(source["output"]) for source in sources]
+        if len(set(outputs)) != len(outputs):
+            duplicates = sorted({o for o in outputs if outputs.count(o) > 1})
+            raise ValueError(f"Nhiều nguồn cùng ghi vào một file: {duplicates}")
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="crawler") as pool:
+                return list(pool.map(lambda source: self.fetch(source["url"], source["output"]), sources))
+        finally:
+            self.close()
+
+
+def _count_newlines(path, chunk_size=CHUNK_SIZE):
+    """(số ký tự "\n", byte cuối cùng) của file, đọc theo chunk."""
+    newlines, last = 0, b""
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            newlines += chunk.count(b"\n")
+            last = chunk[-1:]
+    return newlines, last
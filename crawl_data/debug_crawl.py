@@ -1,19 +1,22 @@
-import requests
+import logging
+
+from crawler import Crawler
 
 URL = "https://supvn.net/blogs/kien-thuc/bang-calories-theo-thuc-an-viet-nam"
 OUTPUT_HTML = "page_source.html"
+STATE_FILE = "crawl_state.json"
 
 def save_html():
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-    }
-    try:
-        response = requests.get(URL, headers=headers)
-        with open(OUTPUT_HTML, "w", encoding="utf-8") as f:
-            f.write(response.text)
+    # Crawler gửi sẵn User-Agent trình duyệt, có timeout/retry và ghi thẳng body xuống file
+    with Crawler(STATE_FILE) as crawler:
+        result = crawler.fetch(URL, OUTPUT_HTML)
+    if result["status"] == "failed":
+        print(result["error"])
+    elif result["status"] == "not_modified":
+        print("HTML not modified")
+    else:
         print("Saved HTML")
-    except Exception as e:
-        print(e)
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s - %(message)s')
     save_html()
@@ -0,0 +1,158 @@
+"""
+Server HTTP giả lập nguồn dữ liệu, để chạy thử crawler.py offline.
+
+Phục vụ các file trong một thư mục qua HTTP/1.1 keep-alive, có ETag/Last-Modified,
+trả 304 cho request điều kiện và 206 cho Range (kèm If-Range). Có thể giả lập
+mạng chậm và lỗi: trễ mỗi request, trả 503 vài lần đầu, hoặc ngắt kết nối giữa body.
+
+    python local_server.py <thư mục> [port]
+"""
+import email.utils
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+
+class StandInServer(ThreadingHTTPServer):
+    """
+    root: thư mục được phục vụ. latency: giây trễ mỗi request.
+    fail_first: {đường dẫn: số lần đầu trả 503}. truncate: {đường dẫn: số byte gửi trước khi ngắt (một lần)}.
+    """
+    daemon_threads = True
+
+    def __init__(self, address, root, latency=0.0, fail_first=None, truncate=None):
+        super().__init__(address, _Handler)
+        self.root = os.path.abspath(root)
+        self.latency = latency
+        self.fail_first = dict(fail_first or {})
+        self.truncate = dict(truncate or {})
+        self.stats = Counter()
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def take_failure(self, path):
+        """True nếu request này tới path phải trả 503 (fail_first còn lượt)."""
+        with self._lock:
+            remaining = self.fail_first.get(path, 0)
+            if remaining > 0:
+                self.fail_first[path] = remaining - 1
+                return True
+            return False
+
+    def take_truncate(self, path):
+        """Số byte gửi trước khi ngắt kết nối cho path (chỉ một lần), hoặc None."""
+        with self._lock:
+            return self.truncate.pop(path, None)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.count("connections")
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        server.count("requests")
+        if server.latency:
+            time.sleep(server.latency)
+
+        path = unquote(urlsplit(self.path).path).lstrip("/")
+        full_path = os.path.abspath(os.path.join(server.root, path))
+        if not full_path.startswith(server.root + os.sep) or not os.path.isfile(full_path):
+            return self._empty(404)
+        if server.take_failure(path):
+            return self._empty(503, {"Retry-After": "0"})
+
+        stat = os.stat(full_path)
+        etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+        last_modified = email.utils.formatdate(stat.st_mtime, usegmt=True)
+        validators = {"ETag": etag, "Last-Modified": last_modified}
+
+        if self._not_modified(etag, stat.st_mtime):
+            return self._empty(304, validators)
+
+        start, status, headers = 0, 200, dict(validators)
+        range_header = self.headers.get("Range")
+        if_range = self.headers.get("If-Range")
+        if range_header and range_header.startswith("bytes=") and if_range in (None, etag, last_modified):
+            first = range_header[len("bytes="):].split("-")[0]
+            if first.isdigit():
+                start = int(first)
+                if start >= stat.st_size:
+                    return self._empty(416, {"Content-Range": f"bytes */{stat.st_size}"})
+                status = 206
+                headers["Content-Range"] = f"bytes {start}-{stat.st_size - 1}/{stat.st_size}"
+
+        length = stat.st_size - start
+        cut = server.take_truncate(path)
+        server.count(status)
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Type", "text/csv; charset=utf-8")
+        self.send_header("Content-Length", str(length))
+        self.end_headers()
+        with open(full_path, "rb") as f:
+            f.seek(start)
+            if cut is not None:
+                # Gửi một phần rồi đóng kết nối, như mạng bị đứt giữa chừng
+                self.wfile.write(f.read(min(cut, length)))
+                self.close_connection = True
+                return
+            while True:
+                chunk = f.read(64 * 1024)
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+
+    def _not_modified(self, etag, mtime):
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since:
+            try:
+                return int(mtime) <= email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def _empty(self, status, headers=None):
+        self.server.count(status)
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+def serve(root, port=0, **faults):
+    """Chạy server trong thread nền; trả về server (server.base_url, server.shutdown())."""
+    server = StandInServer(("127.0.0.1", port), root, **faults)
+    threading.Thread(target=server.serve_forever, name="stand-in-server", daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    root = sys.argv[1] if len(sys.argv) > 1 else "."
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else 8765
+    server = StandInServer(("127.0.0.1", port), root)
+    print(f"🌐 Đang phục vụ {os.path.abspath(root)} tại {server.base_url}")
+    server.serve_forever()
@@ -1,5 +1,13 @@
 import pandas as pd
+import numpy as np
+import argparse
+import json
 import os
+import re
+import sqlite3
+import sys
+import tempfile
+import time
 
 # Đường dẫn
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -10,8 +18,60 @@ DIABETES_FILE = os.path.join(DATA_DIR, 'diabetes_prediction_dataset.csv')
 
 OUTPUT_FOOD = os.path.join(DATA_DIR, 'cleaned_foods.csv')
 OUTPUT_DIABETES = os.path.join(DATA_DIR, 'processed_diabetes.csv')
+OUTPUT_DIABETES_PARQUET = os.path.join(DATA_DIR, 'processed_diabetes.parquet')
 
-def clean_food_data():
+sys.path.insert(0, BASE_DIR)
+from perf_stats import peak_rss_mb
+
+# Kiểu dữ liệu cố định khi đọc theo chunk (tránh pandas tự đoán int64/float64/object cho mọi cột)
+DIABETES_DTYPES = {
+    'gender': 'object',
+    'age': 'float32',
+    'hypertension': 'int8',
+    'heart_disease': 'int8',
+    'smoking_history': 'object',
+    'bmi': 'float32',
+    'HbA1c_level': 'float32',
+    'blood_glucose_level': 'int16',
+    'diabetes': 'int8',
+}
+# 0: never, 1: No Info, 2: former/not current, 3: current/ever
+SMOKING_RISK_MAP = {
+    'never': 0,
+    'No Info': 1,
+    'former': 2,
+    'not current': 2,
+    'current': 3,
+    'ever': 3
+}
+
+# Luật ước lượng dinh dưỡng theo từ khóa trong tên món (thêm chất mới không cần sửa code)
+RULES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'enrichment_rules.json')
+
+def load_rules(path=RULES_FILE):
+    """Đọc file luật và biên dịch mỗi luật thành một regex duy nhất."""
+    with open(path, encoding='utf-8') as f:
+        config = json.load(f)
+    rules = []
+    for rule in config['rules']:
+        keywords = sorted((k.lower() for k in rule['keywords']), key=len, reverse=True)
+        rules.append({
+            'column': rule['column'],
+            'pattern': re.compile('|'.join(re.escape(k) for k in keywords)),
+            'match': float(rule['match']),
+            'default': float(rule.get('default', 0.0)),
+        })
+    return config.get('name_column', 'name'), rules
+
+def apply_rules(df, rules, name_column='name'):
+    """Thêm một cột cho mỗi luật: giá trị 'match' nếu tên món chứa từ khóa, ngược lại 'default'."""
+    names = df[name_column].astype(str).str.lower()
+    for rule in rules:
+        mask = names.str.contains(rule['pattern']).to_numpy(dtype=bool)
+        df[rule['column']] = np.where(mask, rule['match'], rule['default'])
+    return df
+
+def clean_food_data(rules_path=RULES_FILE):
     """Xử lý dữ liệu món ăn: Đổi tên cột, thêm cột thiếu, làm sạch."""
     print("🔄 Đang xử lý dữ liệu món ăn...")
     if not os.path.exists(FOOD_FILE):
@@ -34,36 +94,149 @@ def clean_food_data():
     # 3. Điền giá trị thiếu
     df = df.fillna(0)
     
-    # 4. Thêm các cột còn thiếu (Milk, Alcohol, Salt)
-    # Salt không có trong file mới, ta ước lượng hoặc để 0
-    
-    def estimate_salt(row):
-        name = str(row['name']).lower()
-        # Món mặn, kho, nước mắm...
-        if any(x in name for x in ['kho', 'mắm', 'muối', 'rang', 'rim', 'canh', 'phở', 'bún', 'mì']):
-            return 500.0 # Giả định 500mg muối
-        return 50.0 # Mặc định ít muối
-
-    def estimate_milk(row):
-        name = str(row['name']).lower()
-        if any(x in name for x in ['sữa', 'latte', 'cheese', 'kem', 'yogurt', 'cacao']):
-            return 200.0
-        return 0.0
-        
-    def estimate_alcohol(row):
-        name = str(row['name']).lower()
-        if any(x in name for x in ['bia', 'rượu', 'cocktail', 'wine']):
-            return 330.0
-        return 0.0
-
-    df['salt'] = df.apply(estimate_salt, axis=1)
-    df['milk'] = df.apply(estimate_milk, axis=1)
-    df['alcohol'] = df.apply(estimate_alcohol, axis=1)
+    # 4. Thêm các cột còn thiếu (Salt, Milk, Alcohol)
+    # Không có trong file mới nên ước lượng theo từ khóa trong tên món (xem enrichment_rules.json)
+    name_column, rules = load_rules(rules_path)
+    df = apply_rules(df, rules, name_column)
 
     # Lưu file
     df.to_csv(OUTPUT_FOOD, index=False)
     print(f"✅ Đã lưu file món ăn sạch tại: {OUTPUT_FOOD}")
 
+class RowHashSet:
+    """
+    Tập hash 64-bit của các dòng đã gặp, dùng để xóa trùng lặp giữa các chunk.
+    Giữ trong RAM (set) cho tới max_in_memory hash, vượt quá thì chuyển sang SQLite trên đĩa.
+    """
+
+    def __init__(self, max_in_memory=5_000_000):
+        self.max_in_memory = max_in_memory
+        self._memory = set()
+        self._conn = None
+        self._tmpdir = None
+
+    @property
+    def on_disk(self):
+        return self._conn is not None
+
+    def _spill(self):
+        self._tmpdir = tempfile.TemporaryDirectory(prefix='row_hashes_')
+        self._conn = sqlite3.connect(os.path.join(self._tmpdir.name, 'hashes.db'))
+        self._conn.execute("PRAGMA journal_mode=OFF")
+        self._conn.execute("PRAGMA synchronous=OFF")
+        self._conn.execute("CREATE TABLE seen (h INTEGER PRIMARY KEY)")
+        with self._conn:
+            self._conn.executemany("INSERT INTO seen VALUES (?)", ((h,) for h in self._memory))
+        self._memory = set()
+        print(f"   - Quá {self.max_in_memory} hash, chuyển tập hash sang đĩa: {self._tmpdir.name}")
+
+    def add_new(self, hashes):
+        """Thêm các hash (uint64); trả về mask True cho dòng chưa từng gặp (kể cả trùng trong cùng chunk)."""
+        signed = hashes.view(np.int64).tolist()
+        is_new = np.zeros(len(signed), dtype=bool)
+        if not self.on_disk and len(self._memory) + len(signed) > self.max_in_memory:
+            self._spill()
+
+        if self.on_disk:
+            cur = self._conn.cursor()
+            with self._conn:
+                for i, h in enumerate(signed):
+                    cur.execute("INSERT OR IGNORE INTO seen VALUES (?)", (h,))
+                    is_new[i] = cur.rowcount == 1
+        else:
+            seen = self._memory
+            for i, h in enumerate(signed):
+                if h not in seen:
+                    seen.add(h)
+                    is_new[i] = True
+        return is_new
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._tmpdir.cleanup()
+            self._conn = None
+
+def _open_writer(output_format, output_path):
+    """Trả về hàm ghi từng chunk đã xử lý và hàm đóng file."""
+    if output_format == 'csv':
+        state = {'header': True}
+
+        def write(chunk):
+            chunk.to_csv(output_path, index=False, mode='w' if state['header'] else 'a', header=state['header'])
+            state['header'] = False
+        return write, lambda: None
+
+    if output_format == 'parquet':
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Ghi Parquet cần cài thêm pyarrow (pip install pyarrow).")
+        state = {'writer': None}
+
+        def write(chunk):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if state['writer'] is None:
+                state['writer'] = pq.ParquetWriter(output_path, table.schema)
+            state['writer'].write_table(table.cast(state['writer'].schema))
+
+        def close():
+            if state['writer'] is not None:
+                state['writer'].close()
+        return write, close
+
+    raise ValueError(f"Định dạng không hỗ trợ: {output_format}")
+
+def clean_diabetes_data_streaming(chunksize=500_000, output_format='csv', output_path=None,
+                                  max_hashes_in_memory=5_000_000, input_path=DIABETES_FILE):
+    """
+    Xử lý dữ liệu tiểu đường theo từng chunk (không cần nạp cả file vào RAM).
+    Cho ra cùng kết quả với clean_diabetes_data: xóa trùng lặp trên dòng gốc (qua RowHashSet),
+    bỏ giới tính 'Other', encode gender/smoking. Ghi CSV hoặc Parquet.
+    """
+    print(f"🔄 Đang xử lý dữ liệu tiểu đường theo chunk ({chunksize} dòng, {output_format})...")
+    if not os.path.exists(input_path):
+        print(f"❌ Không tìm thấy file: {input_path}")
+        return
+
+    if output_path is None:
+        output_path = OUTPUT_DIABETES_PARQUET if output_format == 'parquet' else OUTPUT_DIABETES
+    write, close = _open_writer(output_format, output_path)
+    seen = RowHashSet(max_hashes_in_memory)
+
+    start = time.perf_counter()
+    rows_in = rows_out = duplicates = 0
+    try:
+        for chunk in pd.read_csv(input_path, dtype=DIABETES_DTYPES, chunksize=chunksize):
+            rows_in += len(chunk)
+
+            # 1. Xóa trùng lặp (so với mọi chunk trước đó)
+            is_new = seen.add_new(pd.util.hash_pandas_object(chunk, index=False).to_numpy())
+            duplicates += int((~is_new).sum())
+            chunk = chunk[is_new]
+
+            # 2. Encode Gender (Nam=1, Nữ=0), bỏ 'Other'
+            chunk = chunk[chunk['gender'] != 'Other'].copy()
+            chunk['gender'] = chunk['gender'].map({'Male': 1, 'Female': 0}).astype('int8')
+
+            # 3. Encode Smoking History (Int8 cho phép giá trị lạ -> rỗng, như bản gốc)
+            chunk['smoking_history'] = chunk['smoking_history'].map(SMOKING_RISK_MAP).astype('Int8')
+
+            write(chunk)
+            rows_out += len(chunk)
+    finally:
+        close()
+        seen.close()
+
+    elapsed = time.perf_counter() - start
+    stats = {"rows_in": rows_in, "rows_out": rows_out, "duplicates": duplicates,
+             "seconds": round(elapsed, 3), "rows_per_s": round(rows_in / elapsed), "peak_rss_mb": peak_rss_mb()}
+    print(f"   - Đã loại bỏ {duplicates} dòng trùng lặp.")
+    print(f"   - {rows_in} dòng vào, {rows_out} dòng ra, {stats['rows_per_s']:,} dòng/giây, peak RSS {stats['peak_rss_mb']:.1f} MB")
+    print(f"Đã lưu file tiểu đường sạch tại: {output_path}")
+    return stats
+
 def clean_diabetes_data():
     """Xử lý dữ liệu tiểu đường: Encode, lọc nhiễu."""
     print("🔄 Đang xử lý dữ liệu tiểu đường...")
@@ -84,22 +257,26 @@ def clean_diabetes_data():
     df['gender'] = df['gender'].map({'Male': 1, 'Female': 0}).astype(int)
     
     # 3. Encode Smoking History (Chuyển sang dạng số để Model hiểu)
-    # 0: never, 1: No Info, 2: former/not current, 3: current/ever
-    risk_map = {
-        'never': 0,
-        'No Info': 1,
-        'former': 2,
-        'not current': 2,
-        'current': 3,
-        'ever': 3
-    }
-    df['smoking_history'] = df['smoking_history'].map(risk_map)
+    df['smoking_history'] = df['smoking_history'].map(SMOKING_RISK_MAP)
     
     # Lưu file
     df.to_csv(OUTPUT_DIABETES, index=False)
     print(f"Đã lưu file tiểu đường sạch tại: {OUTPUT_DIABETES}")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Làm sạch dữ liệu món ăn và dữ liệu tiểu đường.")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="Xử lý dữ liệu tiểu đường theo chunk (dùng cho file lớn)")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv",
+                        help="Định dạng file tiểu đường đầu ra ở chế độ chunk")
+    parser.add_argument("--max-hashes", type=int, default=5_000_000,
+                        help="Số hash dòng tối đa giữ trong RAM trước khi chuyển sang đĩa")
+    args = parser.parse_args()
+
     clean_food_data()
-    clean_diabetes_data()
+    if args.chunksize or args.format != "csv":
+        clean_diabetes_data_streaming(chunksize=args.chunksize or 500_000, output_format=args.format,
+                                      max_hashes_in_memory=args.max_hashes)
+    else:
+        clean_diabetes_data()
 
@@ -0,0 +1,182 @@
+"""Food catalog loaded with the stdlib csv module into a compact array-backed table.
+
+Importing pandas and building one dict per dish was most of the app's cold
+start and most of its catalog memory. FoodDB keeps the names in one list and
+every nutrient in one contiguous float32 matrix (one row per dish, one column
+per nutrient, see the column constants below), so totals over a meal are a
+single NumPy reduction.
+"""
+import csv
+import itertools
+from array import array
+
+import numpy as np
+
+NUTRIENT_COLS = ['calo', 'sugar', 'fat', 'protein', 'salt', 'milk', 'alcohol']
+# Column of each nutrient in FoodDB.matrix
+CALO, SUGAR, FAT, PROTEIN, SALT, MILK, ALCOHOL = range(len(NUTRIENT_COLS))
+
+# Catalog values have at most 2 decimals; float32 keeps them to ~7 significant
+# digits, so rounding to 2 decimals gives back the CSV values
+DECIMALS = 2
+_SCALE = 10 ** DECIMALS
+
+# Below this many ids, totals() and rows() work in plain Python on cached row
+# tuples: NumPy's per-call overhead dominates for the usual 1-5 dish meal.
+# Sums of fewer than 8 rows are sequential in NumPy too, so both paths agree exactly.
+SMALL_N = 8
+# Rows kept as Python objects for the small-n path (~0.5 KB each); rows past the
+# cap are converted on every use, so a huge catalog never turns back into dicts
+ROW_CACHE_SIZE = 100_000
+
+
+def _round(value):
+    """Same result as NumPy's round(DECIMALS) (scale, round half to even, unscale)."""
+    return round(value * _SCALE) / _SCALE
+
+
+class FoodDB:
+    """
+    Dish names plus a (n_dishes, len(NUTRIENT_COLS)) float32 nutrient matrix,
+    both indexed by catalog id. Missing nutrients are 0.
+    db[i] returns the row as a dict and iterating yields every row, like the
+    old to_dict('records') list.
+    """
+
+    def __init__(self, names, matrix=None):
+        self.names = list(names)
+        if matrix is None:
+            matrix = np.zeros((len(self.names), len(NUTRIENT_COLS)), dtype=np.float32)
+        self.matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        if self.matrix.shape != (len(self.names), len(NUTRIENT_COLS)):
+            raise ValueError(f"Nutrient matrix shape {self.matrix.shape} does not match "
+                             f"{len(self.names)} names x {len(NUTRIENT_COLS)} nutrients")
+        self._ids = None
+        self._row_cache = {}
+
+    @classmethod
+    def from_csv(cls, path):
+        """Read a cleaned_foods.csv-style file; empty or absent nutrient cells count as 0."""
+        with open(path, newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            name_pos = header.index('name')
+            present = [col for col, c in enumerate(NUTRIENT_COLS) if c in header]
+            positions = [header.index(NUTRIENT_COLS[col]) for col in present]
+            names = []
+            # Row-major float32 buffer of the present columns: no per-cell Python objects kept
+            values = array('f')
+            for row in reader:
+                if not row:
+                    continue
+                names.append(row[name_pos])
+                values.extend([float(row[pos]) if row[pos] else 0.0 for pos in positions])
+
+        matrix = np.zeros((len(names), len(NUTRIENT_COLS)), dtype=np.float32)
+        if present:
+            matrix[:, present] = np.frombuffer(values, dtype=np.float32).reshape(len(names), len(present))
+        return cls(names, matrix)
+
+    @property
+    def nbytes(self):
+        """Bytes held by the nutrient matrix (names not included)."""
+        return self.matrix.nbytes
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, food_id):
+        return self.rows([food_id])[0]
+
+    def __iter__(self):
+        chunk = 10_000
+        for start in range(0, len(self.names), chunk):
+            yield from self.rows(range(start, min(start + chunk, len(self.names))))
+
+    def rows(self, food_ids):
+        """
+        Row dicts of the given ids, converted in one pass. Treat them as
+        read-only: small lookups return shared cached dicts, as the old
+        to_dict('records') list did.
+        """
+        if not isinstance(food_ids, list):
+            food_ids = list(food_ids)
+        if len(food_ids) < SMALL_N:
+            cache = self._row_cache
+            return [(cache.get(i) or self._cached_row(i))[2] for i in food_ids]
+        values = self.matrix.take(food_ids, axis=0).astype(np.float64).round(DECIMALS).tolist()
+        return [{'name': self.names[i], **dict(zip(NUTRIENT_COLS, row))}
+                for i, row in zip(food_ids, values)]
+
+    def id_of(self, name):
+        """Catalog id of the dish with exactly this name (first one on duplicates), or None."""
+        if self._ids is None:
+            ids = {}
+            for food_id, dish in enumerate(self.names):
+                ids.setdefault(dish, food_id)
+            self._ids = ids
+        return self._ids.get(name)
+
+    def get(self, name):
+        """Row dict of the dish with exactly this name, or None."""
+        food_id = self.id_of(name)
+        return None if food_id is None else self[food_id]
+
+    def totals(self, food_ids, columns=None):
+        """
+        Nutrient totals of the given ids (repeats count every time) as a float64
+        vector, rounded to DECIMALS. `columns` selects and orders the nutrients
+        (column constants); all of NUTRIENT_COLS by default.
+        """
+        if len(food_ids) < SMALL_N:
+            return np.array(self.totals_list(food_ids, columns))
+        # Summing every column then selecting is cheaper than gathering a column subset
+        total = np.add.reduce(self.matrix.take(food_ids, axis=0), axis=0, dtype=np.float64)
+        if columns is not None:
+            total = total[columns]
+        return total.round(DECIMALS)
+
+    def totals_list(self, food_ids, columns=None):
+        """totals() as a list of Python floats (what sum_nutrition needs)."""
+        if len(food_ids) >= SMALL_N:
+            return self.totals(food_ids, columns).tolist()
+        if columns is None:
+            columns = range(len(NUTRIENT_COLS))
+        cache = self._row_cache
+        if len(food_ids) == 1:
+            rounded = (cache.get(food_ids[0]) or self._cached_row(food_ids[0]))[1]
+            return [rounded[col] for col in columns]
+        rows = [(cache.get(i) or self._cached_row(i))[0] for i in food_ids]
+        totals = []
+        for col in columns:
+            total = 0.0
+            for values in rows:
+                total += values[col]
+            totals.append(round(total * _SCALE) / _SCALE)  # _round, inlined
+        return totals
+
+    def _cached_row(self, food_id):
+        """
+        (raw values, rounded values, row dict) of one dish for the small-n paths,
+        cached for up to ROW_CACHE_SIZE dishes.
+        """
+        row = self._row_cache.get(food_id)
+        if row is None:
+            values = tuple(self.matrix[food_id].tolist())
+            rounded = tuple(map(_round, values))
+            row = (values, rounded, {'name': self.names[food_id], **dict(zip(NUTRIENT_COLS, rounded))})
+            if len(self._row_cache) < ROW_CACHE_SIZE:
+                self._row_cache[food_id] = row
+        return row
+
+    def totals_many(self, id_lists, columns=None):
+        """
+        Nutrient totals of many id lists in one pass: a (len(id_lists), n_columns)
+        float64 matrix whose row k equals totals(id_lists[k], columns).
+        """
+        lengths = np.fromiter((len(ids) for ids in id_lists), dtype=np.intp, count=len(id_lists))
+        flat = np.fromiter(itertools.chain.from_iterable(id_lists), dtype=np.intp, count=int(lengths.sum()))
+        values = self.matrix if columns is None else self.matrix[:, columns]
+        total = np.zeros((len(id_lists), values.shape[1]))
+        np.add.at(total, np.repeat(np.arange(len(id_lists)), lengths), values[flat])
+        return total.round(DECIMALS)
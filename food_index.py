@@ -0,0 +1,60 @@
+"""Accent-insensitive prefix index and precomputed payload for /api/foods."""
+import bisect
+import gzip
+import hashlib
+import json
+import unicodedata
+
+
+def fold_accents(text):
+    """Lowercase, strip Vietnamese diacritics (đ -> d) and collapse whitespace."""
+    text = str(text).lower().replace('đ', 'd')
+    text = "".join(ch for ch in unicodedata.normalize('NFD', text) if unicodedata.category(ch) != 'Mn')
+    return " ".join(text.split())
+
+
+class FoodPrefixIndex:
+    """
+    Sorted index of folded names for prefix search.
+
+    Every word start of a name is indexed, so "mi" finds "Bánh mì thịt".
+    Matches on the start of the whole name rank before matches on a later word.
+    """
+
+    def __init__(self, names):
+        self.names = list(names)
+        whole, words = [], []
+        for food_id, name in enumerate(self.names):
+            parts = fold_accents(name).split()
+            if parts:
+                whole.append((" ".join(parts), food_id))
+            for pos in range(1, len(parts)):
+                words.append((" ".join(parts[pos:]), food_id))
+        self._levels = []
+        for entries in (sorted(whole), sorted(words)):
+            self._levels.append(([key for key, _ in entries], [food_id for _, food_id in entries]))
+
+    def search(self, prefix, limit=10):
+        """Names whose folded form (or one of its words) starts with the folded prefix."""
+        prefix = fold_accents(prefix)
+        if not prefix or limit <= 0:
+            return []
+        found = []
+        seen = set()
+        for keys, ids in self._levels:
+            i = bisect.bisect_left(keys, prefix)
+            while i < len(keys) and len(found) < limit and keys[i].startswith(prefix):
+                if ids[i] not in seen:
+                    seen.add(ids[i])
+                    found.append(ids[i])
+                i += 1
+        return [self.names[i] for i in found]
+
+
+class CachedPayload:
+    """A JSON response body serialized and gzip-compressed once, with its ETag."""
+
+    def __init__(self, data):
+        self.body = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self.gzipped = gzip.compress(self.body, compresslevel=9, mtime=0)
+        self.etag = hashlib.sha1(self.body).hexdigest()
@@ -0,0 +1,104 @@
+"""Multi-pattern food name matcher (Aho–Corasick automaton).
+
+The automaton is built once from the food catalog and then finds every dish
+mentioned in a piece of text in a single pass, instead of testing each dish
+name against the text one by one.
+"""
+from collections import deque
+
+
+def normalize(text):
+    """Lowercase and collapse whitespace so names and user input compare equally."""
+    return " ".join(str(text).lower().split())
+
+
+class FoodMatcher:
+    """Aho–Corasick automaton over normalized food names.
+
+    Overlapping names are resolved by leftmost-longest match, so
+    "phở bò tái" only reports "phở bò tái" and not also "phở".
+    """
+
+    def __init__(self, names):
+        self._goto = [{}]      # node -> {char: child node}
+        self._fail = [0]       # node -> failure link
+        self._depth = [0]      # node -> length of the prefix it represents
+        self._ids = [None]     # node -> catalog ids whose name ends here
+        self._out = [0]        # node -> nearest node (self or suffix) with ids
+
+        for food_id, name in enumerate(names):
+            key = normalize(name)
+            if key:
+                self._insert(key, food_id)
+        self._build_links()
+
+    def __len__(self):
+        return len(self._goto)
+
+    def _insert(self, key, food_id):
+        node = 0
+        for ch in key:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._depth.append(self._depth[node] + 1)
+                self._ids.append(None)
+                self._out.append(0)
+            node = nxt
+        if self._ids[node] is None:
+            self._ids[node] = []
+        self._ids[node].append(food_id)
+
+    def _build_links(self):
+        goto, fail, ids, out = self._goto, self._fail, self._ids, self._out
+        queue = deque()
+        for child in goto[0].values():
+            out[child] = child if ids[child] else 0
+            queue.append(child)
+        while queue:
+            node = queue.popleft()
+            for ch, child in goto[node].items():
+                state = fail[node]
+                while state and ch not in goto[state]:
+                    state = fail[state]
+                fail[child] = goto[state].get(ch, 0)
+                out[child] = child if ids[child] else out[fail[child]]
+                queue.append(child)
+
+    def find_spans(self, text):
+        """Return non-overlapping (start, end, node) matches, leftmost-longest."""
+        goto, fail, out, depth = self._goto, self._fail, self._out, self._depth
+        text = normalize(text)
+
+        # Longest match starting at each position (end, node).
+        best = {}
+        state = 0
+        for pos, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            node = out[state]
+            while node:
+                start = pos + 1 - depth[node]
+                if start not in best or best[start][0] < pos + 1:
+                    best[start] = (pos + 1, node)
+                node = out[fail[node]]
+
+        spans = []
+        last_end = 0
+        for start in sorted(best):
+            end, node = best[start]
+            if start >= last_end:
+                spans.append((start, end, node))
+                last_end = end
+        return spans
+
+    def find(self, text):
+        """Return sorted catalog ids of the dishes mentioned in text."""
+        found = set()
+        for _, _, node in self.find_spans(text):
+            found.update(self._ids[node])
+        return sorted(found)
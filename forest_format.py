@@ -0,0 +1,257 @@
+"""Flat, memory-mappable artifact format for the scaler + three forests.
+
+Layout of a ``.forest`` file:
+
+    MAGIC (8 bytes) | header length (uint64) | JSON header | padding | arrays
+
+The JSON header stores the scaler, per-model metadata and the offset/dtype/shape
+of every array. All trees of all models are concatenated into the same node
+arrays (feature, threshold, left, right, value). Child indices are global, and
+leaves point to themselves, which is how the evaluator detects a finished path.
+
+Loading maps the file read-only, so gunicorn workers share the same page
+cache instead of each unpickling a private copy of the forests.
+
+A single fitted decision tree (e.g. a distilled model) is stored as a forest of
+one tree. With ``quantize=True`` the arrays are narrowed to QUANTIZED_ARRAYS:
+float32 thresholds rounded down so every float32 input takes the same branch,
+float32 leaf values and int16 feature ids. Array dtypes are recorded in the
+header, so both layouts load the same way.
+"""
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+MAGIC = b"VHFOREST"
+FORMAT_VERSION = 1
+ALIGN = 64
+NODE_ARRAYS = {
+    "feature": np.int32,
+    "threshold": np.float64,
+    "left": np.int32,
+    "right": np.int32,
+    "value": np.float64,
+}
+QUANTIZED_ARRAYS = {
+    "feature": np.int16,
+    "threshold": np.float32,
+    "left": np.int32,
+    "right": np.int32,
+    "value": np.float32,
+}
+
+
+def _pad(n):
+    return (-n) % ALIGN
+
+
+def _estimators(model):
+    """Trees of a fitted forest, or the model itself when it is a single tree."""
+    return model.estimators_ if hasattr(model, "estimators_") else [model]
+
+
+def is_exportable(model):
+    """True for fitted tree classifiers that _flatten_forest can store."""
+    return hasattr(model, "classes_") and all(hasattr(e, "tree_") for e in _estimators(model))
+
+
+def _round_down_float32(threshold):
+    """
+    Largest float32 <= each float64 threshold. For float32 inputs x,
+    x <= result exactly when x <= threshold, so branches do not change.
+    """
+    narrowed = threshold.astype(np.float32)
+    too_high = narrowed.astype(np.float64) > threshold
+    narrowed[too_high] = np.nextafter(narrowed[too_high], np.float32(-np.inf))
+    return narrowed
+
+
+def _flatten_forest(forest, node_offset):
+    """Node arrays of every tree in a fitted forest, with global child indices."""
+    positive = list(forest.classes_).index(1)
+    parts = {name: [] for name in NODE_ARRAYS}
+    roots = []
+    max_depth = 0
+    for estimator in _estimators(forest):
+        tree = estimator.tree_
+        nodes = np.arange(tree.node_count) + node_offset
+        is_leaf = tree.children_left == -1
+
+        value = tree.value[:, 0, :forest.n_classes_]
+        normalizer = value.sum(axis=1)
+        normalizer[normalizer == 0.0] = 1.0
+
+        parts["feature"].append(np.where(is_leaf, 0, tree.feature))
+        parts["threshold"].append(np.where(is_leaf, 0.0, tree.threshold))
+        parts["left"].append(np.where(is_leaf, nodes, tree.children_left + node_offset))
+        parts["right"].append(np.where(is_leaf, nodes, tree.children_right + node_offset))
+        parts["value"].append(value[:, positive] / normalizer)
+
+        roots.append(node_offset)
+        max_depth = max(max_depth, tree.max_depth)
+        node_offset += tree.node_count
+    return parts, roots, max_depth, node_offset
+
+
+def export_forests(scaler, models, path, quantize=False):
+    """
+    Write the fitted scaler and RandomForest (or single decision tree) models to
+    a flat .forest file; quantize=True stores the narrower QUANTIZED_ARRAYS.
+    """
+    path = Path(path)
+    parts = {name: [] for name in NODE_ARRAYS}
+    header = {
+        "version": FORMAT_VERSION,
+        "scaler": {
+            "feature_names": [str(c) for c in getattr(scaler, "feature_names_in_", [])],
+            "mean": [float(v) for v in scaler.mean_],
+            "scale": [float(v) for v in scaler.scale_],
+        },
+        "models": {},
+        "arrays": {},
+    }
+
+    node_offset = 0
+    for name, forest in models.items():
+        forest_parts, roots, max_depth, node_offset = _flatten_forest(forest, node_offset)
+        for key, values in forest_parts.items():
+            parts[key].extend(values)
+        header["models"][name] = {
+            "feature_names": [str(c) for c in getattr(forest, "feature_names_in_", [])],
+            "roots": roots,
+            "max_depth": int(max_depth),
+        }
+
+    dtypes = QUANTIZED_ARRAYS if quantize else NODE_ARRAYS
+    arrays = {name: np.concatenate(parts[name]) for name in NODE_ARRAYS}
+    if quantize:
+        arrays["threshold"] = _round_down_float32(arrays["threshold"])
+    arrays = {name: arr.astype(dtypes[name]) for name, arr in arrays.items()}
+    offset = 0
+    for name, arr in arrays.items():
+        header["arrays"][name] = {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": offset}
+        offset += arr.nbytes + _pad(arr.nbytes)
+
+    header_bytes = json.dumps(header).encode("utf-8")
+    data_start = len(MAGIC) + 8 + len(header_bytes)
+    data_start += _pad(data_start)
+
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(np.uint64(len(header_bytes)).tobytes())
+        f.write(header_bytes)
+        f.write(b"\0" * (data_start - f.tell()))
+        for arr in arrays.values():
+            f.write(arr.tobytes())
+            f.write(b"\0" * _pad(arr.nbytes))
+    tmp_path.replace(path)
+    return path
+
+
+class FlatScaler:
+    """StandardScaler parameters read from a .forest header."""
+
+    def __init__(self, feature_names, mean, scale):
+        if feature_names:
+            self.feature_names_in_ = np.array(feature_names, dtype=object)
+        self.mean_ = np.array(mean)
+        self.scale_ = np.array(scale)
+
+    def transform(self, X):
+        return (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
+
+
+class FlatForest:
+    """NumPy evaluator for one forest stored in the shared node arrays."""
+
+    classes_ = np.array([0, 1])
+
+    def __init__(self, nodes, roots, max_depth, feature_names=None):
+        self._feature, self._threshold, self._left, self._right, self._value = nodes
+        self._roots = np.array(roots, dtype=np.int64)
+        self.max_depth = max_depth
+        if feature_names:
+            self.feature_names_in_ = np.array(feature_names, dtype=object)
+
+    @property
+    def n_estimators(self):
+        return len(self._roots)
+
+    def apply(self, X):
+        """Leaf node index reached by each (tree, sample)."""
+        # Same comparison as sklearn: float32 input against float64 thresholds.
+        X = np.asarray(X, dtype=np.float32)
+        n, n_features = X.shape
+        flat_X = X.ravel()
+        nodes = np.repeat(self._roots, n)
+        row_offsets = np.tile(np.arange(n) * n_features, len(self._roots))
+
+        # Only (tree, sample) pairs that have not reached a leaf take another step.
+        active = np.arange(nodes.size)
+        while active.size:
+            current = nodes[active]
+            go_left = flat_X[row_offsets[active] + self._feature[current]] <= self._threshold[current]
+            next_nodes = np.where(go_left, self._left[current], self._right[current])
+            moved = next_nodes != current
+            active = active[moved]
+            nodes[active] = next_nodes[moved]
+        return nodes.reshape(len(self._roots), n)
+
+    def predict_positive(self, X):
+        """Class-1 probability, averaged over trees in the same order as sklearn."""
+        leaf_values = self._value[self.apply(X)]
+        proba = np.zeros(leaf_values.shape[1])
+        for tree_values in leaf_values:
+            proba += tree_values
+        proba /= len(leaf_values)
+        return proba
+
+    def predict_proba(self, X):
+        proba = self.predict_positive(X)
+        return np.column_stack([1.0 - proba, proba])
+
+
+def load_forests(path):
+    """Map a .forest file read-only; returns (scaler, {name: FlatForest})."""
+    path = Path(path)
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a .forest file")
+        header_len = int(np.frombuffer(f.read(8), dtype=np.uint64)[0])
+        header = json.loads(f.read(header_len).decode("utf-8"))
+    if header["version"] != FORMAT_VERSION:
+        raise ValueError(f"Unsupported .forest version {header['version']}")
+
+    data_start = len(MAGIC) + 8 + header_len
+    data_start += _pad(data_start)
+    buf = np.memmap(path, dtype=np.uint8, mode="r", offset=data_start)
+
+    nodes = []
+    for name in NODE_ARRAYS:
+        spec = header["arrays"][name]
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"]))
+        start = spec["offset"]
+        nodes.append(np.asarray(buf[start:start + count * dtype.itemsize]).view(dtype).reshape(spec["shape"]))
+
+    s = header["scaler"]
+    scaler = FlatScaler(s["feature_names"], s["mean"], s["scale"])
+    models = {
+        name: FlatForest(nodes, m["roots"], m["max_depth"], m["feature_names"])
+        for name, m in header["models"].items()
+    }
+    return scaler, models
+
+
+if __name__ == "__main__":
+    # Convert an existing joblib artifact: python forest_format.py [model.pkl] [out.forest]
+    import joblib
+
+    src = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(__file__).resolve().parent / "model" / "health_model.pkl"
+    dst = Path(sys.argv[2]) if len(sys.argv) > 2 else src.with_suffix(".forest")
+    scaler, models = joblib.load(src)
+    export_forests(scaler, models, dst)
+    print(f"💾 Exported {src} -> {dst} ({dst.stat().st_size / 1e6:.1f} MB)")
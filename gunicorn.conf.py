@@ -0,0 +1,29 @@
+"""Gunicorn settings: load everything once in the master, then fork the workers.
+
+    gunicorn -c gunicorn.conf.py
+
+With preload_app the master imports wsgi.py, which loads the catalog and the
+model before forking, so workers start ready and share those pages
+copy-on-write. Override with GUNICORN_* style flags on the command line.
+"""
+import gc
+import os
+
+# The master loads the model before forking; a background load would be redone per worker
+os.environ.setdefault("VIETHEALTH_LAZY_MODEL", "0")
+
+wsgi_app = "wsgi:application"
+bind = os.environ.get("VIETHEALTH_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("VIETHEALTH_WORKERS", os.cpu_count() or 1))
+preload_app = True
+
+
+def when_ready(server):
+    # Move the loaded objects out of the GC's generations: a collection in a
+    # worker would otherwise touch (and un-share) every page holding them
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    import app
+    app.post_fork()
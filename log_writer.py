@@ -0,0 +1,121 @@
+"""Background writer for the SQLite `logs` table.
+
+Requests only put a row on a bounded in-memory queue. A single writer thread
+owns the SQLite connection (WAL mode) and inserts queued rows in batched
+transactions, so no request ever waits on a commit.
+"""
+import logging
+import queue
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+INSERT_SQL = """INSERT INTO logs (timestamp, user_info, food_input, nutrition_stats, predictions)
+                VALUES (?, ?, ?, ?, ?)"""
+
+_STOP = object()
+
+
+class LogWriter:
+    """Queue log rows in memory and flush them to SQLite from one background thread."""
+
+    def __init__(self, db_path, max_queue=10000, batch_size=500, put_timeout=0.05):
+        self.db_path = str(db_path)
+        self.batch_size = batch_size
+        self.put_timeout = put_timeout
+        self.written = 0
+        self.dropped = 0
+        self.errors = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+            self._thread.start()
+        return self
+
+    @property
+    def alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def submit(self, row, block=True):
+        """
+        Queue one (timestamp, user_info, food_input, nutrition_stats, predictions) row.
+        Blocks for at most put_timeout when the queue is full (never with
+        block=False, e.g. from an event loop), then drops the row.
+        Drops it at once when the writer thread is not running (never started, or
+        died on a database error), since nothing would ever drain the queue.
+        """
+        if not self.alive:
+            self._drop("thread not running")
+            return False
+        try:
+            self._queue.put(row, block=block, timeout=self.put_timeout)
+            return True
+        except queue.Full:
+            self._drop("queue full")
+            return False
+
+    def close(self, timeout=10):
+        """Flush everything still queued and stop the writer thread."""
+        thread, self._thread = self._thread, None
+        if thread is None or not thread.is_alive():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logger.warning("⚠️ Log queue still full at shutdown, queued rows are lost.")
+            return
+        thread.join(timeout)
+
+    def _drop(self, reason):
+        self.dropped += 1
+        if self.dropped == 1 or self.dropped % 1000 == 0:
+            logger.warning(f"⚠️ Log writer {reason}, dropped {self.dropped} rows so far.")
+
+    def _run(self):
+        conn = None
+        try:
+            conn = sqlite3.connect(self.db_path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        except sqlite3.Error as e:
+            if conn is not None:
+                conn.close()
+            self.errors += 1
+            logger.error(f"❌ Log writer could not open {self.db_path}: {e}")
+            return
+        try:
+            stopping = False
+            while not stopping:
+                item = self._queue.get()
+
+                # Drain up to batch_size rows; on shutdown drain everything left.
+                batch = []
+                while True:
+                    if item is _STOP:
+                        stopping = True
+                    else:
+                        batch.append(item)
+                    if len(batch) >= self.batch_size and not stopping:
+                        break
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+
+                if batch:
+                    self._flush(conn, batch)
+        finally:
+            conn.close()
+
+    def _flush(self, conn, batch):
+        try:
+            with conn:
+                conn.executemany(INSERT_SQL, batch)
+            self.written += len(batch)
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.error(f"❌ Error writing {len(batch)} log rows: {e}")
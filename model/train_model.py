@@ -2,11 +2,23 @@ import pandas as pd
 import numpy as np
 import joblib
 import os
+import sys
+import json
+import time
+import hashlib
+import shutil
+import sqlite3
+import datetime
 import logging
-from sklearn.ensemble import RandomForestClassifier
+import argparse
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from sklearn.ensemble import RandomForestClassifier, HistGradientBoostingClassifier
+from sklearn.tree import DecisionTreeClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import accuracy_score, classification_report
+from sklearn.metrics import accuracy_score, classification_report, roc_auc_score
 
 # Cấu hình Logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -17,84 +29,673 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_PATH = os.path.join(BASE_DIR, 'data', 'processed_diabetes.csv')
 MODEL_DIR = os.path.join(BASE_DIR, 'model')
 MODEL_PATH = os.path.join(MODEL_DIR, 'health_model.pkl')
+FOREST_PATH = os.path.join(MODEL_DIR, 'health_model.forest')
+REPORT_PATH = os.path.join(MODEL_DIR, 'train_report.json')
+# Mỗi lần train (full hoặc incremental) lưu một phiên bản riêng, manifest.json ghi lại lịch sử
+VERSIONS_DIR = os.path.join(MODEL_DIR, 'versions')
+MANIFEST_PATH = os.path.join(VERSIONS_DIR, 'manifest.json')
+# Các biến thể model (--variants), app chọn bằng VIETHEALTH_MODEL_VARIANT
+VARIANTS_DIR = os.path.join(MODEL_DIR, 'variants')
+# Log phân tích + kết quả chẩn đoán đã xác nhận (bảng outcomes, xem app.init_db)
+DB_PATH = os.path.join(BASE_DIR, 'user_logs.db')
 
-def train():
-    """Huấn luyện 3 mô hình: Diabetes, Heart Disease, Obesity từ dữ liệu thật."""
-    
+sys.path.insert(0, BASE_DIR)
+from forest_format import export_forests, is_exportable, load_forests
+from predictor import RiskPredictor, INPUT_COLS
+from perf_stats import StageRecorder, peak_rss_mb
+
+# --- Cấu hình các cột ---
+# Features chung: gender, age, smoking_history
+# Các chỉ số sức khỏe: bmi, HbA1c_level, blood_glucose_level, hypertension, heart_disease, diabetes
+# Scaler được fit trên tập hợp tất cả các cột có thể xuất hiện (dùng chung cho 3 model)
+ALL_COLS = ['gender', 'age', 'bmi', 'smoking_history', 'HbA1c_level', 'blood_glucose_level', 'hypertension', 'heart_disease', 'diabetes']
+
+# Mỗi model: (cột features, cột target)
+# Giữ nguyên thứ tự cột: RandomForest chọn feature ngẫu nhiên theo vị trí cột,
+# đổi thứ tự là ra forest khác dù cùng random_state
+MODEL_SPECS = {
+    # Model Diabetes: Target = diabetes
+    'diabetes': (['gender', 'age', 'bmi', 'smoking_history', 'HbA1c_level', 'blood_glucose_level', 'hypertension', 'heart_disease'], 'diabetes'),
+    # Model Heart Disease: Target = heart_disease (dùng diabetes làm feature)
+    'cardio': (['gender', 'age', 'bmi', 'smoking_history', 'HbA1c_level', 'blood_glucose_level', 'hypertension', 'diabetes'], 'heart_disease'),
+    # Model Hypertension (Huyết áp) thay cho Obesity vì Obesity tính bằng BMI rồi (ăn mặn -> huyết áp cao)
+    'hypertension': (['gender', 'age', 'bmi', 'smoking_history', 'HbA1c_level', 'blood_glucose_level', 'diabetes', 'heart_disease'], 'hypertension'),
+}
+MODEL_LABELS = {'diabetes': '🤖 Diabetes', 'cardio': '❤️ Heart Disease', 'hypertension': '🩸 Hypertension'}
+
+N_ESTIMATORS = 100
+TEST_SIZE = 0.2
+RANDOM_STATE = 42
+
+# --- Incremental ---
+INCREMENTAL_TREES = 10   # Số cây thêm vào mỗi forest sau một lần cập nhật
+MIN_NEW_ROWS = 50        # Ít hơn số dòng mới này thì bỏ qua lần cập nhật
+KEEP_VERSIONS = 3        # Số phiên bản giữ lại file model (các bản cũ hơn chỉ còn trong manifest)
+
+# --- Biến thể model: tên -> (loại, tham số, lượng tử hóa bản flat) ---
+# rf: RandomForest; hgb: HistGradientBoosting (chỉ lưu pickle);
+# distill: một cây quyết định học lại xác suất của forest rf_full (teacher)
+VARIANTS = {
+    'rf_full': ('rf', {'n_estimators': N_ESTIMATORS}, False),
+    'rf_full_q': ('rf', {'n_estimators': N_ESTIMATORS}, True),
+    'rf_d12': ('rf', {'n_estimators': N_ESTIMATORS, 'max_depth': 12}, True),
+    'rf_d8_t25': ('rf', {'n_estimators': 25, 'max_depth': 8}, True),
+    'hgb': ('hgb', {'max_iter': 100, 'max_depth': 6}, False),
+    'distilled': ('distill', {'max_depth': 10, 'min_samples_leaf': 20}, True),
+}
+LATENCY_BATCH = 1000     # Số dòng khi đo latency batch
+LATENCY_REPEAT = 200     # Số lần đo latency 1 dòng (lấy median)
+
+# --- Nạp dữ liệu train ---
+# Chỉ đọc các cột cần, với dtype gọn: cờ 0/1 và mã hóa -> int8, số đo -> float32
+SOURCE_DTYPES = {
+    'gender': np.int8, 'age': np.float32, 'hypertension': np.int8, 'heart_disease': np.int8,
+    'smoking_history': np.int8, 'bmi': np.float32, 'HbA1c_level': np.float32,
+    'blood_glucose_level': np.float32, 'diabetes': np.int8,
+}
+CHUNK_ROWS = 200_000
+# Cache ma trận features (.npy, mở bằng mmap), khóa theo hash file nguồn (--cache)
+FEATURE_CACHE_DIR = os.path.join(BASE_DIR, 'data', 'feature_cache')
+
+def read_feature_matrix(path):
+    """
+    Đọc CSV theo từng chunk CHUNK_ROWS dòng, chỉ các cột trong SOURCE_DTYPES, rồi xếp vào
+    ma trận float32 liên tục (C-contiguous) theo ALL_COLS, dùng chung cho cả 3 model.
+    Các dòng được sắp theo thứ tự split: [0, n_train) là tập train, phần còn lại là test.
+    (Cùng random_state nên đây chính là split mà từng model dùng trước đây.)
+    """
+    parts = {col: [] for col in SOURCE_DTYPES}
+    for chunk in pd.read_csv(path, usecols=list(SOURCE_DTYPES), dtype=SOURCE_DTYPES, chunksize=CHUNK_ROWS):
+        for col, values in parts.items():
+            values.append(chunk[col].to_numpy())
+    columns = {col: np.concatenate(values) if values else np.empty(0, dtype=SOURCE_DTYPES[col])
+               for col, values in parts.items()}
+    del parts
+
+    n_rows = len(columns['diabetes'])
+    train_idx, test_idx = train_test_split(np.arange(n_rows), test_size=TEST_SIZE, random_state=RANDOM_STATE)
+    order = np.concatenate([train_idx, test_idx])
+    matrix = np.empty((n_rows, len(ALL_COLS)), dtype=np.float32)
+    for j, col in enumerate(ALL_COLS):
+        matrix[:, j] = columns[col][order]
+    return matrix, len(train_idx)
+
+def _cache_key(path):
+    """Hash nội dung file nguồn + bố cục ma trận + cách split: đổi một trong số đó thì cache cũ không dùng nữa."""
+    digest = hashlib.sha256(json.dumps([ALL_COLS, TEST_SIZE, RANDOM_STATE]).encode())
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+def load_features(path=None, cache_dir=None):
+    """
+    Ma trận features của file dữ liệu (mặc định DATA_PATH): trả về (ma trận, n_train, thông tin).
+    cache_dir: lần đầu lưu ma trận thành features_<hash>.npy, các lần sau mở lại bằng mmap
+    (chỉ đọc, không parse CSV). Thông tin gồm nguồn ("csv"/"cache"), số dòng và thời gian nạp.
+    """
+    path = path or DATA_PATH
+    start = time.perf_counter()
+    info = {"source": "csv", "cache_file": None}
+    if cache_dir:
+        key = _cache_key(path)
+        cache_path = os.path.join(cache_dir, f"features_{key}.npy")
+        meta_path = os.path.join(cache_dir, f"features_{key}.json")
+        info["cache_file"] = cache_path
+        if os.path.exists(cache_path) and os.path.exists(meta_path):
+            with open(meta_path, encoding='utf-8') as f:
+                n_train = json.load(f)["n_train"]
+            matrix = np.load(cache_path, mmap_mode='r')
+            info["source"] = "cache"
+        else:
+            matrix, n_train = read_feature_matrix(path)
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(cache_path + ".tmp", 'wb') as f:
+                np.save(f, matrix)
+            os.replace(cache_path + ".tmp", cache_path)
+            with open(meta_path, 'w', encoding='utf-8') as f:
+                json.dump({"source": os.path.abspath(path), "rows": len(matrix), "n_train": n_train,
+                           "columns": ALL_COLS}, f, indent=2)
+    else:
+        matrix, n_train = read_feature_matrix(path)
+
+    info.update(rows=len(matrix), load_s=round(time.perf_counter() - start, 3))
+    logger.info(f"📥 Đã nạp {len(matrix)} dòng từ {info['source']} trong {info['load_s']}s "
+                f"(ma trận {matrix.nbytes / 1e6:.1f} MB)")
+    return matrix, n_train, info
+
+def model_data(matrix, n_train, name, scaler=None):
+    """
+    (X_train, X_test, y_train, y_test) của một model, X là DataFrame theo đúng thứ tự cột
+    trong MODEL_SPECS. Cột liền nhau trong ma trận (Diabetes) thì X là view, không copy;
+    các model khác copy riêng cột của mình.
+    Có scaler: X là features đã chuẩn hóa (float32), đúng như app/RiskPredictor đưa vào
+    model lúc serve; nhãn y vẫn lấy từ ma trận gốc.
+    """
+    feature_cols, target_col = MODEL_SPECS[name]
+    cols = [ALL_COLS.index(c) for c in feature_cols]
+    if cols == list(range(cols[0], cols[0] + len(cols))):
+        cols = slice(cols[0], cols[0] + len(cols))
+    target = ALL_COLS.index(target_col)
+    X = matrix
+    if scaler is not None:
+        # Cùng phép tính với RiskPredictor: (x - mean) / scale trên float64, rồi cây đọc float32
+        mean, scale = scaler.mean_[cols], scaler.scale_[cols]
+        X = np.empty((len(matrix), len(feature_cols)), dtype=np.float32)
+        X[:] = (matrix[:, cols] - mean) / scale
+        cols = slice(None)
+    return (
+        pd.DataFrame(X[:n_train, cols], columns=feature_cols, copy=False),
+        pd.DataFrame(X[n_train:, cols], columns=feature_cols, copy=False),
+        matrix[:n_train, target].astype(np.int64),
+        matrix[n_train:, target].astype(np.int64),
+    )
+
+def fit_scaler(matrix):
+    """StandardScaler trên ALL_COLS (cả ma trận, không copy)."""
+    return StandardScaler().fit(pd.DataFrame(matrix, columns=ALL_COLS, copy=False))
+
+# --- Worker (chạy trong process pool) ---
+_SHARED = {}
+
+def _init_worker(shm_name, shape, n_train, scaler):
+    """Gắn vào ma trận dùng chung (shared memory) thay vì copy dữ liệu sang từng process."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _SHARED.update(shm=shm, matrix=np.ndarray(shape, dtype=np.float32, buffer=shm.buf), n_train=n_train,
+                   scaler=scaler)
+    tracemalloc.start()
+
+def _fit_model(name, matrix, n_train, n_jobs, scaler):
+    """
+    Train một model trên ma trận dùng chung, với features đã chuẩn hóa bằng scaler
+    (giống lúc serve); trả về model + accuracy + thời gian/bộ nhớ.
+    """
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    X_train, X_test, y_train, y_test = model_data(matrix, n_train, name, scaler)
+
+    model = RandomForestClassifier(n_estimators=N_ESTIMATORS, random_state=RANDOM_STATE, n_jobs=n_jobs)
+    model.fit(X_train, y_train)
+    accuracy = accuracy_score(y_test, model.predict(X_test))
+    return {
+        "name": name,
+        "model": model,
+        "accuracy": accuracy,
+        "wall_s": time.perf_counter() - start,
+        "peak_traced_mb": tracemalloc.get_traced_memory()[1] / 1e6 if tracemalloc.is_tracing() else None,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+def _fit_model_shared(name, n_jobs):
+    return _fit_model(name, _SHARED["matrix"], _SHARED["n_train"], n_jobs, _SHARED["scaler"])
+
+def fit_models(matrix, n_train, workers, n_jobs, scaler):
+    """Train 3 model song song trong process pool (workers=1: chạy tuần tự trong process hiện tại)."""
+    if workers <= 1:
+        return [_fit_model(name, matrix, n_train, n_jobs, scaler) for name in MODEL_SPECS]
+
+    shm = shared_memory.SharedMemory(create=True, size=matrix.nbytes)
+    try:
+        np.ndarray(matrix.shape, dtype=matrix.dtype, buffer=shm.buf)[:] = matrix
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(shm.name, matrix.shape, n_train, scaler)) as pool:
+            futures = [pool.submit(_fit_model_shared, name, n_jobs) for name in MODEL_SPECS]
+            return [f.result() for f in futures]
+    finally:
+        shm.close()
+        shm.unlink()
+
+def train(workers=None, n_jobs=None, cache=False):
+    """
+    Huấn luyện 3 mô hình: Diabetes, Heart Disease, Hypertension từ dữ liệu thật.
+    workers: số process train song song (mặc định: min(3, số CPU)).
+    n_jobs: số luồng cho mỗi RandomForest (mặc định: chia đều CPU cho các worker).
+    cache: lưu/đọc ma trận features trong FEATURE_CACHE_DIR.
+    """
     if not os.path.exists(DATA_PATH):
         logger.error(f"❌ Không tìm thấy file dữ liệu: {DATA_PATH}")
         return
 
+    cpus = os.cpu_count() or 1
+    workers = workers or min(len(MODEL_SPECS), cpus)
+    n_jobs = n_jobs or max(1, cpus // workers)
+    total_start = time.perf_counter()
+
+    with StageRecorder() as recorder:
+        # --- 1. Chuẩn bị dữ liệu (một lần cho cả 3 model) ---
+        with recorder.stage("load_features"):
+            logger.info("🔄 Đang tải dữ liệu...")
+            matrix, n_train, load_info = load_features(DATA_PATH, FEATURE_CACHE_DIR if cache else None)
+
+        # Scaler (Chuẩn hóa dữ liệu) fit trên tập features đầy đủ nhất để dùng chung.
+        # App chuẩn hóa input trước khi predict, nên các model cũng phải học trên features đã chuẩn hóa
+        with recorder.stage("fit_scaler"):
+            scaler = fit_scaler(matrix)
+
+        # --- 2. Huấn luyện song song ---
+        logger.info(f"🤖 Đang train {len(MODEL_SPECS)} model ({workers} process, n_jobs={n_jobs} mỗi model)...")
+        with recorder.stage("fit_models"):
+            results = fit_models(matrix, n_train, workers, n_jobs, scaler)
+
+        models = {}
+        for r in results:
+            logger.info(f"   ✅ {MODEL_LABELS[r['name']]} Accuracy: {r['accuracy']:.4f}")
+            recorder.add(f"fit_{r['name']}", r["wall_s"], r["peak_traced_mb"], r["peak_rss_mb"])
+            models[r["name"]] = r["model"]
+
+        # --- 3. Lưu Model (phiên bản mới trong VERSIONS_DIR, rồi đưa lên MODEL_PATH/FOREST_PATH) ---
+        with recorder.stage("save_model"):
+            version, version_dir = save_version_artifacts(scaler, models)
+
+    report = {
+        "version": version,
+        "mode": "full",
+        "rows": len(matrix),
+        "data_source": load_info["source"],
+        "workers": workers,
+        "n_jobs": n_jobs,
+        "total_wall_s": round(time.perf_counter() - total_start, 3),
+        "accuracy": {r["name"]: round(r["accuracy"], 4) for r in results},
+        "n_estimators": {name: len(m.estimators_) for name, m in models.items()},
+        "stages": recorder.stages,
+    }
+    # Model full chưa học bảng outcomes nào: lần incremental sau sẽ đọc lại từ đầu
+    publish_version(version, version_dir, report, parent=None, outcomes_through=0)
+    logger.info(f"📊 Tổng thời gian: {report['total_wall_s']}s, báo cáo tại: {REPORT_PATH}")
+    return report
+
+# --- Phiên bản model ---
+def read_manifest():
+    """Lịch sử các phiên bản: {"current": tên phiên bản đang dùng, "versions": [...]}."""
+    if not os.path.exists(MANIFEST_PATH):
+        return {"current": None, "versions": []}
+    with open(MANIFEST_PATH, encoding='utf-8') as f:
+        return json.load(f)
+
+def _current_entry(manifest):
+    for entry in manifest["versions"]:
+        if entry["version"] == manifest["current"]:
+            return entry
+    return None
+
+def save_version_artifacts(scaler, models):
+    """Ghi pickle + bản flat vào thư mục phiên bản mới (v0001, v0002, ...); trả về (tên, thư mục)."""
+    manifest = read_manifest()
+    number = max((int(e["version"][1:]) for e in manifest["versions"]), default=0) + 1
+    version = f"v{number:04d}"
+    version_dir = os.path.join(VERSIONS_DIR, version)
+    os.makedirs(version_dir, exist_ok=True)
+
+    joblib.dump((scaler, models), os.path.join(version_dir, os.path.basename(MODEL_PATH)))
+    # Xuất thêm bản flat (mảng node) để các worker mmap dùng chung thay vì unpickle
+    export_forests(scaler, models, os.path.join(version_dir, os.path.basename(FOREST_PATH)))
+    logger.info(f"💾 Đã lưu model phiên bản {version} tại: {version_dir}")
+    return version, version_dir
+
+def _replace_with(src, dst):
+    """Thay dst bằng src một cách nguyên tử (hard link nếu được, không thì copy)."""
+    tmp = dst + ".tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    try:
+        os.link(src, tmp)
+    except OSError:
+        shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+
+def publish_version(version, version_dir, report, parent, outcomes_through):
+    """
+    Ghi báo cáo, đưa phiên bản lên làm model đang dùng (MODEL_PATH, FOREST_PATH,
+    REPORT_PATH), cập nhật manifest và xóa file của các phiên bản cũ hơn KEEP_VERSIONS.
+    """
+    with open(os.path.join(version_dir, os.path.basename(REPORT_PATH)), 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    os.makedirs(MODEL_DIR, exist_ok=True)
+    for path in (MODEL_PATH, FOREST_PATH, REPORT_PATH):
+        _replace_with(os.path.join(version_dir, os.path.basename(path)), path)
+
+    manifest = read_manifest()
+    manifest["versions"].append({
+        "version": version,
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "mode": report["mode"],
+        "parent": parent,
+        "rows": report["rows"],
+        "outcomes_through": outcomes_through,
+        "n_estimators": report["n_estimators"],
+        "accuracy": report["accuracy"],
+        "total_wall_s": report["total_wall_s"],
+    })
+    manifest["current"] = version
+    for entry in manifest["versions"][:-KEEP_VERSIONS]:
+        old_dir = os.path.join(VERSIONS_DIR, entry["version"])
+        if os.path.isdir(old_dir):
+            shutil.rmtree(old_dir)
+            entry["pruned"] = True
+
+    tmp = MANIFEST_PATH + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, MANIFEST_PATH)
+    logger.info(f"🚀 Đang dùng model phiên bản {version} ({MODEL_PATH})")
+
+# --- Incremental training từ log đã xác nhận ---
+def load_confirmed_outcomes(db_path, after_id=0):
+    """
+    Các phân tích đã có kết quả chẩn đoán xác nhận (bảng outcomes, id > after_id),
+    dưới dạng DataFrame float32 theo ALL_COLS. Trả về (DataFrame, id outcome lớn nhất đã đọc).
+    HbA1c/đường huyết đo thật được ưu tiên; thiếu thì dùng giá trị mô phỏng đã log.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute("""
+            SELECT o.id, l.user_info, l.nutrition_stats, o.diabetes, o.heart_disease, o.hypertension,
+                   o.hba1c, o.glucose
+            FROM outcomes o JOIN logs l ON l.id = o.log_id
+            WHERE o.id > ? AND o.diabetes IS NOT NULL AND o.heart_disease IS NOT NULL
+                  AND o.hypertension IS NOT NULL
+            ORDER BY o.id""", (after_id,)).fetchall()
+    finally:
+        conn.close()
+
+    matrix = np.empty((len(rows), len(ALL_COLS)), dtype=np.float32)
+    last_id = after_id
+    for i, (outcome_id, user_info, stats, diabetes, heart, hypertension, hba1c, glucose) in enumerate(rows):
+        user_info = json.loads(user_info)
+        stats = json.loads(stats)
+        simulated = stats.get("simulated_health", {})
+        values = {
+            'gender': 1 if user_info.get('gender') == 'Male' else 0,
+            'age': float(user_info.get('age')),
+            'bmi': float(stats["bmi"]),
+            'smoking_history': int(user_info.get('smoking', 0)),
+            'HbA1c_level': hba1c if hba1c is not None else simulated["hba1c"],
+            'blood_glucose_level': glucose if glucose is not None else simulated["glucose"],
+            'hypertension': hypertension,
+            'heart_disease': heart,
+            'diabetes': diabetes,
+        }
+        matrix[i] = [values[c] for c in ALL_COLS]
+        last_id = outcome_id
+    return pd.DataFrame(matrix, columns=ALL_COLS, copy=False), last_id
+
+def train_incremental(db_path=DB_PATH, n_trees=INCREMENTAL_TREES, n_jobs=None, min_rows=MIN_NEW_ROWS):
+    """
+    Cập nhật model đang dùng bằng dữ liệu mới (outcomes chưa học) thay vì train lại từ đầu:
+    - Scaler: giữ nguyên. Các cây cũ đã học trên features chuẩn hóa bằng đúng scaler này;
+      đổi mean/scale thì mọi cây cũ nhận input khác lúc serve.
+    - Mỗi forest: warm_start, thêm n_trees cây chỉ train trên dữ liệu mới (chuẩn hóa bằng
+      scaler cũ), bỏ qua forest nào mà dữ liệu mới không đủ cả hai lớp.
+    Kết quả được lưu thành phiên bản mới. Accuracy trước/sau đo qua RiskPredictor (đường serve)
+    trên 20% dữ liệu mới được giữ lại; sau khi đo, các cây mới được train lại trên toàn bộ dữ liệu mới.
+    """
+    if not os.path.exists(MODEL_PATH):
+        logger.error(f"❌ Chưa có model để cập nhật: {MODEL_PATH} (chạy train đầy đủ trước)")
+        return
+    if not os.path.exists(db_path):
+        logger.error(f"❌ Không tìm thấy database log: {db_path}")
+        return
+
+    manifest = read_manifest()
+    current = _current_entry(manifest)
+    after_id = current["outcomes_through"] if current else 0
+    total_start = time.perf_counter()
+
+    with StageRecorder() as recorder:
+        with recorder.stage("load_outcomes"):
+            data, last_id = load_confirmed_outcomes(db_path, after_id)
+        if len(data) < min_rows:
+            logger.info(f"ℹ️ Chỉ có {len(data)} dòng mới (cần {min_rows}), bỏ qua lần cập nhật.")
+            return
+
+        with recorder.stage("load_model"):
+            logger.info(f"🔄 Đang tải model hiện tại ({current['version'] if current else MODEL_PATH})...")
+            scaler, models = joblib.load(MODEL_PATH)
+
+        train_idx, test_idx = train_test_split(np.arange(len(data)), test_size=TEST_SIZE, random_state=RANDOM_STATE)
+
+        # Cột lấy theo tên đã fit (model cũ có thể dùng thứ tự cột khác). Chuẩn hóa trên float64
+        # như RiskPredictor, để cây mới học đúng giá trị mà nó sẽ nhận lúc serve
+        scaler_cols = list(scaler.feature_names_in_)
+        scaled = pd.DataFrame(scaler.transform(data[scaler_cols].astype(np.float64)), columns=scaler_cols)
+        test_rows = data[scaler_cols].to_numpy()[test_idx]
+
+        def served_accuracy(name, y_test):
+            proba = RiskPredictor(scaler, models).predict_model(name, test_rows)
+            return round(accuracy_score(y_test, proba > 0.5), 4)
+
+        accuracy = {}
+        accuracy_before = {}
+        for name, (feature_cols, target_col) in MODEL_SPECS.items():
+            model = models[name]
+            feature_cols = list(getattr(model, 'feature_names_in_', feature_cols))
+            X_train = scaled.iloc[train_idx][feature_cols]
+            y = data[target_col].to_numpy().astype(np.int64)
+            y_train, y_test = y[train_idx], y[test_idx]
+
+            with recorder.stage(f"update_{name}"):
+                accuracy_before[name] = served_accuracy(name, y_test)
+                if not np.array_equal(np.unique(y_train), model.classes_):
+                    logger.warning(f"   ⚠️ {MODEL_LABELS[name]}: dữ liệu mới không đủ các lớp {list(model.classes_)}, giữ nguyên.")
+                    accuracy[name] = accuracy_before[name]
+                else:
+                    n_before = len(model.estimators_)
+                    model.set_params(warm_start=True, n_estimators=n_before + n_trees,
+                                     n_jobs=n_jobs or os.cpu_count() or 1)
+                    model.fit(X_train, y_train)
+                    accuracy[name] = served_accuracy(name, y_test)
+                    # Cây vừa thêm chỉ để đo accuracy; bỏ chúng rồi train lại trên toàn bộ dòng mới
+                    # (cả 20% giữ lại), vì outcomes_through = last_id đánh dấu mọi dòng là đã học
+                    model.estimators_ = model.estimators_[:n_before]
+                    model.fit(scaled[feature_cols], y)
+                    model.set_params(warm_start=False)
+            logger.info(f"   ✅ {MODEL_LABELS[name]}: {len(model.estimators_)} cây, accuracy (dữ liệu mới) "
+                        f"{accuracy_before[name]:.4f} -> {accuracy[name]:.4f}")
+
+        with recorder.stage("save_model"):
+            version, version_dir = save_version_artifacts(scaler, models)
+
+    report = {
+        "version": version,
+        "mode": "incremental",
+        "parent": current["version"] if current else None,
+        "rows": len(data),
+        "outcomes_through": last_id,
+        "trees_added": n_trees,
+        "total_wall_s": round(time.perf_counter() - total_start, 3),
+        "accuracy_before": accuracy_before,
+        "accuracy": accuracy,
+        "n_estimators": {name: len(m.estimators_) for name, m in models.items()},
+        "stages": recorder.stages,
+    }
+    # So với lần train đầy đủ gần nhất còn trong manifest
+    full = [e for e in manifest["versions"] if e["mode"] == "full"]
+    if full:
+        report["last_full_wall_s"] = full[-1]["total_wall_s"]
+        report["speedup_vs_full"] = round(full[-1]["total_wall_s"] / report["total_wall_s"], 1)
+    publish_version(version, version_dir, report, parent=report["parent"], outcomes_through=last_id)
+    logger.info(f"📊 Cập nhật incremental: {report['total_wall_s']}s"
+                + (f" (train đầy đủ gần nhất: {report['last_full_wall_s']}s)" if full else ""))
+    return report
+
+# --- Biến thể model ---
+def _make_model(kind, params, n_jobs):
+    if kind == 'rf':
+        return RandomForestClassifier(random_state=RANDOM_STATE, n_jobs=n_jobs, **params)
+    if kind == 'hgb':
+        return HistGradientBoostingClassifier(random_state=RANDOM_STATE, **params)
+    raise ValueError(f"Loại model không hợp lệ: {kind}")
+
+def distill(teacher, X_train, params):
+    """
+    Nén forest thành một cây quyết định: mỗi dòng train xuất hiện hai lần (nhãn 0 và 1)
+    với trọng số 1-p và p, p là xác suất của teacher, nên mỗi lá học đúng xác suất trung bình.
+    """
+    positive = list(teacher.classes_).index(1)
+    p = teacher.predict_proba(X_train)[:, positive]
+    X = pd.concat([X_train, X_train], ignore_index=True)
+    y = np.concatenate([np.zeros(len(p), dtype=np.int64), np.ones(len(p), dtype=np.int64)])
+    weight = np.concatenate([1.0 - p, p])
+    keep = weight > 0
+    tree = DecisionTreeClassifier(random_state=RANDOM_STATE, **params)
+    return tree.fit(X[keep], y[keep], sample_weight=weight[keep])
+
+def _measure_latency(predictor, features):
+    """(median µs cho 1 dòng, µs mỗi dòng khi chạy batch LATENCY_BATCH dòng)."""
+    row = features[:1]
+    samples = []
+    for _ in range(LATENCY_REPEAT):
+        start = time.perf_counter()
+        predictor.predict_batch(row)
+        samples.append(time.perf_counter() - start)
+    batch = features[:LATENCY_BATCH]
+    start = time.perf_counter()
+    predictor.predict_batch(batch)
+    batch_s = time.perf_counter() - start
+    return float(np.median(samples)) * 1e6, batch_s / len(batch) * 1e6
+
+def variant_paths(name):
+    """(pickle, flat .forest) của một biến thể."""
+    variant_dir = os.path.join(VARIANTS_DIR, name)
+    return (os.path.join(variant_dir, os.path.basename(MODEL_PATH)),
+            os.path.join(variant_dir, os.path.basename(FOREST_PATH)))
+
+def train_variants(names=None, n_jobs=None, cache=False):
+    """
+    Train các biến thể trong VARIANTS (mặc định: tất cả) trên cùng split với train(),
+    lưu vào VARIANTS_DIR/<tên>/ và ghi báo cáo accuracy/AUC, latency (1 dòng và batch,
+    đo như app: bản flat nếu có, không thì pickle) và kích thước file.
+    Mọi chỉ số đều đo qua đúng đường serve (RiskPredictor trên bản sẽ được dùng).
+    Báo cáo VARIANTS_DIR/report.json được gộp: biến thể train lại thì thay, các biến thể khác giữ nguyên.
+    """
+    names = names or list(VARIANTS)
+    unknown = [n for n in names if n not in VARIANTS]
+    if unknown:
+        raise ValueError(f"Biến thể không tồn tại: {unknown} (có: {list(VARIANTS)})")
+    if not os.path.exists(DATA_PATH):
+        logger.error(f"❌ Không tìm thấy file dữ liệu: {DATA_PATH}")
+        return
+    n_jobs = n_jobs or os.cpu_count() or 1
+
     logger.info("🔄 Đang tải dữ liệu...")
-    df = pd.read_csv(DATA_PATH)
-    
-    # --- 1. Chuẩn bị dữ liệu ---
-    # Features chung: gender, age, smoking_history
-    # Các chỉ số sức khỏe: bmi, HbA1c_level, blood_glucose_level, hypertension, heart_disease, diabetes
-    
-    # Để đơn giản hóa cho App, ta sẽ dùng chung một tập features đầu vào cho cả 3 model
-    # Input từ App dự kiến: Gender, Age, BMI, Smoking, Glucose (ước lượng từ đường), HbA1c (ước lượng)
-    feature_cols = ['gender', 'age', 'bmi', 'smoking_history', 'HbA1c_level', 'blood_glucose_level', 'hypertension', 'heart_disease']
-    
-    # Xử lý dữ liệu cho từng model
-    # Model Diabetes: Target = diabetes
-    X_d = df[['gender', 'age', 'bmi', 'smoking_history', 'HbA1c_level', 'blood_glucose_level', 'hypertension', 'heart_disease']]
-    y_d = df['diabetes']
-    
-    # Model Heart Disease: Target = heart_disease
-    # Khi dự đoán tim mạch, ta dùng diabetes làm feature
-    X_c = df[['gender', 'age', 'bmi', 'smoking_history', 'HbA1c_level', 'blood_glucose_level', 'hypertension', 'diabetes']]
-    y_c = df['heart_disease']
-    
-    # Model Obesity: Target = (BMI >= 30)
-    # Thực tế BMI là input, nhưng để có model thứ 3 như yêu cầu, ta sẽ train nó dự đoán "Nguy cơ béo phì tiềm ẩn"
-    # dựa trên các yếu tố khác (hoặc ta có thể train model dự đoán Hypertension - Huyết áp cao)
-    # Ở đây em sẽ chọn train model dự đoán Hypertension (Huyết áp) vì nó hợp lý hơn (ăn mặn -> huyết áp cao)
-    # Target = hypertension
-    X_h = df[['gender', 'age', 'bmi', 'smoking_history', 'HbA1c_level', 'blood_glucose_level', 'diabetes', 'heart_disease']]
-    y_h = df['hypertension']
-
-    # --- 2. Huấn luyện ---
-    
-    # Scaler (Chuẩn hóa dữ liệu)
-    # Ta fit scaler trên tập features đầy đủ nhất để dùng chung
-    scaler = StandardScaler()
-    # Fit trên tập hợp tất cả các cột có thể xuất hiện
-    all_cols = ['gender', 'age', 'bmi', 'smoking_history', 'HbA1c_level', 'blood_glucose_level', 'hypertension', 'heart_disease', 'diabetes']
-    scaler.fit(df[all_cols]) 
-    
-    models = {}
-    
-    # Train Diabetes Model
-    logger.info("🤖 Đang train Model Diabetes...")
-    X_train, X_test, y_train, y_test = train_test_split(X_d, y_d, test_size=0.2, random_state=42)
-    md = RandomForestClassifier(n_estimators=100, random_state=42)
-    md.fit(X_train, y_train)
-    logger.info(f"   ✅ Diabetes Accuracy: {accuracy_score(y_test, md.predict(X_test)):.4f}")
-    models['diabetes'] = md
-
-    # Train Heart Disease Model
-    logger.info("❤️ Đang train Model Heart Disease...")
-    X_train, X_test, y_train, y_test = train_test_split(X_c, y_c, test_size=0.2, random_state=42)
-    mc = RandomForestClassifier(n_estimators=100, random_state=42)
-    mc.fit(X_train, y_train)
-    logger.info(f"   ✅ Heart Disease Accuracy: {accuracy_score(y_test, mc.predict(X_test)):.4f}")
-    models['cardio'] = mc
-    
-    # Train Hypertension Model (Thay cho Obesity vì Obesity tính bằng BMI rồi)
-    logger.info("🩸 Đang train Model Hypertension (Huyết áp)...")
-    X_train, X_test, y_train, y_test = train_test_split(X_h, y_h, test_size=0.2, random_state=42)
-    mh = RandomForestClassifier(n_estimators=100, random_state=42)
-    mh.fit(X_train, y_train)
-    logger.info(f"   ✅ Hypertension Accuracy: {accuracy_score(y_test, mh.predict(X_test)):.4f}")
-    models['hypertension'] = mh
-
-    # --- 3. Lưu Model ---
-    if not os.path.exists(MODEL_DIR):
-        os.makedirs(MODEL_DIR)
-        
-    joblib.dump((scaler, models), MODEL_PATH)
-    logger.info(f"💾 Đã lưu toàn bộ model tại: {MODEL_PATH}")
+    matrix, n_train, _ = load_features(DATA_PATH, FEATURE_CACHE_DIR if cache else None)
+    scaler = fit_scaler(matrix)
+    # Latency đo trên các profile của tập test (6 cột đầu vào của app);
+    # accuracy/AUC trên các dòng test đầy đủ (cờ bệnh thật), chưa chuẩn hóa như input của app
+    test_rows = matrix[n_train:]
+    latency_features = test_rows[:, [ALL_COLS.index(c) for c in INPUT_COLS]].astype(np.float64)
+
+    fitted = {}   # (loại, tham số) -> models, để rf_full và rf_full_q dùng chung một lần train
+    def fit(kind, params):
+        key = (kind, json.dumps(params, sort_keys=True))
+        if key not in fitted:
+            teacher = fit('rf', VARIANTS['rf_full'][1])[0] if kind == 'distill' else None
+            models, seconds = {}, 0.0
+            for name in MODEL_SPECS:
+                X_train, _, y_train, _ = model_data(matrix, n_train, name, scaler)
+                start = time.perf_counter()
+                if kind == 'distill':
+                    models[name] = distill(teacher[name], X_train, params)
+                elif kind == 'hgb':
+                    # RiskPredictor gọi predict_proba với ndarray: fit trên DataFrame thì sklearn
+                    # cảnh báo tên cột ở mỗi lần predict. Cột theo MODEL_SPECS (= MODEL_FEATURES)
+                    models[name] = _make_model(kind, params, n_jobs).fit(X_train.to_numpy(), y_train)
+                else:
+                    models[name] = _make_model(kind, params, n_jobs).fit(X_train, y_train)
+                seconds += time.perf_counter() - start
+            fitted[key] = (models, seconds)
+        return fitted[key]
+
+    os.makedirs(VARIANTS_DIR, exist_ok=True)
+    report_path = os.path.join(VARIANTS_DIR, 'report.json')
+    report = {"variants": {}}
+    if os.path.exists(report_path):
+        with open(report_path, encoding='utf-8') as f:
+            report = json.load(f)
+    report["rows"] = len(matrix)
+    for variant in names:
+        kind, params, quantize = VARIANTS[variant]
+        logger.info(f"🤖 Biến thể {variant}: {kind} {params}{' (lượng tử hóa)' if quantize else ''}")
+        models, fit_s = fit(kind, params)
+
+        model_path, forest_path = variant_paths(variant)
+        os.makedirs(os.path.dirname(model_path), exist_ok=True)
+        joblib.dump((scaler, models), model_path)
+        if all(is_exportable(m) for m in models.values()):
+            export_forests(scaler, models, forest_path, quantize=quantize)
+            served = forest_path
+            predictor = RiskPredictor(*load_forests(forest_path))
+        else:
+            if os.path.exists(forest_path):
+                os.remove(forest_path)
+            served = model_path
+            predictor = RiskPredictor(scaler, models)
+        single_us, batch_us = _measure_latency(predictor, latency_features)
+
+        metrics = {}
+        for name, (_, target_col) in MODEL_SPECS.items():
+            y_test = test_rows[:, ALL_COLS.index(target_col)].astype(np.int64)
+            proba = predictor.predict_model(name, test_rows)
+            metrics[name] = {"accuracy": round(accuracy_score(y_test, proba > 0.5), 4),
+                             "auc": round(roc_auc_score(y_test, proba), 4)}
+
+        report["variants"][variant] = {
+            "rows": len(matrix),
+            "kind": kind,
+            "params": params,
+            "quantized": quantize,
+            "metrics": metrics,
+            "mean_auc": round(float(np.mean([m["auc"] for m in metrics.values()])), 4),
+            "fit_s": round(fit_s, 2),
+            "single_row_us": round(single_us, 1),
+            "batch_row_us": round(batch_us, 2),
+            "served_file": os.path.basename(served),
+            "artifact_mb": round(os.path.getsize(served) / 1e6, 2),
+            "pickle_mb": round(os.path.getsize(model_path) / 1e6, 2),
+        }
+        del predictor
+
+    with open(report_path + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    os.replace(report_path + ".tmp", report_path)
+    print_variant_report(report)
+    return report
+
+def print_variant_report(report):
+    """In bảng so sánh accuracy/AUC (Diabetes/Cardio/Hypertension), latency và kích thước file."""
+    print(f"{'variant':<11} {'acc D/C/H':<22} {'AUC D/C/H':<22} {'1 row':>9} {'batch/row':>10} {'file':>9}")
+    for name, v in report["variants"].items():
+        acc = "/".join(f"{m['accuracy']:.3f}" for m in v["metrics"].values())
+        auc = "/".join(f"{m['auc']:.3f}" for m in v["metrics"].values())
+        print(f"{name:<11} {acc:<22} {auc:<22} {v['single_row_us']:>7.0f}µs {v['batch_row_us']:>8.1f}µs "
+              f"{v['artifact_mb']:>6.1f} MB")
+
+def pick_variant(report, slo_us):
+    """Biến thể có AUC trung bình cao nhất trong số các biến thể có latency 1 dòng <= slo_us."""
+    within = [(v["mean_auc"], name) for name, v in report["variants"].items() if v["single_row_us"] <= slo_us]
+    return max(within)[1] if within else None
 
 if __name__ == "__main__":
-    train()
+    parser = argparse.ArgumentParser(description="Train 3 model sức khỏe (Diabetes, Heart Disease, Hypertension).")
+    parser.add_argument("--workers", type=int, default=None, help="Số process train song song (mặc định: min(3, số CPU))")
+    parser.add_argument("--n-jobs", type=int, default=None, help="Số luồng cho mỗi RandomForest")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Chỉ cập nhật model đang dùng bằng các outcome mới trong database log")
+    parser.add_argument("--db", default=DB_PATH, help="Database log (dùng với --incremental)")
+    parser.add_argument("--trees", type=int, default=INCREMENTAL_TREES,
+                        help="Số cây thêm vào mỗi forest (dùng với --incremental)")
+    parser.add_argument("--variants", nargs="*", metavar="NAME",
+                        help=f"Train các biến thể model (không ghi tên: tất cả {list(VARIANTS)})")
+    parser.add_argument("--slo-us", type=float, default=None,
+                        help="Latency 1 dòng tối đa (µs) để chọn biến thể từ báo cáo --variants")
+    parser.add_argument("--cache", action="store_true",
+                        help=f"Lưu/đọc ma trận features đã xử lý trong {FEATURE_CACHE_DIR} (khóa theo hash file dữ liệu)")
+    args = parser.parse_args()
+    if args.variants is not None:
+        report = train_variants(args.variants, n_jobs=args.n_jobs, cache=args.cache)
+        if report and args.slo_us is not None:
+            print(f"\n🎯 SLO {args.slo_us:.0f}µs/dòng: {pick_variant(report, args.slo_us) or 'không biến thể nào đạt'}")
+    elif args.incremental:
+        train_incremental(db_path=args.db, n_trees=args.trees, n_jobs=args.n_jobs)
+    else:
+        train(workers=args.workers, n_jobs=args.n_jobs, cache=args.cache)
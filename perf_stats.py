@@ -0,0 +1,74 @@
+"""Wall-time and memory bookkeeping for offline jobs (training, data cleaning).
+
+StageRecorder times named stages and records, for each one, the peak of
+memory traced by tracemalloc (Python objects and NumPy buffers) during the
+stage plus the process-wide peak RSS reached so far.
+"""
+import contextlib
+import logging
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None where unsupported)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KB on Linux and in bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class StageRecorder:
+    """Collect {stage, wall_s, peak_traced_mb, peak_rss_mb} rows for a job."""
+
+    def __init__(self, trace_memory=True):
+        self.stages = []
+        self.trace_memory = trace_memory
+        self._started_tracing = trace_memory and not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start,
+                     tracemalloc.get_traced_memory()[1] / 1e6 if self.trace_memory else None)
+
+    def add(self, name, wall_s, peak_traced_mb=None, peak_rss=None):
+        """Record a stage measured elsewhere (e.g. in a worker process)."""
+        if peak_rss is None:
+            peak_rss = peak_rss_mb()
+        row = {
+            "stage": name,
+            "wall_s": round(wall_s, 3),
+            "peak_traced_mb": None if peak_traced_mb is None else round(peak_traced_mb, 1),
+            "peak_rss_mb": None if peak_rss is None else round(peak_rss, 1),
+        }
+        self.stages.append(row)
+        logger.info(f"⏱️ {name}: {row['wall_s']}s, peak traced {row['peak_traced_mb']} MB, peak RSS {row['peak_rss_mb']} MB")
+        return row
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def stop(self):
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
@@ -0,0 +1,167 @@
+"""Fused inference pipeline for the diabetes -> cardio -> hypertension risk chain.
+
+RiskPredictor is built once when the model is loaded. It folds the shared
+StandardScaler into per-column offsets, precomputes the class-1 probability of
+every tree node and then runs the whole chain without re-scaling the input or
+going through sklearn's per-call validation.
+"""
+import time
+
+import numpy as np
+
+# Columns the scaler was fitted on (see model/train_model.py)
+ALL_COLS = ['gender', 'age', 'bmi', 'smoking_history', 'HbA1c_level', 'blood_glucose_level', 'hypertension', 'heart_disease', 'diabetes']
+# Profile features supplied by the app, in this order
+INPUT_COLS = ALL_COLS[:6]
+# Feature columns of each model, used when the model carries no feature_names_in_
+MODEL_FEATURES = {
+    'diabetes': ['gender', 'age', 'bmi', 'smoking_history', 'HbA1c_level', 'blood_glucose_level', 'hypertension', 'heart_disease'],
+    'cardio': ['gender', 'age', 'bmi', 'smoking_history', 'HbA1c_level', 'blood_glucose_level', 'hypertension', 'diabetes'],
+    'hypertension': ['gender', 'age', 'bmi', 'smoking_history', 'HbA1c_level', 'blood_glucose_level', 'diabetes', 'heart_disease'],
+}
+# Short request keys accepted by RiskPredictor.predict
+INPUT_ALIASES = {'smoking': 'smoking_history', 'hba1c': 'HbA1c_level', 'glucose': 'blood_glucose_level'}
+
+
+class _ForestProba:
+    """Class-1 probability of a fitted RandomForestClassifier (or one decision tree), evaluated tree by tree."""
+
+    def __init__(self, forest):
+        positive = list(forest.classes_).index(1)
+        self.trees = []
+        # A single decision tree (distilled model) is a forest of one
+        for estimator in getattr(forest, 'estimators_', [forest]):
+            tree = estimator.tree_
+            value = tree.value[:, 0, :forest.n_classes_]
+            normalizer = value.sum(axis=1)
+            normalizer[normalizer == 0.0] = 1.0
+            self.trees.append((tree, value[:, positive] / normalizer))
+
+    def __call__(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        proba = np.zeros(X.shape[0])
+        for tree, leaf_proba in self.trees:
+            proba += leaf_proba[tree.apply(X)]
+        proba /= len(self.trees)
+        return proba
+
+
+class _ModelProba:
+    """Fallback for models that only expose predict_proba."""
+
+    def __init__(self, model):
+        self.model = model
+        self.positive = list(model.classes_).index(1)
+
+    def __call__(self, X):
+        return self.model.predict_proba(X)[:, self.positive]
+
+
+def _model_proba(model):
+    if hasattr(model, 'predict_positive'):
+        return model.predict_positive
+    if hasattr(model, 'tree_') or (hasattr(model, 'estimators_')
+                                   and all(hasattr(e, 'tree_') for e in model.estimators_)):
+        return _ForestProba(model)
+    return _ModelProba(model)
+
+
+class RiskPredictor:
+    """Chained risk predictor built from the (scaler, models) pair saved by train_model.py."""
+
+    TARGETS = ('diabetes', 'cardio', 'hypertension')
+
+    def __init__(self, scaler, models):
+        scaler_cols = list(getattr(scaler, 'feature_names_in_', ALL_COLS))
+        position = {name: i for i, name in enumerate(scaler_cols)}
+        mean = np.asarray(scaler.mean_, dtype=np.float64)
+        scale = np.asarray(scaler.scale_, dtype=np.float64)
+
+        self._input_pos = np.array([position[c] for c in INPUT_COLS])
+        self._input_mean = mean[self._input_pos]
+        self._input_scale = scale[self._input_pos]
+        # Scaled value of each chained flag column when the flag is 0 or 1
+        self._flag_pos = {c: position[c] for c in ('hypertension', 'heart_disease', 'diabetes')}
+        self._flag_scaled = {
+            c: ((0.0 - mean[i]) / scale[i], (1.0 - mean[i]) / scale[i])
+            for c, i in self._flag_pos.items()
+        }
+        self._n_cols = len(scaler_cols)
+        self._mean = mean
+        self._scale = scale
+
+        self._columns = {}
+        self._proba = {}
+        for target in self.TARGETS:
+            model = models[target]
+            cols = list(getattr(model, 'feature_names_in_', MODEL_FEATURES[target]))
+            self._columns[target] = np.array([position[c] for c in cols])
+            self._proba[target] = _model_proba(model)
+
+    def predict_proba(self, features, timer=None):
+        """
+        Run the chain on a (n, 6) matrix of INPUT_COLS.
+        Returns the (diabetes, cardio, hypertension) class-1 probability arrays.
+        When a metrics.StageTimer is given, each model's time is added to it as
+        predict_<target>.
+        """
+        features = np.asarray(features, dtype=np.float64).reshape(-1, len(INPUT_COLS))
+        n = features.shape[0]
+
+        # Scale the profile columns once; the flag columns start at "no condition".
+        scaled = np.empty((n, self._n_cols))
+        scaled[:, self._input_pos] = (features - self._input_mean) / self._input_scale
+        for c, i in self._flag_pos.items():
+            scaled[:, i] = self._flag_scaled[c][0]
+
+        start = time.perf_counter()
+        prob_d = self._proba['diabetes'](scaled[:, self._columns['diabetes']])
+        t_d = time.perf_counter()
+
+        no, yes = self._flag_scaled['diabetes']
+        scaled[:, self._flag_pos['diabetes']] = np.where(prob_d > 0.5, yes, no)
+        prob_c = self._proba['cardio'](scaled[:, self._columns['cardio']])
+        t_c = time.perf_counter()
+
+        no, yes = self._flag_scaled['heart_disease']
+        scaled[:, self._flag_pos['heart_disease']] = np.where(prob_c > 0.5, yes, no)
+        prob_h = self._proba['hypertension'](scaled[:, self._columns['hypertension']])
+
+        if timer is not None:
+            timer.add('predict_diabetes', t_d - start)
+            timer.add('predict_cardio', t_c - t_d)
+            timer.add('predict_hypertension', time.perf_counter() - t_c)
+        return prob_d, prob_c, prob_h
+
+    def predict_model(self, target, rows):
+        """
+        Class-1 probability of one model for a (n, 9) matrix of unscaled rows in the
+        scaler's column order, with the recorded flag values instead of the chained
+        ones. Scales and evaluates exactly as predict_proba does; used to score
+        held-out data through the served path.
+        """
+        rows = np.asarray(rows, dtype=np.float64).reshape(-1, self._n_cols)
+        cols = self._columns[target]
+        return self._proba[target]((rows[:, cols] - self._mean[cols]) / self._scale[cols])
+
+    def predict_batch(self, features, timer=None):
+        """Risk percentages (one dict per row) for a (n, 6) matrix of INPUT_COLS."""
+        prob_d, prob_c, prob_h = self.predict_proba(features, timer)
+        return [
+            {
+                "diabetes": round(prob_d[i] * 100, 1),
+                "cardio": round(prob_c[i] * 100, 1),
+                "hypertension": round(prob_h[i] * 100, 1)
+            }
+            for i in range(len(prob_d))
+        ]
+
+    def predict(self, features):
+        """
+        Risk percentages for one profile, given as a sequence in INPUT_COLS order
+        or a dict keyed by column name (or gender/age/bmi/smoking/hba1c/glucose).
+        """
+        if isinstance(features, dict):
+            features = {INPUT_ALIASES.get(k, k): v for k, v in features.items()}
+            features = [features[c] for c in INPUT_COLS]
+        return self.predict_batch([features])[0]
@@ -0,0 +1,84 @@
+"""Sampling profiler that records one thread's stacks in collapsed (folded) format.
+
+The output has one "outer;inner;leaf count" line per distinct stack and can be
+fed straight to flamegraph.pl or speedscope.
+"""
+import collections
+import os
+import sys
+import threading
+
+
+class SamplingProfiler:
+    """
+    Sample the call stack of `thread_id` every `interval` seconds from a helper thread.
+
+    While running it lowers the interpreter switch interval to `interval` so the
+    sampler gets the GIL often enough to see short requests. The interval is
+    process-wide, so it is saved when the first profiler starts and restored
+    when the last running one stops.
+    """
+
+    _active = 0
+    _saved_switch_interval = None
+    _switch_lock = threading.Lock()
+
+    def __init__(self, thread_id=None, interval=0.0005):
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = interval
+        self.samples = 0
+        self.stacks = collections.Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        cls = SamplingProfiler
+        with cls._switch_lock:
+            if cls._active == 0:
+                cls._saved_switch_interval = sys.getswitchinterval()
+            cls._active += 1
+            sys.setswitchinterval(min(sys.getswitchinterval(), self.interval))
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is None:
+            return self
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        cls = SamplingProfiler
+        with cls._switch_lock:
+            cls._active -= 1
+            if cls._active == 0:
+                sys.setswitchinterval(cls._saved_switch_interval)
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def dump(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.collapsed())
+        return path
@@ -0,0 +1,80 @@
+"""Shared fixtures: a small synthetic (scaler, models) pair shaped like train_model.py's output.
+
+The models are fitted on scaled features with named columns, as RiskPredictor
+expects, so tests need neither the training data nor model/health_model.pkl.
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from predictor import ALL_COLS, INPUT_COLS, MODEL_FEATURES  # noqa: E402
+
+# Label column each model predicts (see MODEL_SPECS in model/train_model.py)
+TARGET_COLS = {'diabetes': 'diabetes', 'cardio': 'heart_disease', 'hypertension': 'hypertension'}
+
+
+def make_profiles(n, seed=0):
+    """(n, 6) matrix of INPUT_COLS values in realistic ranges."""
+    rng = np.random.default_rng(seed)
+    return np.column_stack([
+        rng.integers(0, 2, n),
+        rng.uniform(18, 85, n).round(),
+        rng.uniform(16, 42, n).round(2),
+        rng.integers(0, 6, n),
+        rng.uniform(4.0, 9.0, n).round(1),
+        rng.uniform(80, 260, n).round(),
+    ]).astype(float)
+
+
+def make_patients(n, seed=0):
+    """Synthetic patient rows (ALL_COLS) with labels that depend on the profile."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(make_profiles(n, seed), columns=INPUT_COLS)
+    noise = rng.random((n, 3))
+    df['diabetes'] = ((df['HbA1c_level'] > 6.4) | (df['blood_glucose_level'] > 200) | (noise[:, 0] < 0.05)).astype(int)
+    df['heart_disease'] = (((df['age'] > 60) & (df['smoking_history'] > 2)) | (noise[:, 1] < 0.08)).astype(int)
+    df['hypertension'] = (((df['bmi'] > 30) & (df['age'] > 45)) | (noise[:, 2] < 0.1)).astype(int)
+    return df[ALL_COLS]
+
+
+@pytest.fixture(scope="session")
+def trained():
+    """(scaler, {"diabetes", "cardio", "hypertension": RandomForestClassifier})."""
+    df = make_patients(3000)
+    scaler = StandardScaler().fit(df)
+    scaled = pd.DataFrame(scaler.transform(df), columns=ALL_COLS)
+    models = {
+        name: RandomForestClassifier(n_estimators=15, max_depth=7, random_state=0)
+              .fit(scaled[MODEL_FEATURES[name]], df[TARGET_COLS[name]])
+        for name in MODEL_FEATURES
+    }
+    return scaler, models
+
+
+def sklearn_chain(scaler, models, features):
+    """
+    Reference risk chain: full scaler.transform, then predict_proba of each model on
+    its own feature_names_in_ columns, with the flags set from probability > 0.5.
+    """
+    frame = pd.DataFrame(np.asarray(features, dtype=float).reshape(-1, len(INPUT_COLS)), columns=INPUT_COLS)
+    for flag in ('hypertension', 'heart_disease', 'diabetes'):
+        frame[flag] = 0
+
+    def proba(name):
+        scaled = pd.DataFrame(scaler.transform(frame[ALL_COLS]), columns=ALL_COLS)
+        model = models[name]
+        return model.predict_proba(scaled[list(getattr(model, 'feature_names_in_', MODEL_FEATURES[name]))])[:, 1]
+
+    prob_d = proba('diabetes')
+    frame['diabetes'] = (prob_d > 0.5).astype(int)
+    prob_c = proba('cardio')
+    frame['heart_disease'] = (prob_c > 0.5).astype(int)
+    prob_h = proba('hypertension')
+    return prob_d, prob_c, prob_h
@@ -0,0 +1,72 @@
+"""AnalysisCache: LRU eviction, TTL expiry and generation-based invalidation."""
+import pytest
+
+import analysis_cache
+from analysis_cache import AnalysisCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(analysis_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = AnalysisCache(max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1   # "b" is now the least recently used
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    stats = cache.stats()
+    assert stats["size"] == 2 and stats["evictions"] == 1
+    assert (stats["hits"], stats["misses"]) == (3, 1)
+
+
+def test_put_refreshes_existing_key():
+    cache = AnalysisCache(max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.put("a", 10)
+    cache.put("c", 3)
+    assert cache.get("a") == 10
+    assert cache.get("b") is None
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = AnalysisCache(ttl=60)
+    cache.put("a", 1)
+    clock[0] += 59
+    assert cache.get("a") == 1
+    clock[0] += 2
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["size"] == 0
+
+    # A new put starts a new TTL
+    cache.put("a", 2)
+    clock[0] += 59
+    assert cache.get("a") == 2
+
+
+def test_clear_drops_results_of_the_old_generation():
+    cache = AnalysisCache()
+    generation = cache.generation
+    cache.put("a", 1, generation)
+    cache.clear()
+    assert cache.get("a") is None
+    # Computed before the reload: ignored
+    cache.put("b", 2, generation)
+    assert cache.get("b") is None
+    cache.put("b", 3, cache.generation)
+    assert cache.get("b") == 3
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_size_zero_disables_cache():
+    cache = AnalysisCache(max_size=0)
+    cache.put("a", 1)
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
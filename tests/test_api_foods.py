@@ -0,0 +1,81 @@
+"""/api/foods: precomputed body with ETag/304, gzip when accepted, accent-insensitive prefix search."""
+import gzip
+import json
+
+import pytest
+
+import app
+from food_index import CachedPayload, FoodPrefixIndex, fold_accents
+
+NAMES = ["Bánh mì thịt", "Bún chả", "Bún bò Huế", "Đậu phụ sốt cà chua", "Mì Quảng", "Phở bò", "Phở   gà"]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(app, "FOOD_INDEX", FoodPrefixIndex(NAMES))
+    monkeypatch.setattr(app, "FOODS_PAYLOAD", CachedPayload(NAMES))
+    return app.app.test_client()
+
+
+def test_full_list_with_etag(client):
+    response = client.get('/api/foods')
+    assert response.status_code == 200
+    assert response.get_json() == NAMES
+    assert "Content-Encoding" not in response.headers
+    etag = response.headers["ETag"]
+    assert response.headers["Cache-Control"] == "no-cache"
+
+    revalidated = client.get('/api/foods', headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.data == b""
+    assert revalidated.headers["ETag"] == etag
+
+    assert client.get('/api/foods', headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_etag_follows_the_catalog(client, monkeypatch):
+    etag = client.get('/api/foods').headers["ETag"]
+    monkeypatch.setattr(app, "FOODS_PAYLOAD", CachedPayload(NAMES + ["Cơm tấm"]))
+    response = client.get('/api/foods', headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.get_json()[-1] == "Cơm tấm"
+
+
+def test_gzip_only_when_accepted(client):
+    response = client.get('/api/foods', headers={"Accept-Encoding": "br, gzip;q=0.8"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert json.loads(gzip.decompress(response.data)) == NAMES
+    assert response.headers["ETag"] == client.get('/api/foods').headers["ETag"]
+
+    plain = client.get('/api/foods', headers={"Accept-Encoding": "gzip;q=0, identity"})
+    assert "Content-Encoding" not in plain.headers
+    assert plain.get_json() == NAMES
+
+
+@pytest.mark.parametrize("prefix, expected", [
+    ("bun", ["Bún bò Huế", "Bún chả"]),
+    ("BÚN  CH", ["Bún chả"]),
+    ("dau", ["Đậu phụ sốt cà chua"]),
+    ("đậu", ["Đậu phụ sốt cà chua"]),
+    # Whole-name matches rank before matches on a later word
+    ("mi", ["Mì Quảng", "Bánh mì thịt"]),
+    ("ca chua", ["Đậu phụ sốt cà chua"]),
+    ("pho ga", ["Phở   gà"]),
+    ("xyz", []),
+    ("  ", []),
+])
+def test_prefix_search(client, prefix, expected):
+    assert client.get('/api/foods', query_string={"prefix": prefix}).get_json() == expected
+
+
+def test_prefix_search_limit(client):
+    assert client.get('/api/foods', query_string={"prefix": "b", "limit": 2}).get_json() == ["Bánh mì thịt", "Bún bò Huế"]
+    assert client.get('/api/foods', query_string={"prefix": "b", "limit": -3}).get_json() == []
+    # "Phở bò" matches on its second word, after the three whole-name matches
+    assert client.get('/api/foods', query_string={"prefix": "b"}).get_json()[3:] == ["Phở bò"]
+
+
+def test_fold_accents():
+    assert fold_accents("  Đậu   PHỤ ") == "dau phu"
+    assert fold_accents("Bánh mì") == fold_accents("banh mi")
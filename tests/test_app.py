@@ -0,0 +1,145 @@
+"""/analyze, /analyze/batch and /analyze/scenarios through the Flask test client, on the synthetic model."""
+import numpy as np
+import pytest
+
+import app
+from conftest import sklearn_chain
+from forest_format import export_forests
+
+PROFILE = {"age": 58, "height": 160, "weight": 80, "gender": "Male", "smoking": 3}
+
+
+@pytest.fixture
+def client(trained, tmp_path, monkeypatch):
+    scaler, models = trained
+    monkeypatch.setattr(app, "FOREST_PATH", export_forests(scaler, models, tmp_path / "health_model.forest"))
+    monkeypatch.setattr(app, "MODEL_PATH", tmp_path / "health_model.pkl")
+    monkeypatch.setattr(app, "MODEL_VARIANT", "")
+    monkeypatch.setattr(app, "LOG_ANALYSES", False)
+    for name in ("PREDICTOR", "MODEL", "SCALER", "FOOD_DB", "FOOD_MATCHER", "FOOD_INDEX", "FOODS_PAYLOAD"):
+        monkeypatch.setattr(app, name, getattr(app, name))
+    app.load_resources()
+    yield app.app.test_client()
+    app.ANALYSIS_CACHE.clear()
+
+
+def dishes(*positions):
+    return [app.FOOD_DB.names[i] for i in positions]
+
+
+def expected_predictions(trained, record):
+    """Predictions of the sklearn reference chain on the features the app derives for `record`."""
+    features = app.prepare_record(app.parse_record(record))["features"]
+    prob_d, prob_c, prob_h = (p[0] for p in sklearn_chain(*trained, [features]))
+    return {"diabetes": round(prob_d * 100, 1), "cardio": round(prob_c * 100, 1), "hypertension": round(prob_h * 100, 1)}
+
+
+def test_analyze(client, trained):
+    foods = dishes(0, 2, 6)
+    record = {"userInfo": PROFILE, "foodText": ", ".join(foods).lower()}
+    response = client.post('/analyze', json=record)
+    assert response.status_code == 200
+    result = response.get_json()
+    assert result["success"] is True
+    assert sorted(result["foods"]) == sorted(foods)
+    assert result["bmi"] == round(80 / 1.6 ** 2, 2)
+    assert set(result["nutrition"]) == set(app.NUTRITION_KEYS)
+    assert result["predictions"] == expected_predictions(trained, record)
+    assert any(v > 0 for v in result["predictions"].values())
+
+
+def test_analyze_batch_matches_single_requests(client):
+    records = [{"userInfo": {**PROFILE, "age": 30 + 10 * k}, "foodText": ", ".join(dishes(k, k + 5))} for k in range(5)]
+    records.append({"userInfo": PROFILE, "foodText": "no known dish"})
+    batch = client.post('/analyze/batch', json={"records": records}).get_json()
+    assert batch["success"] is True
+    app.ANALYSIS_CACHE.clear()
+    assert batch["results"] == [client.post('/analyze', json=record).get_json() for record in records]
+
+
+def test_analyze_bad_input(client):
+    result = client.post('/analyze', json={"userInfo": {"age": "old"}, "foodText": "x"}).get_json()
+    assert result["success"] is False
+    assert client.post('/analyze/batch', json={"records": 5}).status_code == 400
+
+
+def scenario_days():
+    return [
+        [", ".join(dishes(0, 1)), ", ".join(dishes(2))],
+        [", ".join(dishes(3, 4, 5)), ", ".join(dishes(6, 7))],
+        [", ".join(dishes(8)), "no known dish"],
+    ]
+
+
+def test_scenarios_rank_and_match_analyze(client):
+    plans = scenario_days()
+    response = client.post('/analyze/scenarios', json={
+        "userInfo": PROFILE, "details": True,
+        "scenarios": [{"name": f"plan {k}", "days": days} for k, days in enumerate(plans)],
+    })
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["success"] is True and body["rank_by"] == "overall"
+    results = body["results"]
+    assert [r["rank"] for r in results] == [1, 2, 3]
+    assert sorted(r["scenario"] for r in results) == [0, 1, 2]
+    scores = [r["score"] for r in results]
+    assert scores == sorted(scores)
+
+    for r in results:
+        days = plans[r["scenario"]]
+        assert r["name"] == f"plan {r['scenario']}"
+        singles = [client.post('/analyze', json={"userInfo": PROFILE, "foodText": day}).get_json() for day in days]
+        # Each day scores as /analyze scores it alone
+        assert [d["predictions"] for d in r["days"]] == [s["predictions"] for s in singles]
+        assert [d["foods"] for d in r["days"]] == [s["foods"] for s in singles]
+        for key in app.RISK_KEYS:
+            assert r["risk"][key] == pytest.approx(np.mean([s["predictions"][key] for s in singles]), abs=0.051)
+    base = next(r for r in results if r["scenario"] == 0)
+    assert base["score_change"] == 0
+
+
+def test_scenarios_rank_by_and_top(client):
+    scenarios = scenario_days()
+    body = client.post('/analyze/scenarios', json={"userInfo": PROFILE, "scenarios": scenarios,
+                                                   "rank_by": "diabetes", "top": 2}).get_json()
+    assert body["rank_by"] == "diabetes"
+    assert len(body["results"]) == 2
+    risks = [r["risk"]["diabetes"] for r in body["results"]]
+    assert risks == sorted(risks)
+    assert "days" not in body["results"][0]
+
+
+@pytest.mark.parametrize("payload, status", [
+    ({"top": True}, 400),
+    ({"top": -1}, 400),
+    ({"top": "2"}, 400),
+    ({"rank_by": "obesity"}, 400),
+    ({"scenarios": []}, 400),
+    ({"scenarios": [["day"] * (app.MAX_PLAN_DAYS + 1)]}, 400),
+    ({"scenarios": ["day"] * (app.MAX_SCENARIOS + 1)}, 413),
+])
+def test_scenarios_rejects_bad_requests(client, payload, status):
+    response = client.post('/analyze/scenarios', json={"userInfo": PROFILE, "scenarios": scenario_days(), **payload})
+    assert response.status_code == status
+    assert response.get_json()["success"] is False
+
+
+def test_equivalent_records_hit_the_cache(client):
+    foods = dishes(1, 4)
+    first = client.post('/analyze', json={"userInfo": PROFILE, "foodText": f"{foods[0]}, {foods[1]}"}).get_json()
+    before = app.ANALYSIS_CACHE.stats()
+    # Same dishes in another order and case, same profile: one cache entry
+    again = client.post('/analyze', json={"userInfo": PROFILE,
+                                          "foodText": f"{foods[1].upper()}  và {foods[0]}"}).get_json()
+    after = app.ANALYSIS_CACHE.stats()
+    assert again == first
+    assert after["hits"] == before["hits"] + 1 and after["size"] == before["size"]
+
+    other = client.post('/analyze', json={"userInfo": {**PROFILE, "age": 59}, "foodText": foods[0]}).get_json()
+    assert other["success"] is True
+    assert app.ANALYSIS_CACHE.stats()["misses"] == after["misses"] + 1
+
+    # Reloading the catalog invalidates everything cached so far
+    app.load_catalog()
+    assert app.ANALYSIS_CACHE.stats()["size"] == 0
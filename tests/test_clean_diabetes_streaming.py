@@ -0,0 +1,69 @@
+"""Chunked clean_diabetes_data_streaming gives the rows clean_diabetes_data gives, with hashes in RAM or spilled to SQLite."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_engineer import clean_data
+
+SMOKING = ['never', 'No Info', 'former', 'not current', 'current', 'ever']
+
+
+@pytest.fixture(scope="module")
+def diabetes_csv(tmp_path_factory):
+    """Patient rows shaped like diabetes_prediction_dataset.csv, with duplicates within and across chunks."""
+    rng = np.random.default_rng(0)
+    n = 3000
+    df = pd.DataFrame({
+        'gender': rng.choice(['Male', 'Female', 'Other'], n, p=[0.48, 0.5, 0.02]),
+        'age': rng.integers(1, 80, n).astype(float),
+        'hypertension': rng.integers(0, 2, n),
+        'heart_disease': rng.integers(0, 2, n),
+        'smoking_history': rng.choice(SMOKING + ['unknown'], n),
+        'bmi': rng.choice([22.5, 27.32, 31.1, 18.75], n),
+        'HbA1c_level': rng.choice([4.8, 5.7, 6.6, 9.0], n),
+        'blood_glucose_level': rng.choice([80, 140, 200, 300], n),
+        'diabetes': rng.integers(0, 2, n),
+    })
+    # Exact copies, close (same chunk) and far (later chunks)
+    copies = df.iloc[rng.integers(0, n, 600)]
+    df = pd.concat([df, copies], ignore_index=True).sample(frac=1, random_state=1).reset_index(drop=True)
+    path = tmp_path_factory.mktemp("raw") / "diabetes_prediction_dataset.csv"
+    df.to_csv(path, index=False)
+    return path
+
+
+@pytest.fixture(scope="module")
+def expected(diabetes_csv, tmp_path_factory):
+    output = tmp_path_factory.mktemp("baseline") / "processed_diabetes.csv"
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(clean_data, "DIABETES_FILE", str(diabetes_csv))
+        mp.setattr(clean_data, "OUTPUT_DIABETES", str(output))
+        clean_data.clean_diabetes_data()
+    return pd.read_csv(output)
+
+
+@pytest.mark.parametrize("max_hashes", [10_000_000, 500])
+def test_streaming_matches_in_memory_clean(diabetes_csv, expected, tmp_path, max_hashes):
+    output = tmp_path / "processed_diabetes.csv"
+    stats = clean_data.clean_diabetes_data_streaming(chunksize=700, output_path=str(output), input_path=str(diabetes_csv),
+                                                     max_hashes_in_memory=max_hashes)
+    actual = pd.read_csv(output)
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+    assert stats["rows_in"] == 3600 and stats["rows_out"] == len(expected)
+    assert stats["duplicates"] == 3600 - len(pd.read_csv(diabetes_csv).drop_duplicates())
+
+
+def test_row_hash_set_spills_to_sqlite():
+    seen = clean_data.RowHashSet(max_in_memory=4)
+    try:
+        first = np.array([1, 2, 3, 2], dtype=np.uint64)
+        assert seen.add_new(first).tolist() == [True, True, True, False]
+        assert not seen.on_disk
+        # Past max_in_memory: the hashes seen so far move to disk and still count
+        second = np.array([3, 2**63 + 5, 7, 2**63 + 5, 1], dtype=np.uint64)
+        assert seen.add_new(second).tolist() == [False, True, True, False, False]
+        assert seen.on_disk
+        assert seen.add_new(np.array([7, 8], dtype=np.uint64)).tolist() == [False, True]
+    finally:
+        seen.close()
+    assert not seen.on_disk
@@ -0,0 +1,85 @@
+"""clean_food_data: the rule engine gives the same cleaned_foods.csv as the old row-wise apply() heuristics."""
+import json
+
+import pandas as pd
+import pytest
+
+from data_engineer import clean_data
+
+
+def legacy_clean_food(path):
+    """clean_food_data before the rule engine (three DataFrame.apply passes)."""
+    df = pd.read_csv(path)
+    df = df[['dish', 'calo', 'carbohydrate', 'lipid', 'protein']]
+    df.columns = ['name', 'calo', 'sugar', 'fat', 'protein']
+    df = df.drop_duplicates().fillna(0)
+
+    def estimate_salt(row):
+        name = str(row['name']).lower()
+        if any(x in name for x in ['kho', 'mắm', 'muối', 'rang', 'rim', 'canh', 'phở', 'bún', 'mì']):
+            return 500.0
+        return 50.0
+
+    def estimate_milk(row):
+        name = str(row['name']).lower()
+        if any(x in name for x in ['sữa', 'latte', 'cheese', 'kem', 'yogurt', 'cacao']):
+            return 200.0
+        return 0.0
+
+    def estimate_alcohol(row):
+        name = str(row['name']).lower()
+        if any(x in name for x in ['bia', 'rượu', 'cocktail', 'wine']):
+            return 330.0
+        return 0.0
+
+    df['salt'] = df.apply(estimate_salt, axis=1)
+    df['milk'] = df.apply(estimate_milk, axis=1)
+    df['alcohol'] = df.apply(estimate_alcohol, axis=1)
+    return df
+
+
+@pytest.fixture
+def food_csv(tmp_path):
+    """The shipped catalog plus edge cases: upper case, keywords inside words, a duplicate, missing values."""
+    df = pd.read_csv(clean_data.FOOD_FILE)
+    extra = pd.DataFrame({
+        'dish': ['CÁ KHO TỘ', 'Bánh Mì Sữa', 'Kem Bia', 'Rượu vang (Wine)', 'Khoai lang', 'Nước lọc', 'Nước lọc'],
+        'unit': ['1 đĩa'] * 7, 'calo': [200, 300, None, 120, 90, 0, 0], 'lipid': [5, None, 3, 0, 0, 0, 0],
+        'carbohydrate': [2, 50, 20, 4, 21, 0, 0], 'protein': [20, 8, 1, 0, 1, 0, 0], 'fiber': [0] * 7,
+    })
+    path = tmp_path / "cac_mon_an.csv"
+    pd.concat([df, extra], ignore_index=True).to_csv(path, index=False)
+    return path
+
+
+def test_same_output_as_row_wise_apply(food_csv, tmp_path, monkeypatch):
+    output = tmp_path / "cleaned_foods.csv"
+    monkeypatch.setattr(clean_data, "FOOD_FILE", str(food_csv))
+    monkeypatch.setattr(clean_data, "OUTPUT_FOOD", str(output))
+    clean_data.clean_food_data()
+
+    expected = tmp_path / "expected.csv"
+    legacy_clean_food(food_csv).to_csv(expected, index=False)
+    assert output.read_bytes() == expected.read_bytes()
+
+
+def test_rules_file_adds_columns_without_code(food_csv, tmp_path, monkeypatch):
+    rules_path = tmp_path / "rules.json"
+    rules_path.write_text(json.dumps({"rules": [
+        {"column": "caffeine", "keywords": ["cà phê", "trà", "CACAO"], "match": 80, "default": 0},
+        {"column": "salt", "keywords": ["kho"], "match": 700},
+    ]}, ensure_ascii=False), encoding='utf-8')
+    output = tmp_path / "cleaned_foods.csv"
+    monkeypatch.setattr(clean_data, "FOOD_FILE", str(food_csv))
+    monkeypatch.setattr(clean_data, "OUTPUT_FOOD", str(output))
+    clean_data.clean_food_data(str(rules_path))
+
+    df = pd.read_csv(output)
+    assert list(df.columns) == ['name', 'calo', 'sugar', 'fat', 'protein', 'caffeine', 'salt']
+    names = df['name'].str.lower()
+    caffeine = names.str.contains('cà phê') | names.str.contains('trà') | names.str.contains('cacao')
+    assert caffeine.any()
+    assert (df['caffeine'] == caffeine.map({True: 80.0, False: 0.0})).all()
+    # "default" is optional (0)
+    assert (df['salt'] == names.str.contains('kho').map({True: 700.0, False: 0.0})).all()
+
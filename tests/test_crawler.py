@@ -0,0 +1,97 @@
+"""Crawler against crawl_data/local_server.py (offline): retries, conditional requests, resume, line counts."""
+import os
+
+import pytest
+
+from crawl_data.crawler import Crawler
+from crawl_data.local_server import serve
+
+
+@pytest.fixture
+def source_dir(tmp_path):
+    root = tmp_path / "src"
+    root.mkdir()
+    for i in range(4):
+        (root / f"t{i}.csv").write_bytes(b"dish,calo\n" + b"".join(b"mon %d,%d\n" % (j, j) for j in range(5000 * (i + 1))))
+    # No trailing newline: the last line still counts, as with readlines()
+    (root / "tail.csv").write_bytes(b"dish,calo\nbia,43\nnem,120")
+    (root / "empty.csv").write_bytes(b"")
+    return root
+
+
+@pytest.fixture
+def server(source_dir):
+    server = serve(source_dir)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def sources(server, out_dir, names):
+    return [{"url": f"{server.base_url}/{name}", "output": str(out_dir / name)} for name in names]
+
+
+def read_lines(path):
+    with open(path, "rb") as f:
+        return len(f.readlines())
+
+
+NAMES = ["t0.csv", "t1.csv", "t2.csv", "t3.csv", "tail.csv", "empty.csv"]
+
+
+def test_crawl_downloads_and_revalidates(server, source_dir, tmp_path):
+    server.fail_first["t1.csv"] = 2
+    state = str(tmp_path / "state.json")
+    batch = sources(server, tmp_path, NAMES) + sources(server, tmp_path, ["missing.csv"])
+    results = Crawler(state, max_workers=3, backoff=0.01).crawl(batch)
+
+    assert [r["status"] for r in results] == ["downloaded"] * len(NAMES) + ["failed"]
+    assert results[1]["attempts"] == 3
+    assert results[-1]["error"] == "HTTP 404"
+    for name, result in zip(NAMES, results):
+        assert (tmp_path / name).read_bytes() == (source_dir / name).read_bytes()
+        assert result["lines"] == read_lines(source_dir / name), name
+    # Keep-alive: fewer connections than requests
+    assert server.stats["connections"] < server.stats["requests"]
+
+    # Second run: every file answered with 304, line counts come from the state file
+    again = Crawler(state).crawl(sources(server, tmp_path, NAMES))
+    assert [r["status"] for r in again] == ["not_modified"] * len(NAMES)
+    assert [r["lines"] for r in again] == [r["lines"] for r in results[:-1]]
+
+    # A changed file is downloaded again
+    with open(source_dir / "t0.csv", "ab") as f:
+        f.write(b"x,1\n")
+    os.utime(source_dir / "t0.csv", ns=(0, os.stat(source_dir / "t0.csv").st_mtime_ns + 10**9))
+    changed = Crawler(state).crawl(sources(server, tmp_path, ["t0.csv", "t1.csv"]))
+    assert [r["status"] for r in changed] == ["downloaded", "not_modified"]
+    assert (tmp_path / "t0.csv").read_bytes() == (source_dir / "t0.csv").read_bytes()
+
+
+@pytest.mark.parametrize("name", ["t3.csv", "tail.csv"])
+def test_interrupted_download_resumes(server, source_dir, tmp_path, name):
+    size = (source_dir / name).stat().st_size
+    server.truncate[name] = size // 2
+    state = str(tmp_path / "state.json")
+    [source] = sources(server, tmp_path, [name])
+
+    with Crawler(state, retries=0, chunk_size=1024) as crawler:
+        first = crawler.fetch(source["url"], source["output"])
+    assert first["status"] == "failed"
+    assert os.path.getsize(source["output"] + ".part") == size // 2
+
+    with Crawler(state, chunk_size=1024) as crawler:
+        resumed = crawler.fetch(source["url"], source["output"])
+    assert resumed["status"] == "resumed"
+    assert resumed["resumed_from"] == size // 2
+    assert resumed["bytes"] == size - size // 2
+    assert resumed["lines"] == read_lines(source_dir / name)
+    assert (tmp_path / name).read_bytes() == (source_dir / name).read_bytes()
+    assert not os.path.exists(source["output"] + ".part")
+    assert server.stats[206] == 1
+
+
+def test_rejects_two_sources_with_one_output(server, tmp_path):
+    batch = sources(server, tmp_path, ["t0.csv"]) * 2
+    with pytest.raises(ValueError):
+        Crawler(str(tmp_path / "state.json")).crawl(batch)
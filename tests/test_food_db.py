@@ -0,0 +1,76 @@
+"""FoodDB: same rows and nutrient totals as the old list of pandas records, on every code path."""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from food_db import CALO, FAT, NUTRIENT_COLS, PROTEIN, SALT, SMALL_N, SUGAR, FoodDB
+
+CATALOG = Path(__file__).resolve().parent.parent / "data" / "cleaned_foods.csv"
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    return FoodDB.from_csv(CATALOG), pd.read_csv(CATALOG).to_dict('records')
+
+
+def legacy_totals(records, food_ids, columns):
+    """sum_nutrition over the old list of dicts, rounded to the catalog's 2 decimals."""
+    totals = dict.fromkeys(columns, 0.0)
+    for i in food_ids:
+        for k in columns:
+            totals[k] += float(records[i].get(k, 0))
+    return [round(v, 2) for v in totals.values()]
+
+
+def test_rows_match_records(catalog):
+    db, records = catalog
+    assert len(db) == len(records)
+    assert db.rows(range(len(db))) == records
+    assert [db[i] for i in range(0, len(db), 50)] == records[::50]
+    assert list(db) == records
+    assert db.get(records[3]['name']) == records[3]
+    assert db.get("no such dish") is None
+
+
+@pytest.mark.parametrize("size", [0, 1, 2, SMALL_N - 1, SMALL_N, 25])
+def test_totals_match_legacy_sum(catalog, size):
+    db, records = catalog
+    rng = np.random.default_rng(size)
+    for _ in range(30):
+        # Repeats count every time
+        ids = rng.integers(0, len(db), size).tolist()
+        for columns in (None, [CALO, SUGAR, FAT, PROTEIN, SALT], [SALT, CALO]):
+            names = NUTRIENT_COLS if columns is None else [NUTRIENT_COLS[c] for c in columns]
+            expected = legacy_totals(records, ids, names)
+            assert db.totals_list(ids, columns) == expected
+            assert all(type(v) is float for v in db.totals_list(ids, columns))
+            np.testing.assert_array_equal(db.totals(ids, columns), expected)
+
+
+def test_totals_many_matches_totals(catalog):
+    db, _ = catalog
+    rng = np.random.default_rng(1)
+    id_lists = [rng.integers(0, len(db), n).tolist() for n in (0, 1, 3, 9, 40, 2)]
+    columns = [CALO, SUGAR, FAT, PROTEIN, SALT]
+    many = db.totals_many(id_lists, columns)
+    assert many.shape == (len(id_lists), len(columns))
+    for row, ids in zip(many, id_lists):
+        np.testing.assert_allclose(row, db.totals(ids, columns), rtol=0, atol=1e-9)
+
+
+def test_from_csv_missing_values(tmp_path):
+    path = tmp_path / "foods.csv"
+    path.write_text("name,sugar,calo\nBia,3.1,43\nNước,,0\n\nTrà sữa,32.7,\n", encoding='utf-8')
+    db = FoodDB.from_csv(path)
+    assert db.names == ["Bia", "Nước", "Trà sữa"]
+    assert db[2] == {'name': "Trà sữa", **dict.fromkeys(NUTRIENT_COLS, 0.0), 'sugar': 32.7}
+    assert db.totals_list([0, 1, 2], [SUGAR, CALO, FAT]) == [35.8, 43.0, 0.0]
+
+
+def test_duplicate_names_and_shape_check():
+    db = FoodDB(["Bia", "Bia", "Phở"], np.arange(21, dtype=np.float32).reshape(3, 7))
+    assert db.id_of("Bia") == 0 and db.id_of("Phở") == 2
+    with pytest.raises(ValueError):
+        FoodDB(["Bia"], np.zeros((2, len(NUTRIENT_COLS))))
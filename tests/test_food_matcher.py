@@ -0,0 +1,67 @@
+"""FoodMatcher: one pass over the text, leftmost-longest, same dishes as the old substring scan otherwise."""
+from pathlib import Path
+
+import pytest
+
+from food_db import FoodDB
+from food_matcher import FoodMatcher, normalize
+
+CATALOG = Path(__file__).resolve().parent.parent / "data" / "cleaned_foods.csv"
+
+
+def legacy_find(names, text):
+    """The scan find_food_in_text did before the matcher: every name tested as a substring."""
+    text = text.lower()
+    return [i for i, name in enumerate(names) if name.lower() in text]
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    return FoodDB.from_csv(CATALOG).names
+
+
+def test_longest_name_wins():
+    matcher = FoodMatcher(["Phở bò", "Phở bò chín", "Bò"])
+    assert matcher.find("phở bò chín") == [1]
+    assert matcher.find("phở bò") == [0]
+    # The shorter names inside "phở bò chín" are not reported; a separate "bò" is
+    assert matcher.find("sáng phở bò chín, tối bò") == [1, 2]
+
+
+def test_leftmost_match_wins_over_later_overlap():
+    matcher = FoodMatcher(["cơm tấm", "tấm bì"])
+    assert matcher.find("cơm tấm bì") == [0]
+    assert [span[:2] for span in matcher.find_spans("cơm tấm bì")] == [(0, 7)]
+
+
+def test_normalizes_case_and_whitespace():
+    matcher = FoodMatcher(["Phở  Bò", "Trà sữa"])
+    assert matcher.find("PHỞ BÒ\tvà  trà\nsữa") == [0, 1]
+    assert normalize("  Bún   Chả ") == "bún chả"
+
+
+def test_duplicate_names_report_every_id():
+    matcher = FoodMatcher(["Bia", "Nem rán", "bia"])
+    assert matcher.find("một lon bia") == [0, 2]
+    assert FoodMatcher([]).find("bia") == []
+    assert matcher.find("") == []
+
+
+def test_every_catalog_dish_is_found(catalog):
+    matcher = FoodMatcher(catalog)
+    for food_id, name in enumerate(catalog):
+        assert food_id in matcher.find(name), name
+
+
+def test_same_as_substring_scan_without_overlaps(catalog):
+    """Dishes that are not part of a longer dish in the same text are found exactly as before."""
+    matcher = FoodMatcher(catalog)
+    for k in range(0, len(catalog) - 3, 37):
+        text = ", ".join(catalog[k:k + 3]).lower() + " và nước lọc"
+        expected = set(legacy_find(catalog, text))
+        found = set(matcher.find(text))
+        assert found <= expected
+        # Anything the scan reported on top is a name inside a longer match
+        for food_id in expected - found:
+            inner = catalog[food_id].lower()
+            assert any(inner in catalog[other].lower() and inner != catalog[other].lower() for other in found), inner
@@ -0,0 +1,101 @@
+"""Export -> load round trip of the flat .forest format, full precision and quantized."""
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.tree import DecisionTreeClassifier
+
+import forest_format
+from conftest import make_patients, make_profiles
+from forest_format import export_forests, load_forests
+from predictor import ALL_COLS, MODEL_FEATURES, RiskPredictor
+
+
+@pytest.fixture(scope="module")
+def samples(trained):
+    """Scaled inputs of every model: random profiles plus rows sitting exactly on the split thresholds."""
+    scaler, models = trained
+    frame = pd.DataFrame(make_profiles(300, seed=7), columns=ALL_COLS[:6])
+    for flag in ('hypertension', 'heart_disease', 'diabetes'):
+        frame[flag] = np.random.default_rng(8).integers(0, 2, len(frame))
+    scaled = pd.DataFrame(scaler.transform(frame[ALL_COLS]), columns=ALL_COLS)
+
+    result = {}
+    rng = np.random.default_rng(9)
+    for name, model in models.items():
+        X = scaled[MODEL_FEATURES[name]].to_numpy(dtype=np.float32)
+        # Thresholds cast to float32 are the inputs most likely to flip a branch after quantization
+        edges = X[:len(model.estimators_)].copy()
+        for row, estimator in zip(edges, model.estimators_):
+            tree = estimator.tree_
+            for node in np.flatnonzero(tree.feature >= 0):
+                if rng.random() < 0.5:
+                    row[tree.feature[node]] = np.float32(tree.threshold[node])
+        result[name] = np.vstack([X, edges])
+    return result
+
+
+def _sklearn_positive(model, X):
+    return model.predict_proba(pd.DataFrame(X, columns=model.feature_names_in_))[:, 1]
+
+
+def test_round_trip_full_precision(trained, samples, tmp_path):
+    scaler, models = trained
+    path = export_forests(scaler, models, tmp_path / "model.forest")
+    flat_scaler, flat_models = load_forests(path)
+
+    np.testing.assert_array_equal(flat_scaler.mean_, scaler.mean_)
+    np.testing.assert_array_equal(flat_scaler.scale_, scaler.scale_)
+    assert list(flat_scaler.feature_names_in_) == ALL_COLS
+    for name, model in models.items():
+        flat = flat_models[name]
+        assert flat.n_estimators == len(model.estimators_)
+        assert list(flat.feature_names_in_) == list(model.feature_names_in_)
+        assert flat._threshold.dtype == np.float64
+        np.testing.assert_allclose(flat.predict_positive(samples[name]), _sklearn_positive(model, samples[name]),
+                                   rtol=0, atol=1e-12, err_msg=name)
+
+    features = make_profiles(200, seed=10)
+    for act, exp in zip(RiskPredictor(flat_scaler, flat_models).predict_proba(features),
+                        RiskPredictor(scaler, models).predict_proba(features)):
+        np.testing.assert_allclose(act, exp, rtol=0, atol=1e-12)
+
+
+def test_round_trip_quantized(trained, samples, tmp_path):
+    scaler, models = trained
+    full_path = export_forests(scaler, models, tmp_path / "full.forest")
+    path = export_forests(scaler, models, tmp_path / "quantized.forest", quantize=True)
+    assert path.stat().st_size < full_path.stat().st_size
+
+    _, full_models = load_forests(full_path)
+    _, flat_models = load_forests(path)
+    for name, model in models.items():
+        flat = flat_models[name]
+        assert flat._feature.dtype == forest_format.QUANTIZED_ARRAYS["feature"]
+        assert flat._threshold.dtype == forest_format.QUANTIZED_ARRAYS["threshold"]
+        assert flat._value.dtype == forest_format.QUANTIZED_ARRAYS["value"]
+        # Rounded-down float32 thresholds send every float32 input down the same branches
+        np.testing.assert_array_equal(flat.apply(samples[name]), full_models[name].apply(samples[name]), err_msg=name)
+        # Only the leaf values lose precision (float32)
+        np.testing.assert_allclose(flat.predict_positive(samples[name]), _sklearn_positive(model, samples[name]),
+                                   rtol=0, atol=1e-6, err_msg=name)
+
+
+def test_single_tree_model(trained, tmp_path):
+    scaler, models = trained
+    df = make_patients(1000, seed=11)
+    scaled = pd.DataFrame(scaler.transform(df), columns=ALL_COLS)
+    cols = MODEL_FEATURES['diabetes']
+    tree = DecisionTreeClassifier(max_depth=6, random_state=0).fit(scaled[cols], df['diabetes'])
+    assert forest_format.is_exportable(tree)
+
+    _, flat_models = load_forests(export_forests(scaler, {**models, 'diabetes': tree}, tmp_path / "tree.forest"))
+    X = scaled[cols].to_numpy(dtype=np.float32)
+    assert flat_models['diabetes'].n_estimators == 1
+    np.testing.assert_allclose(flat_models['diabetes'].predict_positive(X), _sklearn_positive(tree, X), rtol=0, atol=1e-12)
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "model.pkl"
+    path.write_bytes(b"not a forest file")
+    with pytest.raises(ValueError):
+        load_forests(path)
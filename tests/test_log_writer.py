@@ -0,0 +1,85 @@
+"""LogWriter: rows reach SQLite in batches; a full queue or a dead writer drops rows instead of blocking."""
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from log_writer import LogWriter
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "user_logs.db"
+    conn = sqlite3.connect(path)
+    conn.execute("""CREATE TABLE logs (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT, user_info TEXT,
+                    food_input TEXT, nutrition_stats TEXT, predictions TEXT)""")
+    conn.close()
+    return path
+
+
+def row(k):
+    return (f"2024-01-01T00:00:{k:02d}", "{}", f"meal {k}", "{}", "{}")
+
+
+def logged(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return [r[0] for r in conn.execute("SELECT food_input FROM logs ORDER BY id")]
+    finally:
+        conn.close()
+
+
+def test_flushes_every_row_in_order(db_path):
+    writer = LogWriter(db_path, batch_size=100).start()
+    assert all(writer.submit(row(k % 60)) for k in range(1234))
+    writer.close()
+    assert not writer.alive
+    assert writer.written == 1234 and writer.dropped == 0 and writer.errors == 0
+    assert logged(db_path) == [f"meal {k % 60}" for k in range(1234)]
+
+
+def test_full_queue_drops_rows(db_path):
+    writer = LogWriter(db_path, max_queue=5, put_timeout=0.05)
+    flushing, release = threading.Event(), threading.Event()
+    flush = writer._flush
+
+    def slow_flush(conn, batch):
+        flushing.set()
+        release.wait(10)
+        flush(conn, batch)
+
+    writer._flush = slow_flush
+    writer.start()
+    try:
+        assert writer.submit(row(0))
+        assert flushing.wait(10)
+        # The writer is stuck on row 0: five rows fill the queue, the sixth is dropped
+        assert all(writer.submit(row(k)) for k in range(1, 6))
+        assert not writer.submit(row(6))
+        assert writer.dropped == 1
+
+        # Without blocking, a full queue drops at once, however long put_timeout is
+        writer.put_timeout = 10
+        start = time.perf_counter()
+        assert not writer.submit(row(7), block=False)
+        assert time.perf_counter() - start < 1
+        assert writer.dropped == 2
+    finally:
+        release.set()
+        writer.close()
+    assert writer.written == 6
+    assert logged(db_path) == [f"meal {k}" for k in range(6)]
+
+
+def test_drops_when_not_running(db_path, tmp_path):
+    writer = LogWriter(db_path)
+    assert not writer.submit(row(0))
+    assert writer.dropped == 1
+
+    broken = LogWriter(tmp_path / "missing" / "user_logs.db").start()
+    broken._thread.join(10)
+    assert not broken.alive and broken.errors == 1
+    assert not broken.submit(row(0))
+    assert broken.dropped == 1
+    broken.close()
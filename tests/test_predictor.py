@@ -0,0 +1,81 @@
+"""RiskPredictor must score exactly like the sklearn pipeline it replaces."""
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.tree import DecisionTreeClassifier
+
+from conftest import TARGET_COLS, make_patients, make_profiles, sklearn_chain
+from predictor import ALL_COLS, MODEL_FEATURES, RiskPredictor
+
+
+def assert_chain_equal(actual, expected):
+    for name, act, exp in zip(RiskPredictor.TARGETS, actual, expected):
+        np.testing.assert_allclose(act, exp, rtol=0, atol=1e-12, err_msg=name)
+
+
+def test_predict_proba_matches_sklearn(trained):
+    scaler, models = trained
+    features = make_profiles(500, seed=1)
+    expected = sklearn_chain(scaler, models, features)
+    assert_chain_equal(RiskPredictor(scaler, models).predict_proba(features), expected)
+    # Both branches of the chained diabetes and heart-disease flags are exercised
+    assert 0 < (expected[0] > 0.5).mean() < 1
+    assert 0 < (expected[1] > 0.5).mean() < 1
+
+
+def test_predict_batch_and_single_profile(trained):
+    predictor = RiskPredictor(*trained)
+    features = make_profiles(20, seed=2)
+    prob_d, prob_c, prob_h = sklearn_chain(*trained, features)
+    batch = predictor.predict_batch(features)
+    assert batch == [
+        {"diabetes": round(d * 100, 1), "cardio": round(c * 100, 1), "hypertension": round(h * 100, 1)}
+        for d, c, h in zip(prob_d, prob_c, prob_h)
+    ]
+    gender, age, bmi, smoking, hba1c, glucose = features[0]
+    profile = {"gender": gender, "age": age, "bmi": bmi, "smoking": smoking, "hba1c": hba1c, "glucose": glucose}
+    assert predictor.predict(profile) == batch[0]
+    assert predictor.predict(list(features[0])) == batch[0]
+
+
+@pytest.fixture(scope="module")
+def training_frame(trained):
+    scaler, _ = trained
+    df = make_patients(1500, seed=5)
+    return df, pd.DataFrame(scaler.transform(df), columns=ALL_COLS)
+
+
+def test_columns_matched_by_name(trained, training_frame):
+    """Models fitted on another column order (older artifacts) are fed by feature name, not position."""
+    scaler, _ = trained
+    df, scaled = training_frame
+    models = {
+        name: RandomForestClassifier(n_estimators=5, max_depth=5, random_state=0)
+              .fit(scaled[MODEL_FEATURES[name][::-1]], df[TARGET_COLS[name]])
+        for name in MODEL_FEATURES
+    }
+    features = make_profiles(200, seed=3)
+    assert_chain_equal(RiskPredictor(scaler, models).predict_proba(features), sklearn_chain(scaler, models, features))
+
+
+def test_single_decision_tree(trained, training_frame):
+    """A distilled model is one DecisionTreeClassifier and scores as a forest of one tree."""
+    scaler, models = trained
+    df, scaled = training_frame
+    tree = DecisionTreeClassifier(max_depth=6, random_state=0).fit(scaled[MODEL_FEATURES['diabetes']], df['diabetes'])
+    mixed = {**models, 'diabetes': tree}
+    features = make_profiles(200, seed=4)
+    assert_chain_equal(RiskPredictor(scaler, mixed).predict_proba(features), sklearn_chain(scaler, mixed, features))
+
+
+
+def test_predict_model_scores_recorded_rows(trained):
+    """predict_model: one model on unscaled rows with their own flags, scaled as the chain scales them."""
+    scaler, models = trained
+    df = make_patients(300, seed=6)
+    scaled = pd.DataFrame(scaler.transform(df), columns=ALL_COLS)
+    predictor = RiskPredictor(scaler, models)
+    for name, model in models.items():
+        expected = model.predict_proba(scaled[list(model.feature_names_in_)])[:, 1]
+        np.testing.assert_allclose(predictor.predict_model(name, df.to_numpy()), expected, rtol=0, atol=1e-12, err_msg=name)
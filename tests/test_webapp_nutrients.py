@@ -0,0 +1,56 @@
+"""Legacy webapp NutrientStore: same totals as the old per-request loop, reloaded on file change."""
+import importlib.util
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+FOODS = [
+    {"name": "Phở bò", "sugar": 2, "salt": 1.5, "fat": 8, "milk": 0, "alcohol": 0},
+    {"name": "Bia", "sugar": 3.1, "salt": 0, "fat": 0, "milk": 0, "alcohol": 12.5},
+    {"name": "Trà sữa", "sugar": 32.7, "salt": 0.1, "fat": 6.3, "milk": 120},
+    {"name": "phở", "sugar": 1, "salt": 1, "fat": 5, "milk": 0, "alcohol": 0},
+    {"name": "Bia", "sugar": 0.2, "salt": 0, "fat": 0, "milk": 0, "alcohol": 4},
+]
+
+
+@pytest.fixture(scope="module")
+def webapp():
+    spec = importlib.util.spec_from_file_location("legacy_webapp", ROOT / "webapp" / "app.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def legacy_totals(foods, text):
+    """The route body before NutrientStore (missing nutrients count as 0)."""
+    totals = dict.fromkeys(["sugar", "salt", "fat", "milk", "alcohol"], 0)
+    for f in foods:
+        if f["name"].lower() in text:
+            for k in totals:
+                totals[k] += f.get(k, 0)
+    return totals
+
+
+@pytest.mark.parametrize("text", ["phở bò và bia", "trà sữa", "bia, bia", "cơm tấm", ""])
+def test_totals_match_old_loop(webapp, tmp_path, text):
+    path = tmp_path / "foods_vn.json"
+    path.write_text(json.dumps(FOODS, ensure_ascii=False), encoding="utf-8")
+    totals = webapp.NutrientStore(path).totals(text)
+    assert totals == legacy_totals(FOODS, text)
+    assert all(type(v) is float for v in totals.values())
+
+
+def test_reloads_when_file_changes(webapp, tmp_path):
+    path = tmp_path / "foods_vn.json"
+    path.write_text(json.dumps(FOODS[:2], ensure_ascii=False), encoding="utf-8")
+    store = webapp.NutrientStore(path)
+    assert store.totals("trà sữa")["sugar"] == 0
+
+    path.write_text(json.dumps(FOODS, ensure_ascii=False), encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert store.totals("trà sữa")["sugar"] == 32.7
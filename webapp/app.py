@@ -1,6 +1,6 @@
 
 from flask import Flask, render_template, request, jsonify
-import json, os, sqlite3, datetime, joblib, numpy as np
+import json, os, sqlite3, datetime, threading, joblib, numpy as np
 from pathlib import Path
 
 app = Flask(__name__)
@@ -19,9 +19,41 @@ def init_db():
         risk_d REAL, risk_o REAL, risk_c REAL)""")
     conn.commit(); conn.close()
 
-def load_foods():
-    with open(DATA, encoding='utf-8') as f:
-        return json.load(f)
+NUTRIENTS = ["sugar","salt","fat","milk","alcohol"]
+
+class NutrientStore:
+    """foods_vn.json kept in memory: a lowercased name -> rows index and a
+    (n_foods, 5) nutrient matrix. Reloaded when the file's mtime changes."""
+    def __init__(self, path):
+        self.path = path
+        self.mtime = None
+        self.data = ({}, np.zeros((0, len(NUTRIENTS))))
+        self.lock = threading.Lock()
+
+    def refresh(self):
+        mtime = os.stat(self.path).st_mtime_ns
+        if mtime != self.mtime:
+            with self.lock:
+                if mtime != self.mtime:
+                    with open(self.path, encoding='utf-8') as f:
+                        foods = json.load(f)
+                    index = {}
+                    for i, f in enumerate(foods):
+                        index.setdefault(f["name"].lower(), []).append(i)
+                    matrix = np.array([[f.get(k, 0) for k in NUTRIENTS] for f in foods], dtype=float)
+                    # swap in one assignment so readers never see a half-loaded store
+                    self.data = (index, matrix.reshape(-1, len(NUTRIENTS)))
+                    self.mtime = mtime
+        return self.data
+
+    def totals(self, text):
+        index, matrix = self.refresh()
+        # each distinct name is tested once; rows stay in file order so the
+        # column sums add them in the same order as the old per-request loop
+        rows = sorted(i for name, ids in index.items() if name in text for i in ids)
+        return dict(zip(NUTRIENTS, matrix[rows].sum(axis=0).tolist()))
+
+FOODS = NutrientStore(DATA)
 
 USE_ML=False
 if MODEL.exists():
@@ -37,15 +69,7 @@ def home():
 @app.route('/analyze_text', methods=['POST'])
 def analyze():
     t = request.json.get('text','').lower()
-    foods = load_foods()
-    totals={"sugar":0,"salt":0,"fat":0,"milk":0,"alcohol":0}
-    for f in foods:
-        if f["name"].lower() in t:
-            totals["sugar"]+=f["sugar"]
-            totals["salt"]+=f["salt"]
-            totals["fat"]+=f["fat"]
-            totals["milk"]+=f["milk"]
-            totals["alcohol"]+=f["alcohol"]
+    totals = FOODS.totals(t)
     if USE_ML:
         X = np.array([[totals["sugar"],totals["salt"],totals["fat"],totals["milk"],totals["alcohol"],2000]])
         Xs = scaler.transform(X)
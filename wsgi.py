@@ -0,0 +1,11 @@
+"""WSGI entry point.
+
+    gunicorn -c gunicorn.conf.py
+
+Importing this module loads the food catalog and starts the model load. Run
+through gunicorn.conf.py (preload_app) it happens once in the master and the
+forked workers share the loaded pages copy-on-write.
+"""
+from app import create_app
+
+application = create_app()